@@ -1,12 +1,36 @@
+import threading
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from controller.prediction import router as prediction_router
+from controller.prediction import router as prediction_router, warmup_inference, MODEL_WARMUP
 from controller.stats import router as stats_router
 from controller.image import router as images_router
 from controller.labels import router as labels_router
 from controller.health import router as health_router
 from database.connections import Base, engine, init_db
+from dependencies.auth import warm_auth_cache
+from utils.uploads import UploadLimitMiddleware, MAX_UPLOAD_BYTES, MAX_BATCH_UPLOAD_BYTES, MAX_VIDEO_UPLOAD_BYTES
 
-app = FastAPI()
+# Room for the multipart framing around the file itself
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    warm_auth_cache()
+    if MODEL_WARMUP:
+        # In the background, so /health answers while the model loads
+        threading.Thread(target=warmup_inference, name="model-warmup", daemon=True).start()
+    yield
+
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(
+    UploadLimitMiddleware,
+    max_bytes=MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD_BYTES,
+    paths=("/predict", "/predict/async"),
+)
+app.add_middleware(UploadLimitMiddleware, max_bytes=MAX_BATCH_UPLOAD_BYTES + MULTIPART_OVERHEAD_BYTES, paths=("/predict/batch",))
+app.add_middleware(UploadLimitMiddleware, max_bytes=MAX_VIDEO_UPLOAD_BYTES + MULTIPART_OVERHEAD_BYTES, paths=("/predict/video",))
 
 init_db()
 
@@ -0,0 +1,133 @@
+"""
+Benchmark: concurrent GET /prediction/{uid} and /stats requests served by
+the sync handlers (threadpool + sync engine) vs. the async handlers
+(event loop + aiosqlite engine), in one process.
+
+Requests go through the ASGI app in-process with httpx, --concurrency at
+a time; the prediction response cache is disabled so every request reads
+the database. aiosqlite still runs each connection on a thread, so on
+SQLite both paths end up similar; the async path pays off when queries
+wait on the network (asyncpg against Postgres).
+
+Usage:
+    python -m benchmarks.bench_async_reads [--requests 4000] [--concurrency 200]
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+import uuid
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+import controller.prediction as prediction
+from controller.stats import get_prediction_stats, get_prediction_stats_async
+from database.connections import Base, create_db_engine, create_async_db_engine, get_db, get_async_db
+from database.queries import query_save_prediction_with_detections
+from dependencies.auth import resolve_user_id, resolve_user_id_async
+from utils.cache import LRUCache
+
+USER_ID = 1
+
+
+def seed(SessionLocal, predictions: int) -> list:
+    rng = random.Random(0)
+    uids = []
+    with SessionLocal() as db:
+        for _ in range(predictions):
+            uid = str(uuid.uuid4())
+            detections = [
+                {"label": f"label_{rng.randint(0, 20)}", "score": rng.random(), "box": [0, 0, 10, 10]}
+                for _ in range(rng.randint(1, 10))
+            ]
+            query_save_prediction_with_detections(db, uid, "o.jpg", f"{uid}.jpg", USER_ID, detections)
+            uids.append(uid)
+    return uids
+
+
+def build_app(use_async: bool, SessionLocal, AsyncSessionLocal) -> FastAPI:
+    app = FastAPI()
+    if use_async:
+        app.add_api_route("/prediction/{uid}", prediction.get_prediction_by_uid_async, methods=["GET"])
+        app.add_api_route("/stats", get_prediction_stats_async, methods=["GET"])
+
+        async def override_async_db():
+            async with AsyncSessionLocal() as db:
+                yield db
+
+        app.dependency_overrides[get_async_db] = override_async_db
+        app.dependency_overrides[resolve_user_id_async] = lambda: USER_ID
+    else:
+        app.add_api_route("/prediction/{uid}", prediction.get_prediction_by_uid, methods=["GET"])
+        app.add_api_route("/stats", get_prediction_stats, methods=["GET"])
+
+        def override_db():
+            db = SessionLocal()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        app.dependency_overrides[get_db] = override_db
+        app.dependency_overrides[resolve_user_id] = lambda: USER_ID
+    return app
+
+
+async def run_load(app, uids, requests: int, concurrency: int) -> float:
+    rng = random.Random(1)
+    paths = [f"/prediction/{rng.choice(uids)}" if i % 4 else "/stats" for i in range(requests)]
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        async def fetch(path):
+            async with semaphore:
+                response = await client.get(path)
+                response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(fetch(path) for path in paths))
+        return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=4000, help="requests per run")
+    parser.add_argument("--concurrency", type=int, default=200, help="requests in flight")
+    parser.add_argument("--seed", type=int, default=2000, help="predictions stored before the run")
+    args = parser.parse_args()
+
+    prediction.prediction_response_cache = LRUCache(maxsize=0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        engine = create_db_engine(f"sqlite:///{path}")
+        Base.metadata.create_all(bind=engine)
+        SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+        uids = seed(SessionLocal, args.seed)
+
+        async def run_both():
+            async_engine = create_async_db_engine(f"sqlite+aiosqlite:///{path}")
+            AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+            results = {}
+            for name, use_async in (("sync (threadpool)", False), ("async (event loop)", True)):
+                app = build_app(use_async, SessionLocal, AsyncSessionLocal)
+                results[name] = await run_load(app, uids, args.requests, args.concurrency)
+            await async_engine.dispose()
+            return results
+
+        results = asyncio.run(run_both())
+        engine.dispose()
+
+    print(f"{args.requests} requests, {args.concurrency} in flight\n")
+    print(f"{'handlers':<20} | {'seconds':>8} | {'req/s':>8}")
+    for name, elapsed in results.items():
+        print(f"{name:<20} | {elapsed:>8.2f} | {args.requests / elapsed:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
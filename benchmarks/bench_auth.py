@@ -0,0 +1,77 @@
+"""
+Benchmark: per-request cost of resolve_user_id for a Basic-auth user.
+
+Compares the original plain-text comparison, PBKDF2 verification on every
+request (credential cache disabled) and PBKDF2 with the verified-credential
+cache, against an on-disk SQLite users table.
+
+Usage:
+    python -m benchmarks.bench_auth [--requests 200] [--iterations 600000]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from fastapi.security import HTTPBasicCredentials
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import dependencies.auth as auth
+import utils.passwords as passwords
+from database.connections import Base
+from models.Users_model import Users
+
+
+def time_requests(SessionLocal, creds, requests: int, clear_cache: bool) -> float:
+    auth.clear_auth_cache()
+    # One login up front: the cached case reports the steady state
+    with SessionLocal() as db:
+        auth.resolve_user_id(None, credentials=creds, db=db)
+    start = time.perf_counter()
+    for _ in range(requests):
+        if clear_cache:
+            auth.credential_cache.clear()
+        with SessionLocal() as db:
+            auth.resolve_user_id(None, credentials=creds, db=db)
+    return (time.perf_counter() - start) / requests * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200, help="authenticated requests per case")
+    parser.add_argument("--iterations", type=int, default=passwords.PASSWORD_HASH_ITERATIONS, help="PBKDF2 iterations")
+    args = parser.parse_args()
+    passwords.PASSWORD_HASH_ITERATIONS = args.iterations
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+        with SessionLocal() as db:
+            db.add(Users(username="plain", password="secret"))
+            db.add(Users(username="hashed", password=passwords.hash_password("secret")))
+            db.commit()
+
+        # Plain-text rows are upgraded on first login, so pin the original
+        # comparison for the baseline
+        original_verify, original_rehash = auth.verify_password, auth.needs_rehash
+        auth.verify_password = lambda password, stored: password == stored
+        auth.needs_rehash = lambda stored: False
+        plain = time_requests(SessionLocal, HTTPBasicCredentials(username="plain", password="secret"), args.requests, True)
+        auth.verify_password, auth.needs_rehash = original_verify, original_rehash
+
+        creds = HTTPBasicCredentials(username="hashed", password="secret")
+        hashed = time_requests(SessionLocal, creds, args.requests, True)
+        cached = time_requests(SessionLocal, creds, args.requests, False)
+        engine.dispose()
+
+    print(f"PBKDF2-SHA256, {args.iterations:,} iterations, {args.requests} requests per case\n")
+    print(f"{'case':<28} | {'ms/request':>10}")
+    print(f"{'plain text (original)':<28} | {plain:>10.3f}")
+    print(f"{'hashed, no cache':<28} | {hashed:>10.3f}")
+    print(f"{'hashed, credential cache':<28} | {cached:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Benchmark: detection parity and CPU latency of the inference backends.
+
+Runs a fixed image set (beatles.jpeg and the ultralytics sample images, or
+--images) through the model on every backend, exporting ONNX / OpenVINO
+artifacts on first use. Reports median single-image latency and compares
+each backend's detections with torch's: a detection matches when a torch
+detection of the same label overlaps it with IoU >= 0.5.
+
+Usage:
+    python -m benchmarks.bench_backends [--backends torch onnxruntime] [--repeat 10] [--images DIR]
+"""
+import argparse
+import glob
+import os
+import statistics
+import tempfile
+import time
+
+from inference.backends import BACKENDS
+from inference.detections import extract_detections
+from inference.model import ModelHandle
+from inference.preprocess import prepare_image, scale_detections
+
+
+def image_set(directory: str = None) -> list:
+    if directory:
+        return sorted(glob.glob(os.path.join(directory, "*.jp*g")) + glob.glob(os.path.join(directory, "*.png")))
+    from ultralytics.utils import ASSETS
+    return ["beatles.jpeg"] + sorted(glob.glob(os.path.join(str(ASSETS), "*.jpg")))
+
+
+def iou(a, b) -> float:
+    width = max(0.0, min(a[2], b[2]) - max(a[0], b[0]))
+    height = max(0.0, min(a[3], b[3]) - max(a[1], b[1]))
+    overlap = width * height
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - overlap
+    return overlap / union if union else 0.0
+
+
+def match(reference: list, candidate: list) -> list:
+    """
+    (reference, candidate) pairs of the same label with IoU >= 0.5, greedily by IoU.
+    """
+    pairs, unmatched = [], list(reference)
+    for detection in candidate:
+        best = max(
+            (ref for ref in unmatched if ref["label"] == detection["label"]),
+            key=lambda ref: iou(ref["box"], detection["box"]),
+            default=None,
+        )
+        if best is not None and iou(best["box"], detection["box"]) >= 0.5:
+            unmatched.remove(best)
+            pairs.append((best, detection))
+    return pairs
+
+
+def compare(reference: list, candidate: list) -> tuple:
+    """
+    (matched, total, max score difference, max box coordinate difference in px)
+    """
+    pairs = match(reference, candidate)
+    score_diff = max((abs(ref["score"] - detection["score"]) for ref, detection in pairs), default=0.0)
+    box_diff = max((abs(x - y) for ref, detection in pairs for x, y in zip(ref["box"], detection["box"])), default=0.0)
+    return len(pairs), max(len(reference), len(candidate)), score_diff, box_diff
+
+
+def run_backend(backend: str, images: list, imgsz: int, repeat: int, export_dir: str) -> tuple:
+    model = ModelHandle("yolov8n.pt", imgsz=imgsz, backend=backend, export_dir=export_dir)
+    start = time.perf_counter()
+    model.warmup()
+    startup = time.perf_counter() - start
+
+    detections, latencies = [], []
+    for path in images:
+        with open(path, "rb") as f:
+            prepared = prepare_image(f.read(), imgsz)
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = model(prepared.image, device="cpu", imgsz=imgsz, verbose=False)[0]
+            times.append(time.perf_counter() - start)
+        latencies.append(statistics.median(times))
+        detections.append(scale_detections(extract_detections(result, model.names), prepared.scale_x, prepared.scale_y))
+    return startup, statistics.median(latencies) * 1000, detections
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=BACKENDS, help="backends to compare")
+    parser.add_argument("--images", default=None, help="directory of images (default: built-in set)")
+    parser.add_argument("--imgsz", type=int, default=640, help="model input size")
+    parser.add_argument("--repeat", type=int, default=10, help="runs per image (median is reported)")
+    parser.add_argument("--export-dir", default=None, help="reuse exports from here (default: fresh temp dir)")
+    args = parser.parse_args()
+
+    images = image_set(args.images)
+    backends = ["torch"] + [backend for backend in args.backends if backend != "torch"]
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {backend: run_backend(backend, images, args.imgsz, args.repeat, args.export_dir or tmp) for backend in backends}
+
+    print(f"{len(images)} images, imgsz {args.imgsz}\n")
+    print(f"{'backend':<12} | {'load+export+warmup s':>20} | {'median ms':>9} | {'matched':>9} | {'max score diff':>14} | {'max box diff px':>15}")
+    reference = results["torch"][2]
+    for backend, (startup, latency, detections) in results.items():
+        matched = total = 0
+        score_diff = box_diff = 0.0
+        for ref, candidate in zip(reference, detections):
+            m, t, s, b = compare(ref, candidate)
+            matched, total = matched + m, total + t
+            score_diff, box_diff = max(score_diff, s), max(box_diff, b)
+        print(f"{backend:<12} | {startup:>20.2f} | {latency:>9.1f} | {matched:>4}/{total:<4} | {score_diff:>14.4f} | {box_diff:>15.2f}")
+
+
+if __name__ == "__main__":
+    main()
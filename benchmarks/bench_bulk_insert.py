@@ -0,0 +1,77 @@
+"""
+Benchmark: commit-per-box persistence vs. the single-transaction bulk insert.
+
+Writes predictions with 1, 10 and 100 detections into a fresh on-disk
+SQLite database (so fsync cost is included) and reports rows/sec.
+
+Usage:
+    python -m benchmarks.bench_bulk_insert [--predictions 100]
+"""
+import argparse
+import os
+import tempfile
+import time
+import uuid
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database.connections import Base
+from database.queries import (
+    query_save_prediction_session,
+    query_save_detection_object,
+    query_save_prediction_with_detections,
+)
+
+
+def make_detections(count):
+    return [
+        {"label": "person", "score": 0.5 + (i % 50) / 100, "box": [i, i, i + 10.5, i + 20.25]}
+        for i in range(count)
+    ]
+
+
+def save_per_row(db, uid, detections):
+    query_save_prediction_session(db, uid, "original.jpg", "predicted.jpg", 1)
+    for detection in detections:
+        query_save_detection_object(db, uid, detection["label"], detection["score"], detection["box"])
+
+
+def save_bulk(db, uid, detections):
+    query_save_prediction_with_detections(db, uid, "original.jpg", "predicted.jpg", 1, detections)
+
+
+def run(save_fn, detections_per_image, predictions):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+        detections = make_detections(detections_per_image)
+
+        db = SessionLocal()
+        start = time.perf_counter()
+        for _ in range(predictions):
+            save_fn(db, str(uuid.uuid4()), detections)
+        elapsed = time.perf_counter() - start
+        db.close()
+        engine.dispose()
+
+    # One session row plus its detections per prediction
+    rows = predictions * (detections_per_image + 1)
+    return rows / elapsed, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--predictions", type=int, default=100, help="predictions written per scenario")
+    args = parser.parse_args()
+
+    print(f"{'detections':>10} | {'per-row rows/s':>15} | {'bulk rows/s':>12} | {'speedup':>7}")
+    for detections_per_image in (1, 10, 100):
+        per_row, _ = run(save_per_row, detections_per_image, args.predictions)
+        bulk, _ = run(save_bulk, detections_per_image, args.predictions)
+        print(f"{detections_per_image:>10} | {per_row:>15,.0f} | {bulk:>12,.0f} | {bulk / per_row:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
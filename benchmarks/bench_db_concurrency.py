@@ -0,0 +1,146 @@
+"""
+Benchmark: mixed read/write load on SQLite with the default engine
+(rollback journal, default pool) vs. create_db_engine (WAL,
+synchronous=NORMAL, busy timeout, mmap, sized pool).
+
+Writer threads save predictions with detections, reader threads fetch
+predictions and run the score search, all at once for --seconds.
+
+Usage:
+    python -m benchmarks.bench_db_concurrency [--writers 4] [--readers 16] [--seconds 10]
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+import uuid
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from database.connections import Base, create_db_engine
+from database.queries import (
+    query_save_prediction_with_detections,
+    query_get_prediction_with_detections,
+    query_prediction_sessions_by_min_score,
+)
+
+USER_ID = 1
+
+
+def detections(rng):
+    return [
+        {"label": f"label_{rng.randint(0, 20)}", "score": rng.random(), "box": [0, 0, 10, 10]}
+        for _ in range(rng.randint(1, 20))
+    ]
+
+
+def seed(SessionLocal, predictions: int) -> list:
+    rng = random.Random(0)
+    uids = []
+    with SessionLocal() as db:
+        for _ in range(predictions):
+            uid = str(uuid.uuid4())
+            query_save_prediction_with_detections(db, uid, "o.jpg", f"{uid}.jpg", USER_ID, detections(rng))
+            uids.append(uid)
+    return uids
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def run_load(SessionLocal, uids, writers: int, readers: int, seconds: float) -> dict:
+    stop = time.perf_counter() + seconds
+    latencies = {"write": [], "read": []}
+    errors = {"write": 0, "read": 0}
+    lock = threading.Lock()
+
+    def write(worker):
+        rng = random.Random(worker)
+        while time.perf_counter() < stop:
+            uid = str(uuid.uuid4())
+            start = time.perf_counter()
+            try:
+                with SessionLocal() as db:
+                    query_save_prediction_with_detections(db, uid, "o.jpg", f"{uid}.jpg", USER_ID, detections(rng))
+                kind, ok = "write", True
+            except OperationalError:
+                kind, ok = "write", False
+            record(kind, ok, time.perf_counter() - start)
+
+    def read(worker):
+        rng = random.Random(1000 + worker)
+        while time.perf_counter() < stop:
+            start = time.perf_counter()
+            try:
+                with SessionLocal() as db:
+                    query_get_prediction_with_detections(db, rng.choice(uids), USER_ID)
+                    query_prediction_sessions_by_min_score(db, 0.99, USER_ID, limit=100)
+                ok = True
+            except OperationalError:
+                ok = False
+            record("read", ok, time.perf_counter() - start)
+
+    def record(kind, ok, elapsed):
+        with lock:
+            if ok:
+                latencies[kind].append(elapsed * 1000)
+            else:
+                errors[kind] += 1
+
+    threads = [threading.Thread(target=write, args=(i,)) for i in range(writers)]
+    threads += [threading.Thread(target=read, args=(i,)) for i in range(readers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return {
+        kind: {
+            "per_sec": len(latencies[kind]) / seconds,
+            "p50": percentile(latencies[kind], 0.5),
+            "p95": percentile(latencies[kind], 0.95),
+            "errors": errors[kind],
+        } for kind in ("write", "read")
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--writers", type=int, default=4, help="concurrent writer threads")
+    parser.add_argument("--readers", type=int, default=16, help="concurrent reader threads")
+    parser.add_argument("--seconds", type=float, default=10, help="duration of each run")
+    parser.add_argument("--seed", type=int, default=1000, help="predictions stored before the run")
+    args = parser.parse_args()
+
+    configs = {
+        "default engine": lambda url: create_engine(url, connect_args={"check_same_thread": False}),
+        "create_db_engine (WAL)": create_db_engine,
+    }
+    results = {}
+    for name, make_engine in configs.items():
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = make_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+            Base.metadata.create_all(bind=engine)
+            SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+            uids = seed(SessionLocal, args.seed)
+            results[name] = run_load(SessionLocal, uids, args.writers, args.readers, args.seconds)
+            engine.dispose()
+
+    print(f"{args.writers} writers, {args.readers} readers, {args.seconds:.0f}s per run\n")
+    print(f"{'engine':<24} | {'op':<5} | {'ops/s':>8} | {'p50 ms':>8} | {'p95 ms':>8} | {'errors':>6}")
+    for name, result in results.items():
+        for kind in ("write", "read"):
+            row = result[kind]
+            print(f"{name:<24} | {kind:<5} | {row['per_sec']:>8.1f} | {row['p50']:>8.2f} | {row['p95']:>8.2f} | {row['errors']:>6}")
+
+
+if __name__ == "__main__":
+    main()
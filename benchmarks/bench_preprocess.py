@@ -0,0 +1,78 @@
+"""
+Benchmark: decode + preprocessing latency against input resolution.
+
+For JPEGs of increasing size, compares decoding at full resolution
+(what /predict did before) with
+inference.preprocess.prepare_image, which decodes JPEGs at reduced scale
+and resizes to --imgsz. With --model, also times a forward pass of the
+YOLO model on each result (the model letterboxes to --imgsz either way).
+
+Usage:
+    python -m benchmarks.bench_preprocess [--imgsz 640] [--repeat 20] [--model yolov8n.pt]
+"""
+import argparse
+import io
+import time
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from inference.preprocess import prepare_image
+
+RESOLUTIONS = [(640, 480), (1280, 960), (1920, 1080), (3000, 2000), (4032, 3024), (6000, 4000)]
+
+
+def jpeg(width: int, height: int) -> bytes:
+    # Noise, so the encoder can't shortcut flat areas the way it could for a blank image
+    rng = np.random.default_rng(0)
+    pixels = rng.integers(0, 256, (height // 8, width // 8, 3), dtype=np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).resize((width, height), Image.BILINEAR).save(buffer, format="JPEG", quality=90)
+    return buffer.getvalue()
+
+
+def full_decode(data: bytes) -> np.ndarray:
+    return cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+
+
+def best_ms(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--imgsz", type=int, default=640, help="model input size")
+    parser.add_argument("--repeat", type=int, default=20, help="runs per case (best is reported)")
+    parser.add_argument("--model", default=None, help="also time inference with these YOLO weights")
+    args = parser.parse_args()
+
+    model = None
+    if args.model:
+        from ultralytics import YOLO
+        model = YOLO(args.model)
+
+    header = f"{'resolution':>11} | {'KiB':>6} | {'full decode ms':>14} | {'prepare ms':>10} | {'speedup':>7}"
+    if model:
+        header += f" | {'full+model ms':>13} | {'prep+model ms':>13}"
+    print(header)
+
+    for width, height in RESOLUTIONS:
+        data = jpeg(width, height)
+        full = best_ms(lambda: full_decode(data), args.repeat)
+        prepared = best_ms(lambda: prepare_image(data, args.imgsz), args.repeat)
+        line = f"{width:>5}x{height:<5} | {len(data) // 1024:>6} | {full:>14.2f} | {prepared:>10.2f} | {full / prepared:>6.1f}x"
+        if model:
+            full_model = best_ms(lambda: model(full_decode(data), device="cpu", imgsz=args.imgsz, verbose=False), args.repeat)
+            prep_model = best_ms(lambda: model(prepare_image(data, args.imgsz).image, device="cpu", imgsz=args.imgsz, verbose=False), args.repeat)
+            line += f" | {full_model:>13.2f} | {prep_model:>13.2f}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark: INT8 quantized models against the FP32 ONNX model.
+
+Exports yolov8n to ONNX, builds the dynamic and static INT8 variants
+(static is calibrated on the first --calibration images of --images, by
+default the stored uploads in uploads/original) and runs the remaining
+images through every variant. Reports, against FP32:
+
+* recall / precision - share of FP32 detections reproduced / share of
+  INT8 detections that FP32 also made (same label, IoU >= 0.5)
+* max score and mean box coordinate differences of matched detections
+* throughput at batch size 1 and --batch, and the model file size
+
+Usage:
+    python -m benchmarks.bench_quantization [--images uploads/original] [--calibration 50] [--batch 8]
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from benchmarks.bench_backends import match
+from inference.backends import export_weights
+from inference.model import ModelHandle
+from inference.params import InferenceParams, predict_with
+from inference.preprocess import prepare_image, scale_detections
+from inference.quantization import calibration_images, quantize_model, quantized_path
+
+VARIANTS = (None, "dynamic", "static")
+
+
+def throughput(model, images: list, params: InferenceParams, batch: int) -> float:
+    start = time.perf_counter()
+    for i in range(0, len(images), batch):
+        predict_with(model, images[i:i + batch], params)
+    return len(images) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", default="uploads/original", help="directory of images")
+    parser.add_argument("--limit", type=int, default=300, help="images to use in total")
+    parser.add_argument("--calibration", type=int, default=50, help="images used to calibrate static INT8")
+    parser.add_argument("--imgsz", type=int, default=640, help="model input size")
+    parser.add_argument("--batch", type=int, default=8, help="batch size for the batched throughput run")
+    args = parser.parse_args()
+
+    paths = calibration_images(args.images, args.limit)
+    calibration, evaluation = paths[:args.calibration], paths[args.calibration:]
+    if not calibration or not evaluation:
+        parser.error(f"need more than {args.calibration} images in {args.images}, found {len(paths)}")
+
+    images = []
+    for path in evaluation:
+        with open(path, "rb") as f:
+            images.append(prepare_image(f.read(), args.imgsz))
+    params = InferenceParams("yolov8n.pt", imgsz=args.imgsz)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as export_dir:
+        fp32_path = export_weights("yolov8n.pt", "onnxruntime", args.imgsz, export_dir)
+        quantize_model(fp32_path, "static", args.imgsz, calibration_paths=calibration)
+
+        for variant in VARIANTS:
+            model = ModelHandle("yolov8n.pt", imgsz=args.imgsz, backend="onnxruntime", export_dir=export_dir, quantization=variant)
+            model.warmup()
+            detections = [
+                scale_detections(predict_with(model, [image.image], params)[0], image.scale_x, image.scale_y)
+                for image in images
+            ]
+            size = os.path.getsize(quantized_path(fp32_path, variant) if variant else fp32_path) / 2 ** 20
+            batched = [image.image for image in images]
+            results[variant or "fp32"] = (
+                detections,
+                throughput(model, batched, params, 1),
+                throughput(model, batched, params, args.batch),
+                size,
+            )
+
+    print(f"{len(calibration)} calibration images, {len(evaluation)} evaluation images, imgsz {args.imgsz}\n")
+    print(f"{'model':<8} | {'MiB':>5} | {'recall':>6} | {'precision':>9} | {'max score diff':>14} | {'mean box diff px':>16} | {'img/s b1':>8} | {f'img/s b{args.batch}':>9}")
+    reference = results["fp32"][0]
+    for name, (detections, single, batched, size) in results.items():
+        pairs = [pair for ref, candidate in zip(reference, detections) for pair in match(ref, candidate)]
+        total_ref = sum(len(ref) for ref in reference)
+        total_candidate = sum(len(candidate) for candidate in detections)
+        score_diff = max((abs(a["score"] - b["score"]) for a, b in pairs), default=0.0)
+        box_diff = statistics.mean([abs(x - y) for a, b in pairs for x, y in zip(a["box"], b["box"])] or [0.0])
+        print(
+            f"{name:<8} | {size:>5.1f} | {len(pairs) / max(total_ref, 1):>6.3f} | {len(pairs) / max(total_candidate, 1):>9.3f} | "
+            f"{score_diff:>14.4f} | {box_diff:>16.2f} | {single:>8.1f} | {batched:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
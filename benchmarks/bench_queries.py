@@ -0,0 +1,145 @@
+"""
+Benchmark: every query function in database.queries against a seeded DB,
+before and after the schema migration creates the indexes.
+
+Seeds an on-disk SQLite database with --detections detection rows (about
+ten per prediction session, spread over --users users and 60 days), drops
+the secondary indexes, times each query, runs database.migrations and
+times them again.
+
+Usage:
+    python -m benchmarks.bench_queries [--detections 2000000] [--repeat 5]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from database.connections import Base
+from database.migrations import apply_migrations
+from database import queries
+from models.PredictionSession_model import PredictionSession
+from models.DetectionObjects_model import DetectionObject
+
+LABELS = [f"label_{i}" for i in range(80)]
+CHUNK = 50000
+
+
+def seed(engine, detections: int, users: int):
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    sessions_total = max(1, detections // 10)
+    session_rows, detection_rows = [], []
+    sample = None
+
+    with engine.begin() as conn:
+        for i in range(sessions_total):
+            uid = str(uuid.uuid4())
+            user_id = rng.randint(1, users)
+            session_rows.append({
+                "uid": uid,
+                "timestamp": now - timedelta(seconds=rng.randint(0, 60 * 24 * 3600)),
+                "original_image": f"uploads/original/{uid}.jpg",
+                "predicted_image": f"uploads/predicted/{uid}.jpg",
+                "user_id": user_id,
+            })
+            for _ in range(10):
+                x, y = rng.uniform(0, 600), rng.uniform(0, 400)
+                detection_rows.append({
+                    "prediction_uid": uid,
+                    "label": LABELS[min(int(rng.expovariate(0.15)), len(LABELS) - 1)],
+                    "score": rng.random(),
+                    **queries.box_columns([x, y, x + rng.uniform(5, 200), y + rng.uniform(5, 200)]),
+                })
+            if sample is None:
+                sample = (uid, user_id)
+            if len(detection_rows) >= CHUNK:
+                conn.execute(insert(PredictionSession), session_rows)
+                conn.execute(insert(DetectionObject), detection_rows)
+                session_rows, detection_rows = [], []
+        if session_rows:
+            conn.execute(insert(PredictionSession), session_rows)
+            conn.execute(insert(DetectionObject), detection_rows)
+    return sample
+
+
+def drop_secondary_indexes(engine):
+    for table in (PredictionSession.__table__, DetectionObject.__table__):
+        for index in table.indexes:
+            index.drop(bind=engine, checkfirst=True)
+
+
+def query_cases(uid, user_id):
+    return {
+        "get_prediction_by_uid": lambda db: queries.query_get_prediction_by_uid(db, uid, user_id),
+        "get_detection_objects_by_prediction_uid": lambda db: queries.query_get_detection_objects_by_prediction_uid(db, uid),
+        "get_prediction_with_detections": lambda db: queries.query_get_prediction_with_detections(db, uid, user_id),
+        "prediction_uids_by_label_and_user": lambda db: queries.query_prediction_uids_by_label_and_user(db, "label_10", user_id),
+        "prediction_sessions_by_min_score": lambda db: queries.query_prediction_sessions_by_min_score(db, 0.99, user_id),
+        "prediction_sessions_by_min_area": lambda db: queries.query_prediction_sessions_by_min_area(db, 39000, user_id),
+        "prediction_sessions_in_region": lambda db: queries.query_prediction_sessions_in_region(db, 0, 0, 100, 100, user_id),
+        "predicted_image_by_uid": lambda db: queries.query_predicted_image_by_uid(db, uid),
+        "render_data_by_predicted_image": lambda db: queries.query_render_data_by_predicted_image(db, f"uploads/predicted/{uid}.jpg"),
+        "count_predictions_by_original_image": lambda db: queries.query_count_predictions_by_original_image(db, f"uploads/original/{uid}.jpg"),
+        "total_predictions_last_week": lambda db: queries.query_total_predictions_last_week(db),
+        "unique_labels_last_7_days": lambda db: queries.query_unique_labels_last_7_days(db),
+        "prediction_stats": lambda db: queries.query_prediction_stats(db, user_id),
+    }
+
+
+def time_queries(SessionLocal, cases, repeat: int) -> dict:
+    timings = {}
+    for name, case in cases.items():
+        best = float("inf")
+        for _ in range(repeat):
+            db = SessionLocal()
+            start = time.perf_counter()
+            case(db)
+            best = min(best, time.perf_counter() - start)
+            db.close()
+        timings[name] = best * 1000
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--detections", type=int, default=2000000, help="detection rows to seed")
+    parser.add_argument("--users", type=int, default=100, help="distinct users owning the predictions")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per query (best is reported)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        drop_secondary_indexes(engine)
+        SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+
+        start = time.perf_counter()
+        uid, user_id = seed(engine, args.detections, args.users)
+        with SessionLocal() as db:
+            queries.query_rebuild_rollups(db)
+        print(f"Seeded {args.detections:,} detections in {time.perf_counter() - start:.1f}s")
+
+        cases = query_cases(uid, user_id)
+        before = time_queries(SessionLocal, cases, args.repeat)
+
+        start = time.perf_counter()
+        created = apply_migrations(engine)
+        print(f"Migration created {len(created)} indexes in {time.perf_counter() - start:.1f}s\n")
+
+        after = time_queries(SessionLocal, cases, args.repeat)
+        engine.dispose()
+
+    print(f"{'query':<42} | {'no index ms':>11} | {'indexed ms':>10} | {'speedup':>8}")
+    for name in cases:
+        print(f"{name:<42} | {before[name]:>11.2f} | {after[name]:>10.2f} | {before[name] / max(after[name], 1e-6):>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Benchmark: service startup and first-request latency.
+
+Each measurement runs in a fresh interpreter, so nothing is already
+imported or cached:
+
+* import app - what the web process (and every test module) pays before
+  it can answer /health
+* model load - importing torch/ultralytics and building the YOLO model
+* warmup - the blank-image pass run by the startup hook
+* first/second inference - one image through the model right after a cold
+  load, and again once it has run before
+
+Usage:
+    python -m benchmarks.bench_startup [--runs 3] [--imgsz 640]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+CHILD = """
+import json, sys, time
+import numpy as np
+start = time.perf_counter()
+import app
+from controller.prediction import model
+timings = {"import app": time.perf_counter() - start, "torch imported at import": "torch" in sys.modules}
+
+start = time.perf_counter()
+model.load()
+timings["model load"] = time.perf_counter() - start
+
+image = np.random.default_rng(0).integers(0, 256, ({imgsz}, {imgsz}, 3), dtype=np.uint8)
+for name in ("first inference", "second inference"):
+    start = time.perf_counter()
+    model(image, device="cpu", imgsz={imgsz}, verbose=False)
+    timings[name] = time.perf_counter() - start
+
+start = time.perf_counter()
+model.warmup()
+timings["warmup (warm model)"] = time.perf_counter() - start
+print(json.dumps(timings))
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3, help="fresh interpreters to start (median is reported)")
+    parser.add_argument("--imgsz", type=int, default=640, help="model input size")
+    args = parser.parse_args()
+
+    runs = []
+    for _ in range(args.runs):
+        output = subprocess.run(
+            [sys.executable, "-c", CHILD.replace("{imgsz}", str(args.imgsz))],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+
+    print(f"torch imported by `import app`: {runs[0]['torch imported at import']}\n")
+    print(f"{'step':<22} | {'median ms':>9}")
+    for name in ("import app", "model load", "first inference", "second inference", "warmup (warm model)"):
+        print(f"{name:<22} | {statistics.median(run[name] for run in runs) * 1000:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
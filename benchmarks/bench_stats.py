@@ -0,0 +1,103 @@
+"""
+Benchmark: /stats aggregation over raw detections in Python (the original
+implementation) vs. reading the hourly rollups, as the number of a user's
+recent detections grows.
+
+Usage:
+    python -m benchmarks.bench_stats [--sizes 1000 10000 100000 500000]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, insert, func
+from sqlalchemy.orm import sessionmaker
+
+from database.connections import Base
+from database.queries import query_prediction_stats, query_rebuild_rollups
+from models.PredictionSession_model import PredictionSession
+from models.DetectionObjects_model import DetectionObject
+
+LABELS = [f"label_{i}" for i in range(80)]
+
+
+def python_prediction_stats(db, user_id):
+    """
+    The original implementation: pull every score and label into Python.
+    """
+    one_week_ago = datetime.utcnow() - timedelta(days=7)
+    recent = (PredictionSession.user_id == user_id, PredictionSession.timestamp >= one_week_ago)
+    total_predictions = db.query(func.count(PredictionSession.uid)).filter(*recent).scalar()
+    scores = [
+        s[0] for s in db.query(DetectionObject.score)
+        .join(PredictionSession, DetectionObject.prediction_uid == PredictionSession.uid)
+        .filter(*recent).all()
+    ]
+    avg_score = round(sum(scores) / len(scores), 3) if scores else 0.0
+    labels = (
+        db.query(DetectionObject.label)
+        .join(PredictionSession, DetectionObject.prediction_uid == PredictionSession.uid)
+        .filter(*recent).all()
+    )
+    return total_predictions, avg_score, Counter([l[0] for l in labels]).most_common(5)
+
+
+def seed(engine, detections: int):
+    rng = random.Random(7)
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        for start in range(0, detections, 10000):
+            sessions, objects = [], []
+            for _ in range(start, min(start + 10000, detections), 10):
+                uid = str(uuid.uuid4())
+                sessions.append({"uid": uid, "user_id": 1, "timestamp": now - timedelta(hours=rng.randint(0, 150))})
+                objects.extend(
+                    {"prediction_uid": uid, "label": rng.choice(LABELS), "score": rng.random(), "x1": 0.0, "y1": 0.0, "x2": 1.0, "y2": 1.0, "area": 1.0}
+                    for _ in range(10)
+                )
+            conn.execute(insert(PredictionSession), sessions)
+            conn.execute(insert(DetectionObject), objects)
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000, 500000], help="recent detections for the user")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement (best is reported)")
+    args = parser.parse_args()
+
+    print(f"{'detections':>10} | {'python ms':>10} | {'rollup ms':>9} | {'speedup':>7} | same")
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+            Base.metadata.create_all(bind=engine)
+            seed(engine, size)
+            db = sessionmaker(bind=engine)()
+            query_rebuild_rollups(db)
+
+            python_ms, python_result = best_of(lambda: python_prediction_stats(db, 1), args.repeat)
+            rollup_ms, rollup_result = best_of(lambda: query_prediction_stats(db, 1), args.repeat)
+
+            # Labels tied at the cut-off may differ: the old order was arbitrary
+            same = python_result[:2] == rollup_result[:2] and \
+                [count for _, count in python_result[2]] == [count for _, count in rollup_result[2]]
+            print(f"{size:>10,} | {python_ms:>10.1f} | {rollup_ms:>9.1f} | {python_ms / rollup_ms:>6.1f}x | {same}")
+            db.close()
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
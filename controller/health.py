@@ -1,4 +1,6 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Response, status
+
+from controller.prediction import inference_ready
 
 router = APIRouter()
 
@@ -7,4 +9,14 @@ def health():
     """
     Health check endpoint
     """
-    return {"status": "ok"}
\ No newline at end of file
+    return {"status": "ok"}
+
+@router.get("/ready")
+def ready(response: Response):
+    """
+    Readiness check: 503 until the model is loaded and warmed up
+    """
+    if not inference_ready():
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        return {"status": "loading"}
+    return {"status": "ready"}
@@ -4,17 +4,45 @@ from fastapi.responses import FileResponse
 from dependencies.auth import resolve_user_id
 from fastapi import Depends
 from fastapi import APIRouter
+from database.queries import *
+from database.connections import get_db
+from inference.annotate import render_annotated_image
 
 router = APIRouter()
 
+def ensure_predicted_image(db: Session, predicted_path: str) -> bool:
+    """
+    Make sure the annotated image exists on disk.
+    Annotated images are not drawn by /predict; the first request for one
+    renders it from the original image and the stored detection boxes,
+    and later requests are served from the cached file.
+    Returns False if the prediction or its original image is missing.
+    """
+    if os.path.exists(predicted_path):
+        return True
+
+    render_data = query_render_data_by_predicted_image(db, predicted_path)
+    if not render_data:
+        return False
+
+    original_path, detections = render_data
+    if not original_path or not os.path.exists(original_path):
+        return False
+
+    render_annotated_image(original_path, detections, predicted_path)
+    return True
+
 @router.get("/image/{type}/{filename}")
-def get_image(type: str, filename: str, user_id: int = Depends(resolve_user_id)):
+def get_image(type: str, filename: str, user_id: int = Depends(resolve_user_id), db: Session = Depends(get_db)):
     """
     Get image by type and filename
     """
     if type not in ["original", "predicted"]:
         raise HTTPException(status_code=400, detail="Invalid image type")
     path = os.path.join("uploads", type, filename)
-    if not os.path.exists(path):
+    if type == "predicted":
+        if not ensure_predicted_image(db, path):
+            raise HTTPException(status_code=404, detail="Image not found")
+    elif not os.path.exists(path):
         raise HTTPException(status_code=404, detail="Image not found")
     return FileResponse(path)
@@ -1,14 +1,27 @@
 from fastapi import Depends
 from fastapi import APIRouter
 from database.queries import *
-from database.connections import get_db
+from database.async_queries import query_unique_labels_last_7_days_async
+from database.connections import get_db, get_async_db, DB_ASYNC
 
 router = APIRouter()
 
-@router.get("/labels")
 def get_unique_labels_last_week(db: Session=Depends(get_db)):
     """
     Return all unique object labels detected in the last 7 days
     """
     labels = query_unique_labels_last_7_days(db)
-    return {"labels": labels}
\ No newline at end of file
+    return {"labels": labels}
+
+async def get_unique_labels_last_week_async(db=Depends(get_async_db)):
+    """
+    get_unique_labels_last_week on the asyncio engine
+    """
+    labels = await query_unique_labels_last_7_days_async(db)
+    return {"labels": labels}
+
+router.add_api_route(
+    "/labels",
+    get_unique_labels_last_week_async if DB_ASYNC else get_unique_labels_last_week,
+    methods=["GET"],
+)
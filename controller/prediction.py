@@ -1,127 +1,825 @@
-from fastapi import UploadFile, File, HTTPException, status, Request
-from fastapi.responses import FileResponse, Response
-from ultralytics import YOLO
-from PIL import Image
+from fastapi import UploadFile, File, HTTPException, status, Request, Query
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from typing import List, Optional
+import asyncio
+import hashlib
+import json
+import logging
 import os
 import uuid
-import shutil
 import time
 
-# Disable GPU usage
-import torch
-torch.cuda.is_available = lambda: False
 
-
-from dependencies.auth import resolve_user_id
+from dependencies.auth import resolve_user_id, resolve_user_id_async
 from fastapi import Depends
 from fastapi import APIRouter
 from database.queries import *
-from database.connections import get_db
+from database.async_queries import query_get_prediction_with_detections_async
+from database.connections import get_db, get_async_db, SessionLocal, DB_ASYNC
+from inference.scheduler import BatchScheduler
+from inference.workers import ProcessPoolBackend
+from inference.jobs import JobQueue, DONE
+from inference.model import ModelHandle
+from inference.params import InferenceParams, predict_with
+from inference.registry import ModelRegistry
+from inference.preprocess import prepare_image, scale_detections
+from inference.video import probe_video, sample_frames, detect_frames, spool_detections, read_spool
+from controller.image import ensure_predicted_image
+from utils.cache import LRUCache
+from utils.pagination import encode_cursor, decode_cursor
+from utils.uploads import (
+    MAX_UPLOAD_BYTES, MAX_BATCH_UPLOAD_BYTES, MAX_BATCH_IMAGES, MAX_VIDEO_UPLOAD_BYTES,
+    read_upload, save_upload, image_extension, video_extension, expand_archive, too_large,
+)
+
+logger = logging.getLogger(__name__)
+
 UPLOAD_DIR = "uploads/original"
 PREDICTED_DIR = "uploads/predicted"
 DB_PATH = "predictions.db"
 
+# Micro-batching: concurrent /predict calls share one forward pass
+PREDICT_MAX_BATCH_SIZE = int(os.getenv("PREDICT_MAX_BATCH_SIZE", "8"))
+PREDICT_MAX_WAIT_MS = float(os.getenv("PREDICT_MAX_WAIT_MS", "10"))
+
+# Optional process-pool backend: 0 keeps inference in the web process
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "0"))
+INFERENCE_THREADS_PER_WORKER = int(os.getenv(
+    "INFERENCE_THREADS_PER_WORKER",
+    str(max(1, (os.cpu_count() or 1) // max(1, INFERENCE_WORKERS)))
+))
+
+# Background jobs behind POST /predict/async
+ASYNC_JOB_WORKERS = int(os.getenv("ASYNC_JOB_WORKERS", "2"))
+ASYNC_JOB_QUEUE_SIZE = int(os.getenv("ASYNC_JOB_QUEUE_SIZE", "64"))
+
+# /predict/batch images decoded and in flight at once, bounding its memory use
+PREDICT_BATCH_CONCURRENCY = int(os.getenv("PREDICT_BATCH_CONCURRENCY", str(2 * PREDICT_MAX_BATCH_SIZE)))
+
+# /predict/video sampling defaults (0 = no fps limit), the most frames run per
+# video, and frames decoded and waiting for the model at once
+VIDEO_FRAME_STRIDE = int(os.getenv("VIDEO_FRAME_STRIDE", "1"))
+VIDEO_MAX_FPS = float(os.getenv("VIDEO_MAX_FPS", "0"))
+VIDEO_MAX_FRAMES = int(os.getenv("VIDEO_MAX_FRAMES", "3000"))
+VIDEO_FRAMES_IN_FLIGHT = int(os.getenv("VIDEO_FRAMES_IN_FLIGHT", str(2 * PREDICT_MAX_BATCH_SIZE)))
+
+# Content-addressed detection cache for repeated uploads (0 disables it)
+PREDICT_CACHE_SIZE = int(os.getenv("PREDICT_CACHE_SIZE", "1024"))
+MODEL_ID = "yolov8n.pt"
+
+# Model input size; uploads are decoded and resized to it before inference
+MODEL_IMGSZ = int(os.getenv("MODEL_IMGSZ", "640"))
+
+# torch, onnxruntime or openvino; exported models are cached in MODEL_EXPORT_DIR
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "torch").lower()
+MODEL_EXPORT_DIR = os.getenv("MODEL_EXPORT_DIR", "weights")
+# dynamic or static INT8 (onnxruntime only); unset runs the FP32 model
+MODEL_QUANTIZATION = os.getenv("MODEL_QUANTIZATION", "").lower() or None
+
+# Server defaults for the per-request ?imgsz=&conf=&iou=&max_det= parameters
+MODEL_CONF = float(os.getenv("MODEL_CONF", "0.25"))
+MODEL_IOU = float(os.getenv("MODEL_IOU", "0.7"))
+MODEL_MAX_DET = int(os.getenv("MODEL_MAX_DET", "300"))
+MODEL_IMGSZ_MAX = int(os.getenv("MODEL_IMGSZ_MAX", "1280"))
+
+# Weights a request may pick with ?model=, and how many besides MODEL_ID stay loaded
+MODEL_VARIANTS = [name.strip() for name in os.getenv("MODEL_VARIANTS", f"{MODEL_ID},yolov8s.pt").split(",") if name.strip()]
+MODEL_REGISTRY_SIZE = int(os.getenv("MODEL_REGISTRY_SIZE", "1"))
+
+# Load and warm the model in the background at startup; otherwise on first use
+MODEL_WARMUP = os.getenv("MODEL_WARMUP", "true").lower() in ("1", "true", "yes")
+
+# GET /prediction/{uid} bodies keyed by (uid, user_id), dropped on delete.
+# The TTL bounds staleness when another process deletes the prediction.
+PREDICTION_RESPONSE_CACHE_SIZE = int(os.getenv("PREDICTION_RESPONSE_CACHE_SIZE", "1024"))
+PREDICTION_RESPONSE_CACHE_TTL = float(os.getenv("PREDICTION_RESPONSE_CACHE_TTL", "60"))
+# Only complete bodies this small are cached, so the cache stays bounded in bytes
+PREDICTION_RESPONSE_CACHE_MAX_DETECTIONS = int(os.getenv("PREDICTION_RESPONSE_CACHE_MAX_DETECTIONS", "1000"))
+
+# Detections per GET /prediction/{uid} page (video predictions can have far more)
+DETECTIONS_PAGE_SIZE = int(os.getenv("DETECTIONS_PAGE_SIZE", "1000"))
+DETECTIONS_PAGE_SIZE_MAX = 10000
+
+# Label/score search pages
+PAGE_SIZE_DEFAULT = 100
+PAGE_SIZE_MAX = 1000
+
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 os.makedirs(PREDICTED_DIR, exist_ok=True)
 
-# Download the AI model (tiny model ~6MB)
-model = YOLO("yolov8n.pt")
+# The AI model (tiny model ~6MB), downloaded and loaded on first use
+model = ModelHandle(
+    MODEL_ID, imgsz=MODEL_IMGSZ, backend=INFERENCE_BACKEND, export_dir=MODEL_EXPORT_DIR, quantization=MODEL_QUANTIZATION,
+)
+# Other variants from MODEL_VARIANTS, loaded when a request asks for them
+model_registry = ModelRegistry(
+    MODEL_REGISTRY_SIZE, imgsz=MODEL_IMGSZ, backend=INFERENCE_BACKEND, export_dir=MODEL_EXPORT_DIR, quantization=MODEL_QUANTIZATION,
+)
+
+default_params = InferenceParams(MODEL_ID, MODEL_IMGSZ, MODEL_CONF, MODEL_IOU, MODEL_MAX_DET)
+
+def run_model_batch(items):
+    """
+    Run a single forward pass over a batch of (image, InferenceParams) pairs
+    sharing the same params, in this process.
+    Returns one list of detections per image.
+    """
+    params = items[0][1]
+    batch_model = model if params.model == MODEL_ID else model_registry.get(params.model)
+    return predict_with(batch_model, [image for image, _ in items], params)
+
+def batch_group(item):
+    return item[1]
+
+if INFERENCE_WORKERS > 0:
+    inference_backend = ProcessPoolBackend(
+        MODEL_ID, INFERENCE_WORKERS, INFERENCE_THREADS_PER_WORKER, MODEL_IMGSZ,
+        backend=INFERENCE_BACKEND, export_dir=MODEL_EXPORT_DIR, quantization=MODEL_QUANTIZATION,
+        max_models=MODEL_REGISTRY_SIZE,
+    )
+    scheduler = BatchScheduler(
+        inference_backend.predict_batch,
+        max_batch_size=PREDICT_MAX_BATCH_SIZE,
+        max_wait_ms=PREDICT_MAX_WAIT_MS,
+        max_concurrent_batches=INFERENCE_WORKERS,
+        group_by=batch_group,
+    )
+else:
+    scheduler = BatchScheduler(
+        run_model_batch,
+        max_batch_size=PREDICT_MAX_BATCH_SIZE,
+        max_wait_ms=PREDICT_MAX_WAIT_MS,
+        group_by=batch_group,
+    )
+
+def warmup_inference():
+    """
+    Load and warm whichever model serves /predict: the in-process one or the worker pool's.
+    Runs on a background thread, so a failure is logged rather than raised;
+    the model is then loaded again by the first prediction.
+    """
+    try:
+        if INFERENCE_WORKERS > 0:
+            inference_backend.warmup(default_params)
+        else:
+            model.warmup()
+    except Exception:
+        logger.exception("Model warmup failed, the model will be loaded on the first prediction")
+
+def inference_ready() -> bool:
+    return (inference_backend if INFERENCE_WORKERS > 0 else model).ready
+
+jobs = JobQueue(workers=ASYNC_JOB_WORKERS, max_queued=ASYNC_JOB_QUEUE_SIZE)
+
+prediction_cache = LRUCache(maxsize=PREDICT_CACHE_SIZE)
+prediction_response_cache = LRUCache(maxsize=PREDICTION_RESPONSE_CACHE_SIZE, ttl=PREDICTION_RESPONSE_CACHE_TTL)
 
 router = APIRouter()
 
+def content_digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+def cache_key(digest: str, params: InferenceParams):
+    """
+    Detections depend on the image bytes, the backend (and quantization) and the model and thresholds that produced them
+    """
+    return (digest, INFERENCE_BACKEND, MODEL_QUANTIZATION, params)
+
+def inference_params(
+    model: Optional[str]=Query(None, description="Model variant, one of MODEL_VARIANTS"),
+    imgsz: Optional[int]=Query(None, ge=32, description="Model input size, a multiple of 32"),
+    conf: Optional[float]=Query(None, ge=0, le=1, description="Minimum confidence of stored detections"),
+    iou: Optional[float]=Query(None, ge=0, le=1, description="NMS IoU threshold"),
+    max_det: Optional[int]=Query(None, ge=1, le=1000, description="Maximum detections per image"),
+    classes: Optional[str]=Query(None, description="Comma-separated labels to detect, e.g. person,car"),
+) -> InferenceParams:
+    """
+    Per-request inference parameters, falling back to the server defaults
+    """
+    if model is not None and model not in MODEL_VARIANTS:
+        raise HTTPException(status_code=400, detail=f"Unknown model, expected one of: {', '.join(MODEL_VARIANTS)}")
+    if imgsz is not None and (imgsz % 32 or imgsz > MODEL_IMGSZ_MAX):
+        raise HTTPException(status_code=400, detail=f"imgsz must be a multiple of 32 up to {MODEL_IMGSZ_MAX}")
+    labels = None
+    if classes is not None:
+        labels = tuple(sorted({label.strip() for label in classes.split(",") if label.strip()}))
+        if not labels:
+            raise HTTPException(status_code=400, detail="classes must name at least one label")
+
+    return InferenceParams(
+        model=model or default_params.model,
+        imgsz=imgsz or default_params.imgsz,
+        conf=default_params.conf if conf is None else conf,
+        iou=default_params.iou if iou is None else iou,
+        max_det=max_det or default_params.max_det,
+        classes=labels,
+    )
+
+def write_file(path: str, data: bytes) -> bool:
+    """
+    Atomically write data to path, skipping files that already exist.
+    Originals are named by content hash, so an existing file holds the same bytes.
+    Returns whether the file was written.
+    """
+    if os.path.exists(path):
+        return False
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return True
+
+def remove_original(db: Session, original_path: str):
+    """
+    Remove a content-addressed original no prediction refers to any more.
+    The file is moved aside before the references are counted again, so a
+    prediction of the same bytes that committed meanwhile gets it back;
+    predictions committing later re-create it (save_prediction).
+    """
+    if not os.path.exists(original_path) or query_count_predictions_by_original_image(db, original_path) > 0:
+        return
+    aside_path = f"{original_path}.{uuid.uuid4().hex}.tmp"
+    try:
+        os.replace(original_path, aside_path)
+    except FileNotFoundError:
+        return
+    # End the read snapshot so the recount sees predictions committed since
+    db.rollback()
+    if query_count_predictions_by_original_image(db, original_path) > 0:
+        os.replace(aside_path, original_path)
+    else:
+        os.remove(aside_path)
+
+def discard_original(original_path: str):
+    """
+    remove_original on a session of its own, for callers without one.
+    """
+    db = SessionLocal()
+    try:
+        remove_original(db, original_path)
+    finally:
+        db.close()
+
+def save_prediction(db: Session, uid: str, original_path: str, data: bytes, predicted_path: str, user_id: int, detections: list):
+    """
+    Save a prediction, then make sure its original still exists: an upload
+    that reused an existing original may have lost it to a concurrent
+    DELETE of another prediction of the same bytes while the model ran.
+    """
+    query_save_prediction_with_detections(db, uid, original_path, predicted_path, user_id, detections)
+    write_file(original_path, data)
+
+async def detect_image(data: bytes, params: InferenceParams):
+    """
+    Validate one uploaded image and get its detections, from the cache or
+    the batch scheduler. The content-addressed original is written while
+    the model runs. Returns (original_path, ext, detections).
+    """
+    ext = await run_in_threadpool(image_extension, data)
+    digest = await run_in_threadpool(content_digest, data)
+    original_path = os.path.join(UPLOAD_DIR, digest + ext)
+
+    key = cache_key(digest, params)
+    detections = prediction_cache.get(key)
+    # Decoded before the original is written, so undecodable uploads leave no file behind
+    prepared = await run_in_threadpool(prepare_image, data, params.imgsz) if detections is None else None
+
+    # Persist the original while the image runs through the model
+    save_original = asyncio.ensure_future(run_in_threadpool(write_file, original_path, data))
+    try:
+        if detections is None:
+            detections = await asyncio.wrap_future(scheduler.submit((prepared.image, params)))
+            detections = scale_detections(detections, prepared.scale_x, prepared.scale_y)
+            prediction_cache.put(key, detections)
+    except (Exception, asyncio.CancelledError):
+        # Uploads of the same bytes may have reused the original meanwhile
+        if await save_original:
+            try:
+                await run_in_threadpool(discard_original, original_path)
+            except Exception:
+                # Don't mask the error of the upload itself
+                logger.exception("Could not remove the original of a failed upload")
+        raise
+    finally:
+        await save_original
+    return original_path, ext, detections
+
 @router.post("/predict")
-def predict(file: UploadFile=File(...), user_id=Depends(resolve_user_id), db: Session=Depends(get_db)):
+async def predict(
+    file: UploadFile=File(...),
+    params: InferenceParams=Depends(inference_params),
+    user_id=Depends(resolve_user_id),
+    db: Session=Depends(get_db),
+):
     """
     Predict objects in an image
+    Rejects uploads over MAX_UPLOAD_BYTES (413) and non-images (415);
+    model, imgsz, conf, iou, max_det and classes override the server defaults.
     """
 
     start_time = time.time()
-    ext = os.path.splitext(file.filename)[1]
     uid = str(uuid.uuid4())
-    original_path = os.path.join(UPLOAD_DIR, uid + ext)
-    predicted_path = os.path.join(PREDICTED_DIR, uid + ext)
-
-    with open(original_path, "wb") as f:
-        shutil.copyfileobj(file.file, f)
-
-    results = model(original_path, device="cpu")
 
-    annotated_frame = results[0].plot()  # NumPy image with boxes
-    annotated_image = Image.fromarray(annotated_frame)
-    annotated_image.save(predicted_path)
+    data = await read_upload(file, MAX_UPLOAD_BYTES)
+    original_path, ext, detections = await detect_image(data, params)
+    predicted_path = os.path.join(PREDICTED_DIR, uid + ext)
 
-    new_session = query_save_prediction_session(db, uid, original_path, predicted_path, user_id)
-    
-    detected_labels = []
-    for box in results[0].boxes:
-        label_idx = int(box.cls[0].item())
-        label = model.names[label_idx]
-        score = float(box.conf[0])
-        bbox = box.xyxy[0].tolist()
-        new_detection = query_save_detection_object(db, uid, label, score, bbox)
-        detected_labels.append(label)
+    await run_in_threadpool(save_prediction, db, uid, original_path, data, predicted_path, user_id, detections)
+    detected_labels = [detection["label"] for detection in detections]
 
     processing_time = round(time.time() - start_time, 2)
 
     return {
         "prediction_uid": uid, 
-        "detection_count": len(results[0].boxes),
+        "detection_count": len(detections),
         "labels": detected_labels,
         "time_took": processing_time
     }
 
-@router.get("/prediction/{uid}")
-def get_prediction_by_uid(uid: str, user_id: int=Depends(resolve_user_id), db: Session=Depends(get_db)):
+def run_prediction_job(uid: str, data: bytes, ext: str, user_id: int, params: InferenceParams=default_params):
     """
-    Get prediction session by uid with all detected objects
+    Full prediction pipeline for a queued job, run on a job worker thread
     """
-    session = query_get_prediction_by_uid(db, uid=uid, user_id=user_id)
-    if not session:
-        raise HTTPException(status_code=404, detail="Prediction not found")
-    
-    objects = query_get_detection_objects_by_prediction_uid(db, uid=uid)
-    
-        
+    digest = content_digest(data)
+    original_path = os.path.join(UPLOAD_DIR, digest + ext)
+    predicted_path = os.path.join(PREDICTED_DIR, uid + ext)
+
+    key = cache_key(digest, params)
+    detections = prediction_cache.get(key)
+    prepared = prepare_image(data, params.imgsz) if detections is None else None
+    write_file(original_path, data)
+    if detections is None:
+        detections = scheduler.predict((prepared.image, params))
+        detections = scale_detections(detections, prepared.scale_x, prepared.scale_y)
+        prediction_cache.put(key, detections)
+
+    db = SessionLocal()
+    try:
+        save_prediction(db, uid, original_path, data, predicted_path, user_id, detections)
+    finally:
+        db.close()
+
+@router.post("/predict/async", status_code=status.HTTP_202_ACCEPTED)
+async def predict_async(
+    file: UploadFile=File(...),
+    params: InferenceParams=Depends(inference_params),
+    user_id=Depends(resolve_user_id),
+):
+    """
+    Queue an image for prediction and return its uid immediately.
+    Poll GET /prediction/{uid} until its status is "done" or "failed".
+    Responds 429 when the job queue is full; oversized and non-image
+    uploads are rejected like on /predict, which takes the same parameters.
+    """
+    uid = str(uuid.uuid4())
+
+    data = await read_upload(file, MAX_UPLOAD_BYTES)
+    ext = await run_in_threadpool(image_extension, data)
+
+    if not jobs.submit(uid, run_prediction_job, uid, data, ext, user_id, params, owner=user_id):
+        raise HTTPException(status_code=429, detail="Prediction queue is full, retry later")
+
+    return {"prediction_uid": uid, "status": "queued"}
+
+async def batch_images(files: List[UploadFile]) -> list:
+    """
+    (filename, bytes) for every image of a /predict/batch request, with zip
+    and tar archives unpacked. At most MAX_BATCH_IMAGES images and
+    MAX_BATCH_UPLOAD_BYTES unpacked bytes are accepted (413).
+    """
+    images, unpacked = [], 0
+    for file in files:
+        data = await read_upload(file, MAX_BATCH_UPLOAD_BYTES)
+        members = await run_in_threadpool(
+            expand_archive, data, MAX_BATCH_IMAGES - len(images), MAX_BATCH_UPLOAD_BYTES - unpacked,
+        )
+        for name, member in members if members is not None else [(file.filename, data)]:
+            images.append((name, member))
+            unpacked += len(member)
+        if len(images) > MAX_BATCH_IMAGES:
+            raise HTTPException(status_code=413, detail=f"Batch exceeds {MAX_BATCH_IMAGES} images")
+    if not images:
+        raise HTTPException(status_code=400, detail="No images in the request")
+    return images
+
+async def batch_item(index: int, filename: str, data: bytes, params: InferenceParams, slots: asyncio.Semaphore):
+    """
+    Result of one /predict/batch image and its row for
+    query_save_predictions_with_detections (None when the image was rejected).
+    """
+    uid = str(uuid.uuid4())
+    try:
+        if len(data) > MAX_UPLOAD_BYTES:
+            raise too_large(MAX_UPLOAD_BYTES)
+        async with slots:
+            original_path, ext, detections = await detect_image(data, params)
+    except HTTPException as e:
+        return {"index": index, "filename": filename, "status_code": e.status_code, "error": e.detail}, None
+    except Exception as e:
+        # E.g. the model failed on this image: report it without losing the rest of the batch
+        return {"index": index, "filename": filename, "status_code": 500, "error": str(e) or type(e).__name__}, None
+
+    predicted_path = os.path.join(PREDICTED_DIR, uid + ext)
+    result = {
+        "index": index,
+        "filename": filename,
+        "prediction_uid": uid,
+        "detection_count": len(detections),
+        "labels": [detection["label"] for detection in detections],
+    }
+    return result, (uid, original_path, predicted_path, detections)
+
+def save_batch(db: Session, user_id: int, outcomes: list, images: list) -> int:
+    """
+    Save the accepted images of a batch in one transaction, then make sure
+    their originals still exist (see save_prediction).
+    """
+    saved = query_save_predictions_with_detections(db, user_id, [row for _, row in outcomes if row])
+    for result, row in outcomes:
+        if row:
+            write_file(row[1], images[result["index"]][1])
+    return saved
+
+def discard_unsaved(outcomes: list):
+    """
+    Remove the originals of batch images whose predictions were never
+    saved, unless something else refers to them (see remove_original).
+    """
+    for _, row in outcomes:
+        if row:
+            discard_original(row[1])
+
+def batch_summary(results: int, saved: int, start_time: float) -> dict:
+    return {"count": results, "saved": saved, "failed": results - saved, "time_took": round(time.time() - start_time, 2)}
+
+async def stream_batch(tasks: list, images: list, user_id: int, start_time: float):
+    """
+    NDJSON results in completion order, then a {"summary": ...} line once
+    every prediction has been saved in one transaction.
+    """
+    outcomes, saved = [], False
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            result, row = await next_done
+            outcomes.append((result, row))
+            yield json.dumps(result) + "\n"
+
+        db = SessionLocal()
+        try:
+            summary = batch_summary(len(tasks), await run_in_threadpool(save_batch, db, user_id, outcomes, images), start_time)
+            saved = True
+        except Exception:
+            db.rollback()
+            summary = {**batch_summary(len(tasks), 0, start_time), "error": "Saving the batch failed"}
+        finally:
+            db.close()
+        yield json.dumps({"summary": summary}) + "\n"
+    finally:
+        # Client went away: stop the images still waiting for the model
+        # (they remove their own originals)
+        for task in tasks:
+            task.cancel()
+        if not saved:
+            finished = [task.result() for task in tasks if task.done() and not task.cancelled()]
+            # Not awaited: the response may be cancelled, which cancels any await here too
+            asyncio.get_running_loop().run_in_executor(None, discard_unsaved, finished)
+
+@router.post("/predict/batch")
+async def predict_batch(
+    files: List[UploadFile]=File(...),
+    stream: bool=Query(False, description="Stream NDJSON results as each image finishes"),
+    params: InferenceParams=Depends(inference_params),
+    user_id=Depends(resolve_user_id),
+    db: Session=Depends(get_db),
+):
+    """
+    Predict objects in many images in one request: several files and/or
+    zip / tar archives of images. All images go to the batch scheduler
+    together, so the model runs on full batches, and every prediction is
+    saved in one transaction. Images that are rejected (413/415/400) or
+    fail in the model (500) are reported per image without failing the
+    rest of the batch.
+    Takes the same parameters as /predict. With stream=true, results are
+    sent as NDJSON as each image finishes, followed by a summary line once
+    they are saved.
+    """
+    start_time = time.time()
+    images = await batch_images(files)
+
+    slots = asyncio.Semaphore(PREDICT_BATCH_CONCURRENCY)
+    tasks = [
+        asyncio.ensure_future(batch_item(index, filename, data, params, slots))
+        for index, (filename, data) in enumerate(images)
+    ]
+    if stream:
+        return StreamingResponse(stream_batch(tasks, images, user_id, start_time), media_type="application/x-ndjson")
+
+    outcomes = await asyncio.gather(*tasks)
+    try:
+        saved = await run_in_threadpool(save_batch, db, user_id, outcomes, images)
+    except Exception:
+        await run_in_threadpool(discard_unsaved, outcomes)
+        raise
+    return {**batch_summary(len(outcomes), saved, start_time), "results": [result for result, _ in outcomes]}
+
+def save_video_prediction(db: Session, uid: str, video_path: str, original_path: str, user_id: int, frame_detections):
+    """
+    Run a video's frames and save them as one prediction session.
+    Detections are spooled to a temp file while the model runs, so the
+    write transaction only covers the final inserts: SQLite has a single
+    writer, and holding it for the whole video would make every other
+    prediction and delete time out. The upload is moved to original_path
+    once the session is committed, which also restores an original of the
+    same bytes that a concurrent DELETE removed meanwhile.
+    Returns the number of frames, the number of detections and a Counter of labels.
+    """
+    with spool_detections(frame_detections) as spool:
+        result = query_save_prediction_with_frame_detections(db, uid, original_path, user_id, read_spool(spool))
+    os.replace(video_path, original_path)
+    return result
+
+@router.post("/predict/video")
+async def predict_video(
+    file: UploadFile=File(...),
+    frame_stride: int=Query(VIDEO_FRAME_STRIDE, ge=1, description="Run every n-th frame"),
+    max_fps: Optional[float]=Query(None, gt=0, description="Run at most this many frames per second of video"),
+    max_frames: Optional[int]=Query(None, ge=1, description="Stop after this many frames (at most VIDEO_MAX_FRAMES)"),
+    params: InferenceParams=Depends(inference_params),
+    user_id=Depends(resolve_user_id),
+    db: Session=Depends(get_db),
+):
+    """
+    Predict objects in the frames of a video file.
+    The upload is streamed to disk (it is kept, content-addressed, as the
+    session's original), then sampled frames are decoded one at a time and
+    run through the batch scheduler, at most VIDEO_FRAMES_IN_FLIGHT at once.
+    Frames are never written to disk. The result is one prediction session
+    whose detection objects carry their frame_index; see save_video_prediction.
+    Takes the same model and threshold parameters as /predict.
+    """
+    start_time = time.time()
+    uid = str(uuid.uuid4())
+
+    ext = video_extension(file.filename)
+    tmp_path, digest = await save_upload(file, UPLOAD_DIR, ext, MAX_VIDEO_UPLOAD_BYTES)
+    try:
+        video = await run_in_threadpool(probe_video, tmp_path)
+    except HTTPException:
+        os.remove(tmp_path)
+        raise
+    original_path = os.path.join(UPLOAD_DIR, digest + ext)
+
+    frames = sample_frames(
+        tmp_path,
+        stride=frame_stride,
+        max_fps=max_fps or VIDEO_MAX_FPS or None,
+        max_frames=min(max_frames or VIDEO_MAX_FRAMES, VIDEO_MAX_FRAMES),
+    )
+    try:
+        frame_count, detection_count, label_counts = await run_in_threadpool(
+            save_video_prediction, db, uid, tmp_path, original_path, user_id,
+            detect_frames(frames, params, scheduler.submit, VIDEO_FRAMES_IN_FLIGHT),
+        )
+    except Exception:
+        # No prediction refers to the upload yet
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
     return {
-        "uid": session.uid,
-        "timestamp": session.timestamp,
-        "original_image": session.original_image,
-        "predicted_image": session.predicted_image,
-        "detection_objects": [
-            {
-                "id": obj.id,
-                "label": obj.label,
-                "score": obj.score,
-                "box": obj.box
-            } for obj in objects
-        ]
+        "prediction_uid": uid,
+        "frame_count": frame_count,
+        "detection_count": detection_count,
+        "labels": dict(label_counts),
+        "video": video,
+        "time_took": round(time.time() - start_time, 2)
     }
 
+def unfinished_job_response(uid: str, user_id: int):
+    """
+    Status body for the caller's /predict/async job that hasn't finished, else None.
+    """
+    job = jobs.status(uid)
+    if job and job["owner"] == user_id and job["status"] != DONE:
+        response = {"uid": uid, "status": job["status"]}
+        if job["error"]:
+            response["error"] = job["error"]
+        return response
+    return None
+
+def cached_prediction(key, limit: int):
+    """
+    Cached body for a first page of limit detections. Only complete bodies
+    are cached; one with more detections than the page holds is skipped.
+    """
+    prediction = prediction_response_cache.get(key)
+    if prediction is not None and len(prediction["detection_objects"]) <= limit:
+        return prediction
+    return None
+
+def prediction_page(key, prediction, response: Response, limit: int, cursor: Optional[int]):
+    """
+    Trim a body fetched with limit + 1 detections to one page. When more
+    remain, X-Next-Cursor points at the last detection; a complete first
+    page is cached if it is small enough.
+    """
+    if not prediction:
+        raise HTTPException(status_code=404, detail="Prediction not found")
+    detections = prediction["detection_objects"]
+    if len(detections) > limit:
+        prediction = {**prediction, "detection_objects": detections[:limit]}
+        response.headers["X-Next-Cursor"] = str(detections[limit - 1]["id"])
+    elif cursor is None and len(detections) <= PREDICTION_RESPONSE_CACHE_MAX_DETECTIONS:
+        prediction_response_cache.put(key, prediction)
+    return {"status": DONE, **prediction}
+
+def get_prediction_by_uid(
+    uid: str,
+    response: Response,
+    limit: int=Query(DETECTIONS_PAGE_SIZE, ge=1, le=DETECTIONS_PAGE_SIZE_MAX),
+    cursor: Optional[int]=Query(None, ge=0),
+    user_id: int=Depends(resolve_user_id),
+    db: Session=Depends(get_db),
+):
+    """
+    Get prediction session by uid with its detected objects, limit at a
+    time; pass the X-Next-Cursor header back as ?cursor= for the next page.
+    Jobs from /predict/async that have not finished report only their status.
+    """
+    job_response = unfinished_job_response(uid, user_id)
+    if job_response:
+        return job_response
+
+    key = (uid, user_id)
+    prediction = cached_prediction(key, limit) if cursor is None else None
+    if prediction is None:
+        prediction = query_get_prediction_with_detections(db, uid=uid, user_id=user_id, limit=limit + 1, after=cursor)
+    return prediction_page(key, prediction, response, limit, cursor)
+
+async def get_prediction_by_uid_async(
+    uid: str,
+    response: Response,
+    limit: int=Query(DETECTIONS_PAGE_SIZE, ge=1, le=DETECTIONS_PAGE_SIZE_MAX),
+    cursor: Optional[int]=Query(None, ge=0),
+    user_id: int=Depends(resolve_user_id_async),
+    db=Depends(get_async_db),
+):
+    """
+    get_prediction_by_uid on the asyncio engine
+    """
+    job_response = unfinished_job_response(uid, user_id)
+    if job_response:
+        return job_response
+
+    key = (uid, user_id)
+    prediction = cached_prediction(key, limit) if cursor is None else None
+    if prediction is None:
+        prediction = await query_get_prediction_with_detections_async(
+            db, uid=uid, user_id=user_id, limit=limit + 1, after=cursor,
+        )
+    return prediction_page(key, prediction, response, limit, cursor)
+
+router.add_api_route(
+    "/prediction/{uid}",
+    get_prediction_by_uid_async if DB_ASYNC else get_prediction_by_uid,
+    methods=["GET"],
+)
+
+def stream_ndjson(iter_rows, *args, **kwargs):
+    """
+    Yield rows as newline-delimited JSON. Uses its own session: the request's
+    session is closed before a streaming body is sent.
+    """
+    db = SessionLocal()
+    try:
+        for row in iter_rows(db, *args, **kwargs):
+            yield json.dumps(jsonable_encoder(row)) + "\n"
+    finally:
+        db.close()
+
+def next_page(response: Response, rows: list, limit: int) -> list:
+    """
+    Point X-Next-Cursor at the last row when the page is full.
+    """
+    if len(rows) == limit:
+        last = rows[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(last["timestamp"], last["uid"])
+    return rows
+
+def search_results(db: Session, response: Response, query_rows, iter_rows, params: dict, limit: int, cursor: Optional[str], stream: bool):
+    """
+    One page of a session search (X-Next-Cursor set when more remain),
+    or every match as NDJSON when stream is set.
+    """
+    after = decode_cursor(cursor) if cursor else None
+    if stream:
+        return StreamingResponse(
+            stream_ndjson(iter_rows, after=after, **params),
+            media_type="application/x-ndjson",
+        )
+    rows = query_rows(db, limit=limit, after=after, **params)
+    return next_page(response, rows, limit)
+
 @router.get("/predictions/label/{label}")
-def get_predictions_by_label(label: str, user_id: int=Depends(resolve_user_id), db: Session=Depends(get_db)):
+def get_predictions_by_label(
+    label: str,
+    response: Response,
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+    cursor: Optional[str] = None,
+    stream: bool = False,
+    user_id: int=Depends(resolve_user_id),
+    db: Session=Depends(get_db),
+):
+    """
+    Get prediction sessions containing objects with specified label,
+    newest first. Pass the X-Next-Cursor header back as ?cursor= for the
+    next page, or ?stream=true for every match as NDJSON.
     """
-    Get prediction sessions containing objects with specified label
-    """ 
-    return query_prediction_uids_by_label_and_user(db, label=label, user_id=user_id)
+    return search_results(
+        db, response,
+        query_prediction_uids_by_label_and_user, iter_prediction_uids_by_label_and_user,
+        {"label": label, "user_id": user_id}, limit, cursor, stream,
+    )
 
 @router.get("/predictions/score/{min_score}")
-def get_predictions_by_score(min_score: float, user_id: int = Depends(resolve_user_id), db: Session=Depends(get_db)):
+def get_predictions_by_score(
+    min_score: float,
+    response: Response,
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+    cursor: Optional[str] = None,
+    stream: bool = False,
+    user_id: int = Depends(resolve_user_id),
+    db: Session=Depends(get_db),
+):
     """
-    Get prediction sessions containing objects with score >= min_score
+    Get prediction sessions containing objects with score >= min_score,
+    paginated and streamable like the label search
     """
-    return query_prediction_sessions_by_min_score(db, min_score=min_score, user_id=user_id)
+    return search_results(
+        db, response,
+        query_prediction_sessions_by_min_score, iter_prediction_sessions_by_min_score,
+        {"min_score": min_score, "user_id": user_id}, limit, cursor, stream,
+    )
+
+@router.get("/predictions/area/{min_area}")
+def get_predictions_by_area(
+    min_area: float,
+    response: Response,
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+    cursor: Optional[str] = None,
+    stream: bool = False,
+    user_id: int = Depends(resolve_user_id),
+    db: Session=Depends(get_db),
+):
+    """
+    Get prediction sessions containing a box of at least min_area square pixels
+    """
+    return search_results(
+        db, response,
+        query_prediction_sessions_by_min_area, iter_prediction_sessions_by_min_area,
+        {"min_area": min_area, "user_id": user_id}, limit, cursor, stream,
+    )
+
+@router.get("/predictions/region")
+def get_predictions_in_region(
+    response: Response,
+    x1: float = Query(..., ge=0),
+    y1: float = Query(..., ge=0),
+    x2: float = Query(..., ge=0),
+    y2: float = Query(..., ge=0),
+    label: Optional[str] = None,
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+    cursor: Optional[str] = None,
+    stream: bool = False,
+    user_id: int = Depends(resolve_user_id),
+    db: Session=Depends(get_db),
+):
+    """
+    Get prediction sessions with a box (optionally of the given label) lying
+    entirely inside the region x1,y1 - x2,y2 of the original image
+    """
+    if x2 <= x1 or y2 <= y1:
+        raise HTTPException(status_code=400, detail="Region must have x2 > x1 and y2 > y1")
+    return search_results(
+        db, response,
+        query_prediction_sessions_in_region, iter_prediction_sessions_in_region,
+        {"x1": x1, "y1": y1, "x2": x2, "y2": y2, "label": label, "user_id": user_id}, limit, cursor, stream,
+    )
 
 @router.get("/prediction/{uid}/image")
 def get_prediction_image(uid: str, request: Request,db: Session=Depends(get_db)):
     """
     Get prediction image by uid
+    The annotated image is rendered from the stored boxes on first request.
     """
     accept = request.headers.get("accept", "")
     image_path = query_predicted_image_by_uid(db, uid=uid)
     if not image_path:
         raise HTTPException(status_code=404, detail="Prediction not found")
 
-    if not os.path.exists(image_path):
+    if not ensure_predicted_image(db, image_path):
         raise HTTPException(status_code=404, detail="Predicted image file not found")
 
     if "image/png" in accept:
@@ -132,6 +830,13 @@ def get_prediction_image(uid: str, request: Request,db: Session=Depends(get_db))
         # If the client doesn't accept image, respond with 406 Not Acceptable
         raise HTTPException(status_code=406, detail="Client does not accept an image format")
 
+@router.get("/predictions/cache")
+def predictions_cache_stats():
+    """
+    Hit-rate and size of the content-hash detection cache
+    """
+    return prediction_cache.stats()
+
 @router.get("/predictions/count")
 def predictions_count(db: Session=Depends(get_db)):
     """
@@ -148,10 +853,12 @@ def delete_prediction(uid: str, user_id: int = Depends(resolve_user_id), db: Ses
         Delete original and predicted image files
     """
     original_path, predicted_path = query_delete_prediction_by_uid(db, uid, user_id)
+    prediction_response_cache.pop((uid, user_id))
 
-    # Remove files if they exist
-    for path in [original_path, predicted_path]:
-        if path and os.path.exists(path):
-            os.remove(path)
+    # Originals are content-addressed and may still back other predictions
+    if original_path:
+        remove_original(db, original_path)
+    if predicted_path and os.path.exists(predicted_path):
+        os.remove(predicted_path)
 
     return Response(status_code=status.HTTP_204_NO_CONTENT)
\ No newline at end of file
@@ -1,12 +1,19 @@
 from fastapi import Depends
 from fastapi import APIRouter
 from database.queries import *
-from database.connections import get_db
-from dependencies.auth import resolve_user_id
+from database.async_queries import query_prediction_stats_async
+from database.connections import get_db, get_async_db, DB_ASYNC
+from dependencies.auth import resolve_user_id, resolve_user_id_async
 
 router = APIRouter()
 
-@router.get("/stats")
+def stats_body(total, avg_score, label_counts):
+    return {
+        "total_predictions": total,
+        "average_confidence_score": avg_score,
+        "most_common_labels": {label: count for label, count in label_counts}
+    }
+
 def get_prediction_stats(user_id: int = Depends(resolve_user_id), db: Session=Depends(get_db)):
     """
     Return analytics for predictions made in the last 7 days:
@@ -14,10 +21,16 @@ def get_prediction_stats(user_id: int = Depends(resolve_user_id), db: Session=De
     - average confidence score
     - most common labels
     """
-    total, avg_score, label_counts = query_prediction_stats(db, user_id)
+    return stats_body(*query_prediction_stats(db, user_id))
 
-    return {
-        "total_predictions": total,
-        "average_confidence_score": avg_score,
-        "most_common_labels": {label: count for label, count in label_counts}
-    }
\ No newline at end of file
+async def get_prediction_stats_async(user_id: int = Depends(resolve_user_id_async), db=Depends(get_async_db)):
+    """
+    get_prediction_stats on the asyncio engine
+    """
+    return stats_body(*await query_prediction_stats_async(db, user_id))
+
+router.add_api_route(
+    "/stats",
+    get_prediction_stats_async if DB_ASYNC else get_prediction_stats,
+    methods=["GET"],
+)
@@ -0,0 +1,38 @@
+"""
+Async versions of the read queries behind /prediction/{uid}, /labels and
+/stats, for the asyncio engine (DB_ASYNC). They run the same statements as
+database.queries, so both paths return identical results.
+"""
+from typing import TYPE_CHECKING
+
+from database.queries import (
+    prediction_with_detections_statement,
+    prediction_body,
+    unique_labels_statement,
+    prediction_totals_statement,
+    top_labels_statement,
+    prediction_stats_result,
+    rollup_window_start,
+)
+
+if TYPE_CHECKING:
+    # Only importable with the asyncio extra (greenlet) installed
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+
+async def query_get_prediction_with_detections_async(db: "AsyncSession", uid: str, user_id: int, limit: int = None,
+                                                     after: int = None):
+    result = await db.execute(prediction_with_detections_statement(uid, user_id, limit, after))
+    return prediction_body(result.all())
+
+
+async def query_unique_labels_last_7_days_async(db: "AsyncSession"):
+    result = await db.execute(unique_labels_statement())
+    return list(result.scalars())
+
+
+async def query_prediction_stats_async(db: "AsyncSession", user_id: int):
+    since = rollup_window_start()
+    totals = (await db.execute(prediction_totals_statement(user_id, since))).one()
+    label_counts = (await db.execute(top_labels_statement(user_id, since))).all()
+    return prediction_stats_result(totals, label_counts)
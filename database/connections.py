@@ -1,6 +1,7 @@
 import os
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, declarative_base
 
 
@@ -15,14 +16,92 @@ if DB_BACKEND == "postgres":
 else:
     DATABASE_URL = "sqlite:///./predictions.db"
 
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {},
-)
+# Optional asyncio engine: the read endpoints (/prediction/{uid}, /labels,
+# /stats) then run as coroutines on the event loop instead of the threadpool.
+# Needs aiosqlite (SQLite) or asyncpg (Postgres).
+DB_ASYNC = os.getenv("DB_ASYNC", "false").lower() in ("1", "true", "yes")
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+ASYNC_DATABASE_URL = make_url(DATABASE_URL).set(
+    drivername=ASYNC_DRIVERS[make_url(DATABASE_URL).get_backend_name()]
+).render_as_string(hide_password=False)
+
+# Connection pool: sync handlers run on the threadpool, so size it for the
+# number of concurrent requests rather than the SQLAlchemy default of 5 + 10
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+
+# SQLite settings applied to every new connection. WAL lets readers run
+# alongside a writer; NORMAL sync is safe in WAL mode (a power loss can
+# only drop the last commits, never corrupt the file)
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+
+
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    cursor.close()
+
+
+def engine_options(url: str, **kwargs) -> dict:
+    """
+    create_engine arguments with this service's pool and connection settings.
+    """
+    url = make_url(url)
+    if url.get_backend_name() == "sqlite":
+        kwargs.setdefault("connect_args", {"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000})
+        if url.database in (None, "", ":memory:"):
+            return kwargs
+    else:
+        # Drop connections the server or a proxy closed while they sat idle
+        kwargs.setdefault("pool_pre_ping", True)
+        kwargs.setdefault("pool_recycle", DB_POOL_RECYCLE)
+
+    kwargs.setdefault("pool_size", DB_POOL_SIZE)
+    kwargs.setdefault("max_overflow", DB_MAX_OVERFLOW)
+    kwargs.setdefault("pool_timeout", DB_POOL_TIMEOUT)
+    return kwargs
+
+
+def create_db_engine(url: str, **kwargs):
+    db_engine = create_engine(url, **engine_options(url, **kwargs))
+    if make_url(url).get_backend_name() == "sqlite":
+        event.listen(db_engine, "connect", set_sqlite_pragmas)
+    return db_engine
+
+
+def create_async_db_engine(url: str, **kwargs):
+    """
+    Async engine (aiosqlite / asyncpg) with the same settings.
+    """
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    db_engine = create_async_engine(url, **engine_options(url, **kwargs))
+    if make_url(url).get_backend_name() == "sqlite":
+        event.listen(db_engine.sync_engine, "connect", set_sqlite_pragmas)
+    return db_engine
+
+
+engine = create_db_engine(DATABASE_URL)
 
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 Base = declarative_base()
 
+if DB_ASYNC:
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+    async_engine = create_async_db_engine(ASYNC_DATABASE_URL)
+    AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+else:
+    async_engine = None
+    AsyncSessionLocal = None
+
 def get_db():
     db = SessionLocal()
     try:
@@ -30,7 +109,15 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
 def init_db():
     if DB_BACKEND == "postgres":
         print("Creating tables in Postgres...")
-        Base.metadata.create_all(bind=engine)
\ No newline at end of file
+        Base.metadata.create_all(bind=engine)
+
+    # Imported here: migrations needs the models, which import this module
+    from database.migrations import apply_migrations
+    apply_migrations(engine)
@@ -0,0 +1,175 @@
+"""
+Schema migrations for existing SQLite/Postgres databases.
+
+create_all() only creates missing tables, so databases created before a
+schema change need these steps. Every step checks what already exists and
+is safe to run on every startup.
+
+Usage:
+    python -m database.migrations
+"""
+import json
+
+from sqlalchemy import inspect, text, select, update, bindparam
+
+from database.connections import engine
+
+
+def create_missing_indexes(bind, tables) -> list:
+    """
+    Create any index declared on the models that the database lacks.
+    Returns the names of the indexes that were created.
+    """
+    inspector = inspect(bind)
+    created = []
+    for table in tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(bind=bind)
+                created.append(index.name)
+    return created
+
+
+BOX_COLUMNS = ("x1", "y1", "x2", "y2", "area")
+BACKFILL_BATCH_SIZE = 10000
+
+
+def add_missing_columns(bind, table: str, columns: dict) -> list:
+    """
+    Add the nullable columns (name -> SQL type) that table lacks.
+    """
+    inspector = inspect(bind)
+    if not inspector.has_table(table):
+        return []
+
+    existing = {column["name"] for column in inspector.get_columns(table)}
+    added = []
+    with bind.begin() as conn:
+        for name, sql_type in columns.items():
+            if name not in existing:
+                conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {sql_type}"))
+                added.append(f"{table}.{name}")
+    return added
+
+
+def add_box_columns(bind) -> list:
+    """
+    Add the numeric box columns to a detection_objects table created when
+    boxes were only stored as stringified lists.
+    """
+    from models.DetectionObjects_model import DetectionObject
+
+    return add_missing_columns(bind, DetectionObject.__tablename__, {name: "FLOAT" for name in BOX_COLUMNS})
+
+
+def add_frame_index_column(bind) -> list:
+    """
+    Add detection_objects.frame_index, set for detections of video predictions.
+    """
+    from models.DetectionObjects_model import DetectionObject
+
+    return add_missing_columns(bind, DetectionObject.__tablename__, {"frame_index": "INTEGER"})
+
+
+def backfill_box_columns(bind) -> list:
+    """
+    Parse the legacy box strings of rows without numeric columns, in
+    primary-key order and batches of BACKFILL_BATCH_SIZE rows.
+    Rows whose box can't be parsed are left as they are.
+    """
+    from models.DetectionObjects_model import DetectionObject
+    from database.queries import box_columns
+
+    if not inspect(bind).has_table(DetectionObject.__tablename__):
+        return []
+
+    table = DetectionObject.__table__
+    fill = update(table).where(table.c.id == bindparam("row_id"))
+    pending = (
+        select(DetectionObject.id, DetectionObject.box)
+        .where(DetectionObject.x1.is_(None), DetectionObject.box.isnot(None))
+        .order_by(DetectionObject.id)
+        .limit(BACKFILL_BATCH_SIZE)
+    )
+    last_id, filled = 0, 0
+    while True:
+        with bind.begin() as conn:
+            rows = conn.execute(pending.where(DetectionObject.id > last_id)).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+            values = []
+            for row in rows:
+                try:
+                    values.append({"row_id": row.id, **box_columns(json.loads(row.box))})
+                except (ValueError, TypeError):
+                    continue
+            if values:
+                conn.execute(fill, values)
+                filled += len(values)
+    return [f"box backfill ({filled} rows)"] if filled else []
+
+
+def backfill_rollups(bind) -> list:
+    """
+    Create the rollup tables next to an existing prediction_sessions table
+    and fill them from the stored predictions if they are still empty.
+    """
+    from sqlalchemy.orm import Session
+    from models.PredictionSession_model import PredictionSession
+    from models.PredictionRollups_model import PredictionRollup, LabelRollup
+    from database.queries import query_rebuild_rollups
+
+    if not inspect(bind).has_table(PredictionSession.__tablename__):
+        return []
+
+    applied = []
+    for table in (PredictionRollup.__table__, LabelRollup.__table__):
+        if not inspect(bind).has_table(table.name):
+            table.create(bind=bind)
+            applied.append(table.name)
+
+    with Session(bind=bind) as db:
+        has_predictions = db.query(PredictionSession.uid).first() is not None
+        has_rollups = db.query(PredictionRollup.user_id).first() is not None
+        if has_predictions and not has_rollups:
+            query_rebuild_rollups(db)
+            applied.append("rollup backfill")
+    return applied
+
+
+def apply_migrations(bind=engine) -> list:
+    """
+    Bring the database schema up to date.
+    Returns a list of the changes that were applied.
+    """
+    from models.PredictionSession_model import PredictionSession
+    from models.DetectionObjects_model import DetectionObject
+    from models.PredictionRollups_model import PredictionRollup, LabelRollup
+
+    applied = add_box_columns(bind)
+    applied += add_frame_index_column(bind)
+    applied += backfill_box_columns(bind)
+    applied += backfill_rollups(bind)
+    applied += create_missing_indexes(bind, [
+        PredictionSession.__table__,
+        DetectionObject.__table__,
+        PredictionRollup.__table__,
+        LabelRollup.__table__,
+    ])
+
+    if applied:
+        # Refresh planner statistics so the new indexes are actually picked
+        with bind.begin() as conn:
+            conn.execute(text("ANALYZE"))
+    return applied
+
+
+if __name__ == "__main__":
+    changes = apply_migrations()
+    print("Applied:" if changes else "Schema is up to date.")
+    for change in changes:
+        print(f"  {change}")
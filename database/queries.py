@@ -1,13 +1,139 @@
 from sqlalchemy.orm import Session
 from sqlalchemy import distinct
 from datetime import datetime, timedelta
-from sqlalchemy import func
+from sqlalchemy import func, insert, select, and_, or_, exists
+from sqlalchemy.dialects import postgresql, sqlite
 from collections import Counter
+from fastapi import HTTPException
 
 
 from models.PredictionSession_model import PredictionSession
 from models.DetectionObjects_model import DetectionObject
 from models.Users_model import Users
+from models.PredictionRollups_model import PredictionRollup, LabelRollup
+
+def rollup_bucket(timestamp: datetime) -> datetime:
+    """
+    Hourly bucket a timestamp falls into.
+    """
+    return timestamp.replace(minute=0, second=0, microsecond=0)
+
+def rollup_window_start(days: int = 7) -> datetime:
+    """
+    First bucket of the last `days` days. Windows are aligned to whole hours,
+    so they can include up to an hour more history than an exact cut-off.
+    """
+    return rollup_bucket(datetime.utcnow() - timedelta(days=days))
+
+def _upsert(db: Session, model):
+    """
+    Dialect-specific INSERT supporting ON CONFLICT DO UPDATE.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        return postgresql.insert(model)
+    return sqlite.insert(model)
+
+def _add_to_rollups(db: Session, user_id: int, timestamp: datetime, detections: list, sign: int = 1, predictions: int = 1):
+    """
+    Add one prediction (or `predictions` made at the same time) and their
+    detections to the hourly rollups, or remove them with sign=-1. Runs in
+    the caller's transaction; counters are updated with ON CONFLICT so
+    concurrent writers never lose increments.
+    """
+    scores = [detection["score"] for detection in detections]
+    label_counts = Counter(detection["label"] for detection in detections)
+    _add_counts_to_rollups(db, user_id, timestamp, predictions, sum(scores), len(scores), label_counts, sign)
+
+def _add_counts_to_rollups(db: Session, user_id: int, timestamp: datetime, predictions: int, score_sum: float,
+                           score_count: int, label_counts: Counter, sign: int = 1):
+    """
+    _add_to_rollups from totals already counted by the caller.
+    """
+    bucket = rollup_bucket(timestamp)
+
+    stmt = _upsert(db, PredictionRollup).values(
+        user_id = user_id,
+        bucket = bucket,
+        prediction_count = sign * predictions,
+        score_sum = sign * score_sum,
+        score_count = sign * score_count
+    )
+    db.execute(stmt.on_conflict_do_update(
+        index_elements = ["user_id", "bucket"],
+        set_ = {
+            "prediction_count": PredictionRollup.prediction_count + stmt.excluded.prediction_count,
+            "score_sum": PredictionRollup.score_sum + stmt.excluded.score_sum,
+            "score_count": PredictionRollup.score_count + stmt.excluded.score_count
+        }
+    ))
+
+    if label_counts:
+        stmt = _upsert(db, LabelRollup).values([
+            {"user_id": user_id, "bucket": bucket, "label": label, "detection_count": sign * count}
+            for label, count in label_counts.items()
+        ])
+        db.execute(stmt.on_conflict_do_update(
+            index_elements = ["user_id", "bucket", "label"],
+            set_ = {"detection_count": LabelRollup.detection_count + stmt.excluded.detection_count}
+        ))
+
+    if sign < 0:
+        # Drop buckets emptied by the removal
+        db.query(PredictionRollup).filter(
+            PredictionRollup.user_id == user_id,
+            PredictionRollup.bucket == bucket,
+            PredictionRollup.prediction_count <= 0
+        ).delete(synchronize_session=False)
+        db.query(LabelRollup).filter(
+            LabelRollup.user_id == user_id,
+            LabelRollup.bucket == bucket,
+            LabelRollup.detection_count <= 0
+        ).delete(synchronize_session=False)
+
+def query_rebuild_rollups(db: Session):
+    """
+    Recompute both rollup tables from prediction_sessions and
+    detection_objects, e.g. to backfill a database created before them.
+    Rows are streamed, so memory grows with the number of buckets only.
+    """
+    predictions = Counter()
+    score_sums = Counter()
+    score_counts = Counter()
+    label_counts = Counter()
+
+    sessions = db.query(PredictionSession.user_id, PredictionSession.timestamp).yield_per(10000)
+    for user_id, timestamp in sessions:
+        predictions[(user_id, rollup_bucket(timestamp))] += 1
+
+    detections = (
+        db.query(PredictionSession.user_id, PredictionSession.timestamp, DetectionObject.label, DetectionObject.score)
+        .join(DetectionObject, DetectionObject.prediction_uid == PredictionSession.uid)
+        .yield_per(10000)
+    )
+    for user_id, timestamp, label, score in detections:
+        key = (user_id, rollup_bucket(timestamp))
+        score_sums[key] += score
+        score_counts[key] += 1
+        label_counts[key + (label,)] += 1
+
+    db.query(PredictionRollup).delete(synchronize_session=False)
+    db.query(LabelRollup).delete(synchronize_session=False)
+    if predictions:
+        db.execute(insert(PredictionRollup), [
+            {
+                "user_id": user_id,
+                "bucket": bucket,
+                "prediction_count": count,
+                "score_sum": score_sums[(user_id, bucket)],
+                "score_count": score_counts[(user_id, bucket)]
+            } for (user_id, bucket), count in predictions.items()
+        ])
+    if label_counts:
+        db.execute(insert(LabelRollup), [
+            {"user_id": user_id, "bucket": bucket, "label": label, "detection_count": count}
+            for (user_id, bucket, label), count in label_counts.items()
+        ])
+    db.commit()
 
 def query_get_prediction_by_uid(db: Session, uid: str, user_id: int):
     result = db.query(PredictionSession).filter_by(uid = uid, user_id = user_id).first()
@@ -26,45 +152,335 @@ def query_save_prediction_session(db: Session, uid: str, original_image: str, pr
     db.refresh(new_session)
     return new_session
 
+def box_columns(box) -> dict:
+    """
+    Numeric detection_objects columns for an [x1, y1, x2, y2] box.
+    """
+    x1, y1, x2, y2 = (float(value) for value in box)
+    return {"x1": x1, "y1": y1, "x2": x2, "y2": y2, "area": max(0.0, x2 - x1) * max(0.0, y2 - y1)}
+
+def box_list(row) -> list:
+    return [row.x1, row.y1, row.x2, row.y2]
+
 def query_save_detection_object(db: Session, prediction_uid: str, label: str, score: float, box: list):
     new_detection = DetectionObject(
         prediction_uid = prediction_uid,
         label = label,
         score = score,
-        box = str(box)  # assuming you store the box as a stringified list like "[0,0,100,100]"
+        **box_columns(box)
     )
     db.add(new_detection)
     db.commit()
     db.refresh(new_detection)
     return new_detection
 
+def query_save_prediction_with_detections(db: Session, uid: str, original_image: str, predicted_image: str, user_id: int, detections: list):
+    """
+    Save a prediction session and all of its detection objects in a single transaction.
+    detections is a list of dicts with label, score and box ([x1, y1, x2, y2]) keys.
+    Detections are bulk inserted and nothing is refreshed, so the whole
+    prediction costs one commit regardless of how many boxes it has.
+    The hourly rollups are updated in the same transaction.
+    """
+    timestamp = datetime.utcnow()
+    new_session = PredictionSession(
+        uid = uid,
+        timestamp = timestamp,
+        original_image = original_image,
+        predicted_image = predicted_image,
+        user_id = user_id
+    )
+    db.add(new_session)
+    # The session row has to exist before its detections reference it
+    db.flush()
+
+    if detections:
+        db.execute(
+            insert(DetectionObject),
+            [
+                {
+                    "prediction_uid": uid,
+                    "label": detection["label"],
+                    "score": detection["score"],
+                    **box_columns(detection["box"])
+                } for detection in detections
+            ]
+        )
+
+    _add_to_rollups(db, user_id, timestamp, detections)
+    db.commit()
+    return new_session
+
+def query_save_predictions_with_detections(db: Session, user_id: int, predictions: list):
+    """
+    Save many prediction sessions and their detection objects in a single transaction.
+    predictions is a list of (uid, original_image, predicted_image, detections)
+    tuples, detections as for query_save_prediction_with_detections.
+    Sessions and detections are bulk inserted and the rollups updated once.
+    """
+    if not predictions:
+        return 0
+    timestamp = datetime.utcnow()
+    db.execute(
+        insert(PredictionSession),
+        [
+            {
+                "uid": uid,
+                "timestamp": timestamp,
+                "original_image": original_image,
+                "predicted_image": predicted_image,
+                "user_id": user_id
+            } for uid, original_image, predicted_image, _ in predictions
+        ]
+    )
+
+    rows = [
+        {
+            "prediction_uid": uid,
+            "label": detection["label"],
+            "score": detection["score"],
+            **box_columns(detection["box"])
+        } for uid, _, _, detections in predictions for detection in detections
+    ]
+    if rows:
+        db.execute(insert(DetectionObject), rows)
+
+    all_detections = [detection for *_, detections in predictions for detection in detections]
+    _add_to_rollups(db, user_id, timestamp, all_detections, predictions=len(predictions))
+    db.commit()
+    return len(predictions)
+
+def query_save_prediction_with_frame_detections(db: Session, uid: str, original_image: str, user_id: int, frame_detections,
+                                                 chunk_size: int = 1000):
+    """
+    Save a video prediction: one session whose detection objects carry the
+    frame_index they were found in, all in a single transaction.
+    frame_detections is an iterable of (frame_index, detections), consumed
+    while the transaction is open, so it should yield detections that are
+    already computed (the video endpoint spools them to a temp file).
+    Detections are inserted every chunk_size rows and only running totals
+    are kept for the rollups, so memory use doesn't grow with the length of
+    the video.
+    Returns the number of frames, the number of detections and a Counter of labels.
+    """
+    timestamp = datetime.utcnow()
+    db.add(PredictionSession(
+        uid = uid,
+        timestamp = timestamp,
+        original_image = original_image,
+        predicted_image = None,
+        user_id = user_id
+    ))
+    db.flush()
+
+    frames, score_sum, label_counts, rows = 0, 0.0, Counter(), []
+    try:
+        for frame_index, detections in frame_detections:
+            frames += 1
+            for detection in detections:
+                rows.append({
+                    "prediction_uid": uid,
+                    "label": detection["label"],
+                    "score": detection["score"],
+                    "frame_index": frame_index,
+                    **box_columns(detection["box"])
+                })
+                score_sum += detection["score"]
+                label_counts[detection["label"]] += 1
+            if len(rows) >= chunk_size:
+                db.execute(insert(DetectionObject), rows)
+                rows = []
+        if rows:
+            db.execute(insert(DetectionObject), rows)
+
+        detection_count = sum(label_counts.values())
+        _add_counts_to_rollups(db, user_id, timestamp, 1, score_sum, detection_count, label_counts)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return frames, detection_count, label_counts
+
 def query_get_detection_objects_by_prediction_uid(db: Session, uid: str):
     return db.query(DetectionObject).filter_by(prediction_uid=uid).all()
 
-def query_prediction_uids_by_label_and_user(db: Session, label: str, user_id: int):
-    results = (
-        db.query(distinct(PredictionSession.uid), PredictionSession.timestamp)
-        .join(DetectionObject, DetectionObject.prediction_uid == PredictionSession.uid)
-        .filter(
-            DetectionObject.label == label,
-            PredictionSession.user_id == user_id
+def prediction_with_detections_statement(uid: str, user_id: int, limit: int = None, after: int = None):
+    """
+    A session joined to its detections in id order; with limit, at most
+    that many detections, starting after detection id `after`.
+    """
+    detections = DetectionObject.prediction_uid == PredictionSession.uid
+    if after is not None:
+        # In the join condition, so the session row is kept past the last page
+        detections = and_(detections, DetectionObject.id > after)
+    statement = (
+        select(
+            PredictionSession.uid,
+            PredictionSession.timestamp,
+            PredictionSession.original_image,
+            PredictionSession.predicted_image,
+            DetectionObject.id.label("detection_id"),
+            DetectionObject.label,
+            DetectionObject.score,
+            DetectionObject.x1,
+            DetectionObject.y1,
+            DetectionObject.x2,
+            DetectionObject.y2,
+            DetectionObject.area,
+            DetectionObject.frame_index,
         )
-        .all()
+        .outerjoin(DetectionObject, detections)
+        .where(PredictionSession.uid == uid, PredictionSession.user_id == user_id)
+        .order_by(DetectionObject.id)
     )
-    return [{"uid": uid, "timestamp": timestamp} for uid, timestamp in results]
+    return statement.limit(limit) if limit is not None else statement
 
-def query_prediction_sessions_by_min_score(db: Session, min_score: float, user_id: int):
-    results = (
-        db.query(distinct(PredictionSession.uid), PredictionSession.timestamp)
-        .join(DetectionObject, DetectionObject.prediction_uid == PredictionSession.uid)
-        .filter(
+def prediction_body(rows):
+    """
+    GET /prediction/{uid} body from prediction_with_detections_statement rows.
+    """
+    if not rows:
+        return None
+
+    first = rows[0]
+    return {
+        "uid": first.uid,
+        "timestamp": first.timestamp,
+        "original_image": first.original_image,
+        "predicted_image": first.predicted_image,
+        "detection_objects": [
+            detection_body(row) for row in rows if row.detection_id is not None
+        ]
+    }
+
+def detection_body(row) -> dict:
+    body = {
+        "id": row.detection_id,
+        "label": row.label,
+        "score": row.score,
+        "box": box_list(row),
+        "area": row.area
+    }
+    # Only video detections belong to a frame
+    if row.frame_index is not None:
+        body["frame_index"] = row.frame_index
+    return body
+
+def query_get_prediction_with_detections(db: Session, uid: str, user_id: int, limit: int = None, after: int = None):
+    """
+    A prediction session and its detection objects in one round trip
+    (LEFT OUTER JOIN, plain tuples, no ORM objects); limit and after page
+    through the detections.
+    Returns the GET /prediction/{uid} body, or None if not found.
+    """
+    rows = db.execute(prediction_with_detections_statement(uid, user_id, limit, after)).all()
+    return prediction_body(rows)
+
+def keyset_page(query, limit: int = None, after=None):
+    """
+    Order a PredictionSession query newest first (timestamp, then uid, both
+    descending) and start strictly after the `after` (timestamp, uid) key.
+    """
+    if after is not None:
+        timestamp, uid = after
+        query = query.filter(or_(
+            PredictionSession.timestamp < timestamp,
+            and_(PredictionSession.timestamp == timestamp, PredictionSession.uid < uid),
+        ))
+    query = query.order_by(PredictionSession.timestamp.desc(), PredictionSession.uid.desc())
+    if limit is not None:
+        query = query.limit(limit)
+    return query
+
+def _sessions_with_label(db: Session, label: str, user_id: int):
+    # EXISTS instead of JOIN + DISTINCT: one row per session, and the
+    # (label, prediction_uid) index answers the subquery
+    return db.query(PredictionSession.uid, PredictionSession.timestamp).filter(
+        PredictionSession.user_id == user_id,
+        exists().where(
+            DetectionObject.prediction_uid == PredictionSession.uid,
+            DetectionObject.label == label,
+        ),
+    )
+
+def _sessions_with_min_score(db: Session, min_score: float, user_id: int):
+    return db.query(PredictionSession.uid, PredictionSession.timestamp).filter(
+        PredictionSession.user_id == user_id,
+        exists().where(
+            DetectionObject.prediction_uid == PredictionSession.uid,
             DetectionObject.score >= min_score,
-            PredictionSession.user_id == user_id
-        )
-        .all()
+        ),
     )
+
+def query_prediction_uids_by_label_and_user(db: Session, label: str, user_id: int, limit: int = None, after=None):
+    results = keyset_page(_sessions_with_label(db, label, user_id), limit, after).all()
     return [{"uid": uid, "timestamp": timestamp} for uid, timestamp in results]
 
+def query_prediction_sessions_by_min_score(db: Session, min_score: float, user_id: int, limit: int = None, after=None):
+    results = keyset_page(_sessions_with_min_score(db, min_score, user_id), limit, after).all()
+    return [{"uid": uid, "timestamp": timestamp} for uid, timestamp in results]
+
+def iter_prediction_uids_by_label_and_user(db: Session, label: str, user_id: int, after=None, batch_size: int = 1000):
+    """
+    Same rows as query_prediction_uids_by_label_and_user, fetched from a
+    server-side cursor batch_size rows at a time.
+    """
+    query = keyset_page(_sessions_with_label(db, label, user_id), after=after)
+    for uid, timestamp in query.execution_options(yield_per=batch_size):
+        yield {"uid": uid, "timestamp": timestamp}
+
+def iter_prediction_sessions_by_min_score(db: Session, min_score: float, user_id: int, after=None, batch_size: int = 1000):
+    query = keyset_page(_sessions_with_min_score(db, min_score, user_id), after=after)
+    for uid, timestamp in query.execution_options(yield_per=batch_size):
+        yield {"uid": uid, "timestamp": timestamp}
+
+def _sessions_with_min_area(db: Session, min_area: float, user_id: int):
+    return db.query(PredictionSession.uid, PredictionSession.timestamp).filter(
+        PredictionSession.user_id == user_id,
+        exists().where(
+            DetectionObject.prediction_uid == PredictionSession.uid,
+            DetectionObject.area >= min_area,
+        ),
+    )
+
+def _sessions_in_region(db: Session, x1: float, y1: float, x2: float, y2: float, user_id: int, label: str = None):
+    # Boxes lying entirely inside the region
+    inside = exists().where(
+        DetectionObject.prediction_uid == PredictionSession.uid,
+        DetectionObject.x1 >= x1,
+        DetectionObject.y1 >= y1,
+        DetectionObject.x2 <= x2,
+        DetectionObject.y2 <= y2,
+    )
+    if label is not None:
+        inside = inside.where(DetectionObject.label == label)
+    return db.query(PredictionSession.uid, PredictionSession.timestamp).filter(
+        PredictionSession.user_id == user_id,
+        inside,
+    )
+
+def query_prediction_sessions_by_min_area(db: Session, min_area: float, user_id: int, limit: int = None, after=None):
+    results = keyset_page(_sessions_with_min_area(db, min_area, user_id), limit, after).all()
+    return [{"uid": uid, "timestamp": timestamp} for uid, timestamp in results]
+
+def query_prediction_sessions_in_region(db: Session, x1: float, y1: float, x2: float, y2: float, user_id: int, label: str = None, limit: int = None, after=None):
+    """
+    Sessions with at least one box (optionally of the given label) inside
+    the region [x1, y1, x2, y2] of the original image.
+    """
+    results = keyset_page(_sessions_in_region(db, x1, y1, x2, y2, user_id, label), limit, after).all()
+    return [{"uid": uid, "timestamp": timestamp} for uid, timestamp in results]
+
+def iter_prediction_sessions_by_min_area(db: Session, min_area: float, user_id: int, after=None, batch_size: int = 1000):
+    query = keyset_page(_sessions_with_min_area(db, min_area, user_id), after=after)
+    for uid, timestamp in query.execution_options(yield_per=batch_size):
+        yield {"uid": uid, "timestamp": timestamp}
+
+def iter_prediction_sessions_in_region(db: Session, x1: float, y1: float, x2: float, y2: float, user_id: int, label: str = None, after=None, batch_size: int = 1000):
+    query = keyset_page(_sessions_in_region(db, x1, y1, x2, y2, user_id, label), after=after)
+    for uid, timestamp in query.execution_options(yield_per=batch_size):
+        yield {"uid": uid, "timestamp": timestamp}
+
 def query_predicted_image_by_uid(db: Session, uid: str):
     result = (
         db.query(PredictionSession.predicted_image)
@@ -73,14 +489,46 @@ def query_predicted_image_by_uid(db: Session, uid: str):
     )
     return result[0] if result else None
 
+def query_render_data_by_predicted_image(db: Session, predicted_image: str):
+    """
+    Returns (original_image, [(label, score, box), ...]) for the prediction
+    whose annotated image path is predicted_image, or None.
+    """
+    session = (
+        db.query(PredictionSession.uid, PredictionSession.original_image)
+        .filter(PredictionSession.predicted_image == predicted_image)
+        .first()
+    )
+    if not session:
+        return None
+
+    detections = (
+        db.query(DetectionObject.label, DetectionObject.score, DetectionObject.x1, DetectionObject.y1, DetectionObject.x2, DetectionObject.y2)
+        .filter(DetectionObject.prediction_uid == session.uid)
+        .all()
+    )
+    return session.original_image, [(row.label, row.score, box_list(row)) for row in detections]
+
+def query_count_predictions_by_original_image(db: Session, original_image: str):
+    """
+    Number of prediction sessions whose original image is original_image.
+    """
+    return (
+        db.query(func.count(PredictionSession.uid))
+        .filter(PredictionSession.original_image == original_image)
+        .scalar()
+    )
+
 def query_total_predictions_last_week(db: Session):
-    one_week_ago = datetime.utcnow() - timedelta(days=7)
+    """
+    Total predictions of the last 7 days, read from the hourly rollups.
+    """
     count = (
-        db.query(PredictionSession)
-        .filter(PredictionSession.timestamp >= one_week_ago)
-        .count()
+        db.query(func.sum(PredictionRollup.prediction_count))
+        .filter(PredictionRollup.bucket >= rollup_window_start())
+        .scalar()
     )
-    return {"count": count}
+    return {"count": int(count or 0)}
 
 def query_delete_prediction_by_uid(db: Session, uid: str, user_id: int):
     """
@@ -102,6 +550,22 @@ def query_delete_prediction_by_uid(db: Session, uid: str, user_id: int):
     original_path = prediction.original_image
     predicted_path = prediction.predicted_image
 
+    # Take the prediction back out of the rollups, totalled in SQL: a video
+    # prediction can have far too many detections to load
+    label_totals = (
+        db.query(DetectionObject.label, func.count(DetectionObject.id), func.sum(DetectionObject.score))
+        .filter(DetectionObject.prediction_uid == uid)
+        .group_by(DetectionObject.label)
+        .all()
+    )
+    _add_counts_to_rollups(
+        db, prediction.user_id, prediction.timestamp, 1,
+        sum(score_sum or 0.0 for _, _, score_sum in label_totals),
+        sum(count for _, count, _ in label_totals),
+        Counter({label: count for label, count, _ in label_totals}),
+        sign=-1
+    )
+
     # Delete related detection objects
     db.query(DetectionObject).filter(DetectionObject.prediction_uid == uid).delete()
 
@@ -111,20 +575,53 @@ def query_delete_prediction_by_uid(db: Session, uid: str, user_id: int):
 
     return original_path, predicted_path
 
+def unique_labels_statement():
+    return (
+        select(LabelRollup.label)
+        .where(
+            LabelRollup.bucket >= rollup_window_start(),
+            LabelRollup.detection_count > 0
+        )
+        .distinct()
+    )
+
 def query_unique_labels_last_7_days(db: Session):
     """
     Returns a list of unique detection labels from the last 7 days.
+    Read from the hourly label rollups.
     """
-    one_week_ago = datetime.utcnow() - timedelta(days=7)
+    return list(db.execute(unique_labels_statement()).scalars())
 
-    results = (
-        db.query(distinct(DetectionObject.label))
-        .join(PredictionSession, DetectionObject.prediction_uid == PredictionSession.uid)
-        .filter(PredictionSession.timestamp >= one_week_ago)
-        .all()
+def prediction_totals_statement(user_id: int, since: datetime):
+    return select(
+        func.sum(PredictionRollup.prediction_count),
+        func.sum(PredictionRollup.score_sum),
+        func.sum(PredictionRollup.score_count)
+    ).where(
+        PredictionRollup.user_id == user_id,
+        PredictionRollup.bucket >= since
     )
 
-    return [label for (label,) in results]  # Unpack tuples
+def top_labels_statement(user_id: int, since: datetime, limit: int = 5):
+    # Ties broken by label name
+    detection_count = func.sum(LabelRollup.detection_count)
+    return (
+        select(LabelRollup.label, detection_count)
+        .where(
+            LabelRollup.user_id == user_id,
+            LabelRollup.bucket >= since
+        )
+        .group_by(LabelRollup.label)
+        .having(detection_count > 0)
+        .order_by(detection_count.desc(), LabelRollup.label)
+        .limit(limit)
+    )
+
+def prediction_stats_result(totals, label_counts):
+    total_predictions, score_sum, score_count = totals
+    avg_score = round(score_sum / score_count, 3) if score_count else 0.0
+    label_counts = [(label, int(count)) for label, count in label_counts]
+    return int(total_predictions or 0), avg_score, label_counts
 
 def query_prediction_stats(db: Session, user_id: int):
     """
@@ -132,42 +629,10 @@ def query_prediction_stats(db: Session, user_id: int):
         - total_predictions: int
         - average_score: float
         - top_labels: List[Tuple[str, int]]
+    Read from the hourly rollups, so the cost grows with the number of
+    buckets in the window, not with the number of detections.
     """
-    one_week_ago = datetime.utcnow() - timedelta(days=7)
-
-    # Total predictions
-    total_predictions = (
-        db.query(func.count(PredictionSession.uid))
-        .filter(
-            PredictionSession.user_id == user_id,
-            PredictionSession.timestamp >= one_week_ago
-        )
-        .scalar()
-    )
-
-    # All detection scores
-    scores = (
-        db.query(DetectionObject.score)
-        .join(PredictionSession, DetectionObject.prediction_uid == PredictionSession.uid)
-        .filter(
-            PredictionSession.user_id == user_id,
-            PredictionSession.timestamp >= one_week_ago
-        )
-        .all()
-    )
-    scores = [s[0] for s in scores]
-    avg_score = round(sum(scores) / len(scores), 3) if scores else 0.0
-
-    # Labels
-    labels = (
-        db.query(DetectionObject.label)
-        .join(PredictionSession, DetectionObject.prediction_uid == PredictionSession.uid)
-        .filter(
-            PredictionSession.user_id == user_id,
-            PredictionSession.timestamp >= one_week_ago
-        )
-        .all()
-    )
-    label_counts = Counter([l[0] for l in labels]).most_common(5)
-
-    return total_predictions, avg_score, label_counts
\ No newline at end of file
+    since = rollup_window_start()
+    totals = db.execute(prediction_totals_statement(user_id, since)).one()
+    label_counts = db.execute(top_labels_statement(user_id, since)).all()
+    return prediction_stats_result(totals, label_counts)
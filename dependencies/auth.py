@@ -6,19 +6,27 @@ Key rules:
 - Use HTTP Basic. Credentials may be missing.
 - If no credentials -> use a single automatic user (created once).
 - If username is given but password missing -> 401.
-- If user exists -> check password.
+- If user exists -> check password (salted PBKDF2 hash; legacy plain-text
+  rows are re-hashed on their next successful login).
 - If user missing -> create it.
 - Protected endpoints: depend on require_authenticated_user_id().
 - Endpoints where auth is optional (/predict) can depend on get_current_or_auto_user_id().
+- Verified credentials and the anonymous user ID are cached in-process
+  (bounded, with a TTL) so most requests skip the users table.
 """
 
+import hashlib
+import hmac
 import os
 from fastapi import Depends, HTTPException, status, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
 from typing import Optional
-from database.connections import Base, engine, get_db
+from database.connections import Base, engine, get_db, SessionLocal
 from models.Users_model import Users
 from sqlalchemy.orm import Session
+from utils.cache import LRUCache
+from utils.passwords import hash_password, verify_password, needs_rehash
 
 
 # Define the path to the SQLite database file
@@ -27,6 +35,49 @@ DB_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "predictions.
 # Set up HTTP Basic Auth (optional – will not auto-reject)
 security = HTTPBasic(auto_error=False)
 
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", "10000"))
+AUTH_CACHE_TTL = float(os.getenv("AUTH_CACHE_TTL", "300"))
+
+# username -> (password digest, user id) for credentials that passed a DB check
+credential_cache = LRUCache(maxsize=AUTH_CACHE_SIZE, ttl=AUTH_CACHE_TTL)
+
+# Plain passwords are never kept in memory; the cache holds an HMAC of them
+# under a key that only lives as long as this process
+_CACHE_SECRET = os.urandom(32)
+
+_anonymous_user_id = None
+
+
+def credential_digest(password: str) -> bytes:
+    return hmac.new(_CACHE_SECRET, password.encode("utf-8"), hashlib.sha256).digest()
+
+
+def remember_credentials(username: str, password: str, user_id: int):
+    credential_cache.put(username, (credential_digest(password), user_id))
+
+
+def cached_user_id(username: str, password: str) -> Optional[int]:
+    """
+    Return the user ID if these credentials were verified recently, else None.
+    """
+    entry = credential_cache.get(username)
+    if entry and hmac.compare_digest(entry[0], credential_digest(password)):
+        return entry[1]
+    return None
+
+
+def invalidate_user(username: str):
+    """
+    Drop a user's cached credentials. Call whenever a user's row changes.
+    """
+    credential_cache.pop(username)
+
+
+def clear_auth_cache():
+    global _anonymous_user_id
+    credential_cache.clear()
+    _anonymous_user_id = None
+
 
 def initialize_users_table():
     """
@@ -46,29 +97,56 @@ def fetch_user_by_name(db: Session, username: str):
 def insert_new_user(db: Session, username: str, password: str) -> int:
     """
     Insert a new user with the given username and password.
-    Returns the new user's ID.
+    The password is stored hashed. Returns the new user's ID.
     """
-    new_user = Users(username=username, password=password)
+    new_user = Users(username=username, password=hash_password(password))
     db.add(new_user)
     db.commit()
     db.refresh(new_user)  # loads the generated ID
+    invalidate_user(username)
     return new_user.id
 
 
+def upgrade_password_hash(db: Session, user_id: int, username: str, password: str):
+    """
+    Replace a plain-text or outdated password hash with a current one.
+    """
+    db.query(Users).filter(Users.id == user_id).update({"password": hash_password(password)})
+    db.commit()
+    invalidate_user(username)
+
+
 def ensure_anonymous_account(db: Session) -> int:
     """
     Ensure the anonymous user exists in the database.
     If not, insert it. Return the anonymous user's ID.
+    The ID is looked up once per process and then served from memory.
     """
+    global _anonymous_user_id
+    if _anonymous_user_id is not None:
+        return _anonymous_user_id
+
     anonymous = db.query(Users).filter(Users.username == "__anonymous__").first()
     if anonymous:
-        return anonymous.id
+        _anonymous_user_id = anonymous.id
+        return _anonymous_user_id
 
     new_user = Users(username="__anonymous__", password="__none__")
     db.add(new_user)
     db.commit()
     db.refresh(new_user)
-    return new_user.id
+    _anonymous_user_id = new_user.id
+    return _anonymous_user_id
+
+
+def warm_auth_cache():
+    """
+    Resolve the anonymous user ID at startup so the first anonymous
+    requests don't have to.
+    """
+    initialize_users_table()
+    with SessionLocal() as db:
+        ensure_anonymous_account(db)
 
 
 def resolve_user_id(
@@ -96,16 +174,50 @@ def resolve_user_id(
     if username and not password:
         raise HTTPException(status_code=401, detail="Password is required.")
 
+    # Recently verified credentials: no DB round trip and no hashing
+    user_id = cached_user_id(username, password)
+    if user_id is not None:
+        return user_id
+
     user = fetch_user_by_name(db, username)
 
     if user:
         # User found – check password
-        if user.password == password:
+        if verify_password(password, user.password):
+            if needs_rehash(user.password):
+                upgrade_password_hash(db, user.id, username, password)
+            remember_credentials(username, password, user.id)
             return user.id
         raise HTTPException(status_code=401, detail="Incorrect password.")
     else:
         # User not found – try to create a new one
         try:
-            return insert_new_user(db, username, password)
+            user_id = insert_new_user(db, username, password)
         except Exception:
-            raise HTTPException(status_code=500, detail="Failed to create user.")
\ No newline at end of file
+            raise HTTPException(status_code=500, detail="Failed to create user.")
+        remember_credentials(username, password, user_id)
+        return user_id
+
+
+async def resolve_user_id_async(
+    request: Request,
+    credentials: Optional[HTTPBasicCredentials] = Depends(security),
+):
+    """
+    resolve_user_id for endpoints running on the event loop: cached
+    credentials are answered in place, anything else goes through
+    resolve_user_id in the threadpool with its own session.
+    """
+    if credentials is None or (not credentials.username and not credentials.password):
+        if _anonymous_user_id is not None:
+            return _anonymous_user_id
+    elif credentials.password:
+        user_id = cached_user_id(credentials.username, credentials.password)
+        if user_id is not None:
+            return user_id
+
+    def resolve():
+        with SessionLocal() as db:
+            return resolve_user_id(request, credentials, db)
+
+    return await run_in_threadpool(resolve)
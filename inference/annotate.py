@@ -0,0 +1,58 @@
+import json
+import os
+import uuid
+import zlib
+from PIL import Image, ImageDraw, ImageOps
+
+# Box colors, picked per label so the same label always gets the same color
+PALETTE = [
+    (255, 56, 56), (255, 157, 151), (255, 112, 31), (255, 178, 29), (207, 210, 49),
+    (72, 249, 10), (146, 204, 23), (61, 219, 134), (26, 147, 52), (0, 212, 187),
+    (44, 153, 168), (0, 194, 255), (52, 69, 147), (100, 115, 255), (0, 24, 236),
+    (132, 56, 255), (82, 0, 133), (203, 56, 255), (255, 149, 200), (255, 55, 199),
+]
+
+
+def label_color(label: str):
+    return PALETTE[zlib.crc32(label.encode()) % len(PALETTE)]
+
+
+def render_annotated_image(original_path: str, detections, output_path: str):
+    """
+    Draw detection boxes and labels onto the original image and save it.
+    detections is an iterable of (label, score, box) where box is
+    [x1, y1, x2, y2] or its stringified form as stored in the DB.
+    The file is written to a temp name and moved into place, so concurrent
+    renders of the same image never expose a half-written file.
+    """
+    with Image.open(original_path) as im:
+        # Boxes are in upright coordinates, as the image was decoded for the model
+        image = ImageOps.exif_transpose(im).convert("RGB")
+
+    draw = ImageDraw.Draw(image)
+    line_width = max(2, round(sum(image.size) / 2 * 0.003))
+
+    for label, score, box in detections:
+        if isinstance(box, str):
+            box = json.loads(box)
+        x1, y1, x2, y2 = box
+        color = label_color(label)
+        draw.rectangle([x1, y1, x2, y2], outline=color, width=line_width)
+
+        text = f"{label} {score:.2f}"
+        left, top, right, bottom = draw.textbbox((0, 0), text)
+        text_w, text_h = right - left, bottom - top + 4
+        # Put the caption above the box, or inside it when at the top edge
+        text_y = y1 - text_h if y1 - text_h >= 0 else y1
+        draw.rectangle([x1, text_y, x1 + text_w + 4, text_y + text_h], fill=color)
+        draw.text((x1 + 2, text_y + 2 - top), text, fill=(255, 255, 255))
+
+    ext = os.path.splitext(output_path)[1].lower()
+    image_format = Image.registered_extensions().get(ext)
+    tmp_path = f"{output_path}.{uuid.uuid4().hex}.tmp"
+    try:
+        image.save(tmp_path, format=image_format)
+        os.replace(tmp_path, output_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
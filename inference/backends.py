@@ -0,0 +1,87 @@
+"""
+Inference backends: the same YOLO model on PyTorch, ONNX Runtime or OpenVINO.
+
+ultralytics runs exported models through the same predictor as .pt
+weights, so every backend returns the same Results objects and
+extract_detections needs no changes. For onnxruntime and openvino the
+.pt weights are exported once per input size into the export directory
+and reused on later starts. With quantization set, the ONNX export is
+additionally quantized to INT8 (see inference.quantization).
+"""
+import os
+import shutil
+import tempfile
+
+from inference.quantization import check_quantization, quantize_model
+
+BACKENDS = ("torch", "onnxruntime", "openvino")
+
+# ultralytics export format and artifact suffix per backend
+_EXPORTS = {
+    "onnxruntime": ("onnx", ".onnx"),
+    "openvino": ("openvino", "_openvino_model"),
+}
+
+
+def check_backend(backend: str) -> str:
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown inference backend {backend!r}, expected one of {', '.join(BACKENDS)}")
+    return backend
+
+
+def exported_path(weights: str, backend: str, imgsz: int, export_dir: str) -> str:
+    """
+    Where the export of weights for backend at imgsz is cached.
+    """
+    stem = os.path.splitext(os.path.basename(weights))[0]
+    return os.path.join(export_dir, f"{stem}-{imgsz}{_EXPORTS[backend][1]}")
+
+
+def export_weights(weights: str, backend: str, imgsz: int, export_dir: str) -> str:
+    """
+    Export weights for backend unless a cached export exists; returns its path.
+    The export runs on a private copy of the weights in a temporary directory
+    and is moved into place at the end, so concurrent processes exporting the
+    same model never see a half-written artifact.
+    """
+    target = exported_path(weights, backend, imgsz, export_dir)
+    if os.path.exists(target):
+        return target
+
+    from ultralytics import YOLO
+
+    os.makedirs(export_dir, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=export_dir) as tmp:
+        # Resolves (downloading if needed) the .pt weights
+        local_weights = shutil.copy(YOLO(weights).ckpt_path, tmp)
+        exported = YOLO(local_weights).export(
+            format=_EXPORTS[backend][0], imgsz=imgsz, dynamic=True, half=False, verbose=False,
+        )
+        try:
+            os.rename(exported, target)
+        except OSError:
+            # Another process moved its export into place first
+            if not os.path.exists(target):
+                raise
+    return target
+
+
+def load_model(weights: str, backend: str = "torch", imgsz: int = 640, export_dir: str = "weights", quantization: str = None):
+    """
+    Build a CPU YOLO model for backend, exporting (and quantizing) the weights first if needed.
+    """
+    check_backend(backend)
+    check_quantization(quantization, backend)
+    if backend == "torch":
+        import torch
+        # Disable GPU usage
+        torch.cuda.is_available = lambda: False
+
+        from ultralytics import YOLO
+        return YOLO(weights)
+
+    from ultralytics import YOLO
+    path = export_weights(weights, backend, imgsz, export_dir)
+    if quantization:
+        path = quantize_model(path, quantization, imgsz)
+    return YOLO(path, task="detect")
@@ -0,0 +1,14 @@
+def extract_detections(result, names):
+    """
+    Convert one YOLO result into plain detection dicts.
+    Returns a list of {"label", "score", "box"} with box as [x1, y1, x2, y2].
+    """
+    detections = []
+    for box in result.boxes:
+        label_idx = int(box.cls[0].item())
+        detections.append({
+            "label": names[label_idx],
+            "score": float(box.conf[0]),
+            "box": box.xyxy[0].tolist()
+        })
+    return detections
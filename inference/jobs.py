@@ -0,0 +1,80 @@
+import threading
+import queue
+from collections import OrderedDict
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class JobQueue:
+    """
+    Bounded background work queue with per-job status tracking.
+
+    submit() never blocks: when max_queued jobs are already waiting it
+    returns False so the caller can push back (e.g. with a 429).
+    Statuses of the most recent max_tracked jobs are kept in memory.
+    """
+
+    def __init__(self, workers: int = 2, max_queued: int = 64, max_tracked: int = 10000):
+        self.workers = workers
+        self.max_tracked = max_tracked
+        self._queue = queue.Queue(maxsize=max_queued)
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def submit(self, job_id: str, fn, *args, owner=None) -> bool:
+        """
+        Queue fn(*args) to run in the background under job_id.
+        Returns False if the queue is full.
+        """
+        self._ensure_started()
+        with self._lock:
+            try:
+                self._queue.put_nowait((job_id, fn, args))
+            except queue.Full:
+                return False
+            self._jobs[job_id] = {"status": QUEUED, "owner": owner, "error": None}
+            while len(self._jobs) > self.max_tracked:
+                self._jobs.popitem(last=False)
+        return True
+
+    def status(self, job_id: str):
+        """
+        Return a copy of the job record ({"status", "owner", "error"}) or None.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def _ensure_started(self):
+        if self._threads:
+            return
+        with self._lock:
+            if not self._threads:
+                for i in range(self.workers):
+                    thread = threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+                    thread.start()
+                    self._threads.append(thread)
+
+    def _update(self, job_id: str, **fields):
+        with self._lock:
+            if job_id in self._jobs:
+                self._jobs[job_id].update(fields)
+
+    def _work(self):
+        while True:
+            job_id, fn, args = self._queue.get()
+            self._update(job_id, status=RUNNING)
+            try:
+                fn(*args)
+                self._update(job_id, status=DONE)
+            except Exception as e:
+                self._update(job_id, status=FAILED, error=str(e))
+            finally:
+                self._queue.task_done()
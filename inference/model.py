@@ -0,0 +1,70 @@
+"""
+Lazily loaded, warmed-up YOLO model.
+
+Importing torch and ultralytics and building the model takes seconds, and
+the first forward pass pays for graph setup on top. ModelHandle defers all
+of it to load(): on first use, or ahead of time from the app's startup hook
+via warmup(), which also runs one dummy image through the model. `ready`
+tells /ready whether requests will be served at full speed: it is set by
+warmup() or, without one, by the first successful forward pass.
+"""
+import threading
+import time
+
+import numpy as np
+
+from inference.backends import load_model, check_backend
+from inference.quantization import check_quantization
+
+
+class ModelHandle:
+    """
+    Callable stand-in for a YOLO model that loads it on first use.
+    """
+
+    def __init__(self, weights: str, imgsz: int = 640, backend: str = "torch", export_dir: str = "weights",
+                 quantization: str = None):
+        self.weights = weights
+        self.imgsz = imgsz
+        self.backend = check_backend(backend)
+        self.export_dir = export_dir
+        self.quantization = check_quantization(quantization, backend)
+        self.ready = False
+        self.load_seconds = None
+        self.warmup_seconds = None
+        self._model = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        return load_model(self.weights, self.backend, self.imgsz, self.export_dir, self.quantization)
+
+    def load(self):
+        """
+        Build the model once; concurrent callers wait for the same load.
+        """
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    start = time.perf_counter()
+                    self._model = self._load()
+                    self.load_seconds = time.perf_counter() - start
+        return self._model
+
+    @property
+    def names(self):
+        return self.load().names
+
+    def __call__(self, *args, **kwargs):
+        results = self.load()(*args, **kwargs)
+        self.ready = True
+        return results
+
+    def warmup(self):
+        """
+        Load the model and run a blank image through it, then mark it ready.
+        """
+        model = self.load()
+        start = time.perf_counter()
+        model(np.zeros((self.imgsz, self.imgsz, 3), dtype=np.uint8), device="cpu", imgsz=self.imgsz, verbose=False)
+        self.warmup_seconds = time.perf_counter() - start
+        self.ready = True
@@ -0,0 +1,49 @@
+"""
+Per-request inference parameters.
+
+InferenceParams is hashable: it is part of the detection cache key and the
+scheduler's batch grouping key, so only requests with identical parameters
+share a forward pass or a cached result.
+"""
+from dataclasses import dataclass
+from typing import Optional
+
+from inference.detections import extract_detections
+
+
+@dataclass(frozen=True)
+class InferenceParams:
+    model: str
+    imgsz: int = 640
+    conf: float = 0.25
+    iou: float = 0.7
+    max_det: int = 300
+    # Labels to keep (sorted); None keeps every class
+    classes: Optional[tuple] = None
+
+
+def class_ids(names: dict, labels) -> Optional[list]:
+    """
+    Model class indices for the given labels; unknown labels match nothing.
+    """
+    if labels is None:
+        return None
+    return [index for index, name in names.items() if name in labels]
+
+
+def predict_with(model, images, params: InferenceParams) -> list:
+    """
+    Run one batch of images through model with params.
+    Returns one list of detections per image.
+    """
+    results = model(
+        images,
+        device="cpu",
+        imgsz=params.imgsz,
+        conf=params.conf,
+        iou=params.iou,
+        max_det=params.max_det,
+        classes=class_ids(model.names, params.classes),
+        verbose=False,
+    )
+    return [extract_detections(result, model.names) for result in results]
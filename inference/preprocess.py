@@ -0,0 +1,100 @@
+"""
+Inference preprocessing: decode uploads at (close to) the model input size.
+
+The model letterboxes every image to imgsz anyway, so decoding a
+12-megapixel photo at full resolution is wasted work. JPEGs are decoded
+at 1/2, 1/4 or 1/8 scale by libjpeg (the equivalent of PIL's draft mode)
+as long as the result still covers imgsz, and whatever remains larger is
+resized down. Detections on the smaller image are mapped back to
+original image coordinates with scale_detections. Like the model's own
+loader, decoding applies EXIF orientation, so "original coordinates" are
+those of the upright image.
+"""
+import io
+from dataclasses import dataclass
+
+import cv2
+import numpy as np
+from fastapi import HTTPException
+from PIL import Image
+
+# EXIF Orientation tag
+ORIENTATION_TAG = 0x0112
+# EXIF orientations that swap width and height (90 / 270 degree rotations)
+_TRANSPOSED_ORIENTATIONS = (5, 6, 7, 8)
+_JPEG_REDUCTIONS = (
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2),
+)
+
+
+@dataclass
+class PreparedImage:
+    image: np.ndarray
+    # Multiply coordinates on image by these to get original pixels
+    scale_x: float
+    scale_y: float
+
+
+def jpeg_reduction(width: int, height: int, imgsz: int) -> int:
+    """
+    cv2.imread flag for the smallest JPEG decode scale whose long side is still >= imgsz.
+    """
+    for factor, flag in _JPEG_REDUCTIONS:
+        if max(width, height) // factor >= imgsz:
+            return flag
+    return cv2.IMREAD_COLOR
+
+
+def prepare_image(data: bytes, imgsz: int = 640) -> PreparedImage:
+    """
+    Decode image bytes to an upright BGR array whose long side is at most imgsz.
+    """
+    try:
+        with Image.open(io.BytesIO(data)) as header:
+            image_format, (width, height) = header.format, header.size
+            if header.getexif().get(ORIENTATION_TAG) in _TRANSPOSED_ORIENTATIONS:
+                width, height = height, width
+    except OSError:
+        raise HTTPException(status_code=400, detail="Could not decode image")
+
+    flag = jpeg_reduction(width, height, imgsz) if image_format == "JPEG" else cv2.IMREAD_COLOR
+    image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), flag)
+    if image is None:
+        raise HTTPException(status_code=400, detail="Could not decode image")
+    return fit_image(image, imgsz, width, height)
+
+
+def fit_image(image: np.ndarray, imgsz: int = 640, width: int = None, height: int = None) -> PreparedImage:
+    """
+    Shrink a decoded BGR image so its long side is at most imgsz. width and
+    height are the original size when image was already decoded smaller.
+    """
+    decoded_height, decoded_width = image.shape[:2]
+    if max(decoded_width, decoded_height) > imgsz:
+        ratio = imgsz / max(decoded_width, decoded_height)
+        size = (max(1, round(decoded_width * ratio)), max(1, round(decoded_height * ratio)))
+        image = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+
+    resized_height, resized_width = image.shape[:2]
+    return PreparedImage(image, (width or decoded_width) / resized_width, (height or decoded_height) / resized_height)
+
+
+def scale_detections(detections: list, scale_x: float, scale_y: float) -> list:
+    """
+    Map detection boxes from the prepared image back to the original image.
+    """
+    if scale_x == 1 and scale_y == 1:
+        return detections
+    return [
+        {
+            **detection,
+            "box": [
+                detection["box"][0] * scale_x,
+                detection["box"][1] * scale_y,
+                detection["box"][2] * scale_x,
+                detection["box"][3] * scale_y,
+            ],
+        } for detection in detections
+    ]
@@ -0,0 +1,149 @@
+"""
+INT8 quantization of the exported ONNX model for CPU inference.
+
+* dynamic - weights are stored as INT8 and activations are quantized on
+  the fly; no calibration data needed.
+* static - weights and activations are INT8 (QDQ format, per-channel
+  weights), with activation ranges calibrated on up to
+  MODEL_CALIBRATION_IMAGES stored uploads from MODEL_CALIBRATION_DIR,
+  preprocessed the same way as at inference time. The detection head
+  (the last /model.N/ module of an ultralytics export) stays FP32: its
+  output concatenates pixel coordinates with 0-1 class scores, which a
+  single INT8 scale can't represent.
+
+The quantized model keeps the FP32 export's metadata (class names, stride,
+input size), so ultralytics loads it like any other ONNX export and
+detections come out in the same format.
+"""
+import os
+import re
+import tempfile
+
+import cv2
+import numpy as np
+
+from inference.preprocess import prepare_image
+
+QUANTIZATION_MODES = ("dynamic", "static")
+
+MODEL_CALIBRATION_DIR = os.getenv("MODEL_CALIBRATION_DIR", "uploads/original")
+MODEL_CALIBRATION_IMAGES = int(os.getenv("MODEL_CALIBRATION_IMAGES", "100"))
+
+# ultralytics pads letterboxed images with this gray
+LETTERBOX_COLOR = (114, 114, 114)
+
+
+def check_quantization(quantization, backend: str):
+    if quantization is None:
+        return None
+    if quantization not in QUANTIZATION_MODES:
+        raise ValueError(f"Unknown quantization {quantization!r}, expected one of {', '.join(QUANTIZATION_MODES)}")
+    if backend != "onnxruntime":
+        raise ValueError("INT8 quantization needs the onnxruntime backend")
+    return quantization
+
+
+def quantized_path(onnx_path: str, quantization: str) -> str:
+    return f"{os.path.splitext(onnx_path)[0]}-int8-{quantization}.onnx"
+
+
+def model_input(data: bytes, imgsz: int) -> np.ndarray:
+    """
+    Letterbox image bytes to the 1x3ximgszximgsz float input of the ONNX model.
+    """
+    image = prepare_image(data, imgsz).image
+    height, width = image.shape[:2]
+    top, left = (imgsz - height) // 2, (imgsz - width) // 2
+    image = cv2.copyMakeBorder(
+        image, top, imgsz - height - top, left, imgsz - width - left,
+        cv2.BORDER_CONSTANT, value=LETTERBOX_COLOR,
+    )
+    return np.ascontiguousarray(image[:, :, ::-1].transpose(2, 0, 1)[None], dtype=np.float32) / 255.0
+
+
+def head_nodes(onnx_path: str) -> list:
+    """
+    Names of the nodes in the last /model.N/ module (the Detect head) of an ultralytics export.
+    """
+    import onnx
+
+    modules = {}
+    for node in onnx.load(onnx_path).graph.node:
+        match = re.match(r"/model\.(\d+)/", node.name)
+        if match:
+            modules.setdefault(int(match.group(1)), []).append(node.name)
+    return modules[max(modules)] if modules else []
+
+
+def calibration_images(directory: str = MODEL_CALIBRATION_DIR, limit: int = MODEL_CALIBRATION_IMAGES) -> list:
+    """
+    Paths of up to limit images in directory, in name order.
+    """
+    if not os.path.isdir(directory):
+        return []
+    names = sorted(name for name in os.listdir(directory) if not name.endswith(".tmp"))
+    return [os.path.join(directory, name) for name in names[:limit]]
+
+
+def calibration_reader(input_name: str, paths: list, imgsz: int):
+    from onnxruntime.quantization import CalibrationDataReader
+
+    class UploadsReader(CalibrationDataReader):
+        def __init__(self):
+            self._paths = iter(paths)
+
+        def get_next(self):
+            for path in self._paths:
+                with open(path, "rb") as f:
+                    data = f.read()
+                try:
+                    return {input_name: model_input(data, imgsz)}
+                except Exception:
+                    # Skip anything that no longer decodes
+                    continue
+            return None
+
+    return UploadsReader()
+
+
+def quantize_model(onnx_path: str, quantization: str, imgsz: int, calibration_paths: list = None) -> str:
+    """
+    Quantize the FP32 ONNX model at onnx_path unless a cached result exists; returns its path.
+    """
+    target = quantized_path(onnx_path, quantization)
+    if os.path.exists(target):
+        return target
+
+    import onnx
+    import onnxruntime
+    from onnxruntime.quantization import QuantFormat, QuantType, quantize_dynamic, quantize_static
+
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(onnx_path) or ".") as tmp:
+        output = os.path.join(tmp, os.path.basename(target))
+        if quantization == "dynamic":
+            quantize_dynamic(onnx_path, output, weight_type=QuantType.QUInt8)
+        else:
+            paths = calibration_images() if calibration_paths is None else calibration_paths
+            if not paths:
+                raise RuntimeError(f"Static quantization needs calibration images in {MODEL_CALIBRATION_DIR}")
+            input_name = onnxruntime.InferenceSession(onnx_path, providers=["CPUExecutionProvider"]).get_inputs()[0].name
+            quantize_static(
+                onnx_path, output, calibration_reader(input_name, paths, imgsz),
+                quant_format=QuantFormat.QDQ,
+                per_channel=True,
+                activation_type=QuantType.QUInt8,
+                weight_type=QuantType.QInt8,
+                nodes_to_exclude=head_nodes(onnx_path),
+            )
+
+        quantized = onnx.load(output)
+        del quantized.metadata_props[:]
+        quantized.metadata_props.extend(onnx.load(onnx_path).metadata_props)
+        onnx.save(quantized, output)
+        try:
+            os.rename(output, target)
+        except OSError:
+            # Another process moved its result into place first
+            if not os.path.exists(target):
+                raise
+    return target
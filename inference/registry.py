@@ -0,0 +1,39 @@
+"""
+Bounded registry of loaded model variants.
+
+Each variant (yolov8n.pt, yolov8s.pt, ...) is a lazily loaded ModelHandle.
+At most max_models of them stay referenced; the least recently used one is
+dropped when another variant is requested, and is loaded again on its next
+use.
+"""
+import threading
+
+from inference.model import ModelHandle
+from utils.cache import LRUCache
+
+
+class ModelRegistry:
+    def __init__(self, max_models: int = 2, imgsz: int = 640, backend: str = "torch", export_dir: str = "weights",
+                 quantization: str = None):
+        self.imgsz = imgsz
+        self.backend = backend
+        self.export_dir = export_dir
+        self.quantization = quantization
+        self._models = LRUCache(maxsize=max(1, max_models))
+        self._lock = threading.Lock()
+
+    def get(self, weights: str) -> ModelHandle:
+        """
+        Handle for weights, created (not yet loaded) if it isn't registered.
+        """
+        with self._lock:
+            handle = self._models.get(weights)
+            if handle is None:
+                handle = ModelHandle(
+                    weights, imgsz=self.imgsz, backend=self.backend, export_dir=self.export_dir, quantization=self.quantization,
+                )
+                self._models.put(weights, handle)
+            return handle
+
+    def stats(self) -> dict:
+        return self._models.stats()
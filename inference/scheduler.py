@@ -0,0 +1,167 @@
+import threading
+import queue
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+class BatchScheduler:
+    """
+    Collects concurrent inference requests into micro-batches.
+
+    Callers submit a single input and get back a Future. A background
+    dispatcher thread waits for the first pending input, keeps collecting
+    until max_batch_size inputs are queued or max_wait_ms has elapsed,
+    then runs predict_fn once on the whole batch and resolves each Future
+    with its own result.
+
+    With max_concurrent_batches > 1 (e.g. a process-pool backend) up to that
+    many batches run at once; while all slots are busy new inputs keep
+    queueing, so the next batch grows instead of waiting alone.
+
+    With group_by set, only inputs with equal group_by(item) share a batch
+    (e.g. the same model and thresholds). Inputs of other groups that
+    arrive meanwhile wait, in order, for the following batches.
+    """
+
+    def __init__(self, predict_fn, max_batch_size: int = 8, max_wait_ms: float = 10, max_concurrent_batches: int = 1,
+                 group_by=None):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        if max_concurrent_batches < 1:
+            raise ValueError("max_concurrent_batches must be at least 1")
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.group_by = group_by
+        self._queue = queue.Queue()
+        # Inputs set aside by _collect for a later batch; dispatcher thread only
+        self._deferred = deque()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._slots = threading.Semaphore(max_concurrent_batches)
+        self._executor = None
+        if max_concurrent_batches > 1:
+            self._executor = ThreadPoolExecutor(max_workers=max_concurrent_batches, thread_name_prefix="batch-runner")
+
+    def submit(self, item) -> Future:
+        """
+        Queue a single input for the next batch.
+        Returns a Future resolved with the result for this input.
+        """
+        self._ensure_started()
+        future = Future()
+        self._queue.put((item, future))
+        return future
+
+    def predict(self, item, timeout: float = None):
+        """
+        Blocking helper: submit an input and wait for its result.
+        """
+        return self.submit(item).result(timeout=timeout)
+
+    def close(self):
+        """
+        Stop the dispatcher thread once the queued inputs are processed.
+        """
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="batch-scheduler", daemon=True)
+                self._thread.start()
+
+    def _collect(self):
+        """
+        Block for the first input, then gather more until the batch is full
+        or the wait window closes. Returns None when asked to stop.
+        Inputs whose caller already cancelled are dropped; the others are
+        marked running, so they can no longer be cancelled.
+        """
+        while True:
+            first = self._deferred.popleft() if self._deferred else self._queue.get()
+            if first is None:
+                return None
+            if self._claim(first):
+                break
+
+        batch = [first]
+        group = self._group(first)
+        if self._deferred:
+            still_deferred = deque()
+            for entry in self._deferred:
+                if len(batch) < self.max_batch_size and self._group(entry) == group:
+                    if self._claim(entry):
+                        batch.append(entry)
+                else:
+                    still_deferred.append(entry)
+            self._deferred = still_deferred
+
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                entry = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if entry is None:
+                # Finish this batch first, then stop
+                self._queue.put(None)
+                break
+            if self._group(entry) != group:
+                self._deferred.append(entry)
+                continue
+            if self._claim(entry):
+                batch.append(entry)
+        return batch
+
+    @staticmethod
+    def _claim(entry) -> bool:
+        return entry[1].set_running_or_notify_cancel()
+
+    def _group(self, entry):
+        return self.group_by(entry[0]) if self.group_by is not None else None
+
+    def _run(self):
+        while True:
+            # Wait for a free slot before collecting, so inputs pile up meanwhile
+            self._slots.acquire()
+            batch = self._collect()
+            if batch is None:
+                self._slots.release()
+                return
+            if self._executor is None:
+                self._dispatch(batch)
+            else:
+                self._executor.submit(self._dispatch, batch)
+
+    def _dispatch(self, batch):
+        items = [item for item, _ in batch]
+        futures = [future for _, future in batch]
+        try:
+            results = list(self.predict_fn(items))
+            if len(results) != len(items):
+                raise RuntimeError(f"Expected {len(items)} results, got {len(results)}")
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self._slots.release()
+
+        for future, result in zip(futures, results):
+            if not future.done():
+                future.set_result(result)
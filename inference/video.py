@@ -0,0 +1,113 @@
+"""
+Video prediction: sample frames from a video file and run them through the
+batch scheduler as a stream.
+
+Frames are decoded one at a time with cv2.VideoCapture; skipped frames are
+only grabbed, never converted. Each sampled frame is shrunk to imgsz and
+submitted to the scheduler, with at most `in_flight` frames waiting for the
+model, so memory stays bounded however long the video is while the
+scheduler still sees enough frames to fill its batches.
+
+Detections are spooled to a temp file while the model runs and saved in
+one go afterwards, so no database transaction stays open during inference.
+"""
+import json
+import tempfile
+from collections import deque
+
+import cv2
+from fastapi import HTTPException
+
+from inference.preprocess import fit_image, scale_detections
+
+
+def probe_video(path: str) -> dict:
+    """
+    Frame rate, frame count and size of a video file; raises 415 if OpenCV
+    can't decode a frame of it.
+    """
+    capture = cv2.VideoCapture(path)
+    try:
+        if not capture.isOpened() or not capture.grab():
+            raise HTTPException(status_code=415, detail="Unsupported video")
+        return {
+            "fps": capture.get(cv2.CAP_PROP_FPS) or None,
+            "frame_count": int(capture.get(cv2.CAP_PROP_FRAME_COUNT)) or None,
+            "width": int(capture.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            "height": int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        }
+    finally:
+        capture.release()
+
+
+def sample_frames(path: str, stride: int = 1, max_fps: float = None, max_frames: int = None):
+    """
+    Yield (frame_index, BGR frame) for every stride-th frame, further thinned
+    to at most max_fps frames per second of video and max_frames frames.
+    """
+    capture = cv2.VideoCapture(path)
+    try:
+        fps = capture.get(cv2.CAP_PROP_FPS) or 0
+        # Without a frame rate max_fps can't be applied
+        min_gap = fps / max_fps if max_fps and fps > 0 else 0
+        index, last, sampled = -1, None, 0
+        while max_frames is None or sampled < max_frames:
+            if not capture.grab():
+                break
+            index += 1
+            if index % stride or (last is not None and index - last < min_gap - 1e-6):
+                continue
+            ok, frame = capture.retrieve()
+            if not ok:
+                break
+            last = index
+            sampled += 1
+            yield index, frame
+    finally:
+        capture.release()
+
+
+def detect_frames(frames, params, submit, in_flight: int = 16):
+    """
+    Yield (frame_index, detections) in frame order for (frame_index, frame)
+    pairs, keeping at most in_flight frames submitted but not yet returned.
+    Boxes are in original frame pixels.
+    """
+    pending = deque()
+    for index, frame in frames:
+        prepared = fit_image(frame, params.imgsz)
+        pending.append((index, prepared.scale_x, prepared.scale_y, submit((prepared.image, params))))
+        if len(pending) >= in_flight:
+            yield _finished(pending.popleft())
+    while pending:
+        yield _finished(pending.popleft())
+
+
+def _finished(entry):
+    index, scale_x, scale_y, future = entry
+    return index, scale_detections(future.result(), scale_x, scale_y)
+
+
+def spool_detections(frame_detections):
+    """
+    Write (frame_index, detections) pairs to an anonymous temp file as they
+    are produced. Returns the file, rewound for read_spool().
+    """
+    spool = tempfile.TemporaryFile("w+")
+    try:
+        for frame_index, detections in frame_detections:
+            spool.write(json.dumps([frame_index, detections]) + "\n")
+        spool.seek(0)
+    except BaseException:
+        spool.close()
+        raise
+    return spool
+
+
+def read_spool(spool):
+    """
+    Yield the (frame_index, detections) pairs written by spool_detections.
+    """
+    for line in spool:
+        frame_index, detections = json.loads(line)
+        yield frame_index, detections
@@ -0,0 +1,86 @@
+"""
+Process-pool inference backend.
+
+Each worker process loads the default model once (in the pool initializer),
+keeps other requested variants in its own bounded ModelRegistry, and
+pins torch's intra-op thread count, so N workers can share a box's cores
+without oversubscribing it (ONNX Runtime and OpenVINO size their own
+thread pools). The web process only ships decoded images to
+the pool and receives plain, picklable predictions back.
+"""
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from inference.model import ModelHandle
+from inference.params import predict_with
+from inference.registry import ModelRegistry
+
+# Per-process models, set by _init_worker inside each worker
+_worker_model = None
+_worker_registry = None
+
+
+def _init_worker(weights: str, threads: int, imgsz: int, backend: str, export_dir: str, quantization: str, max_models: int):
+    global _worker_model, _worker_registry
+    import torch
+    torch.cuda.is_available = lambda: False
+    torch.set_num_threads(threads)
+    torch.set_num_interop_threads(1)
+
+    _worker_model = ModelHandle(weights, imgsz=imgsz, backend=backend, export_dir=export_dir, quantization=quantization)
+    _worker_model.load()
+    _worker_registry = ModelRegistry(max_models, imgsz=imgsz, backend=backend, export_dir=export_dir, quantization=quantization)
+
+
+def _predict_batch(items):
+    """
+    items are (image, InferenceParams) pairs that all share the same params.
+    """
+    params = items[0][1]
+    model = _worker_model if params.model == _worker_model.weights else _worker_registry.get(params.model)
+    return predict_with(model, [image for image, _ in items], params)
+
+
+class ProcessPoolBackend:
+    """
+    Runs batched inference on a pool of worker processes.
+    """
+
+    def __init__(self, weights: str, workers: int, threads_per_worker: int, imgsz: int = 640,
+                 backend: str = "torch", export_dir: str = "weights", quantization: str = None, max_models: int = 2):
+        self.workers = workers
+        self.imgsz = imgsz
+        self.ready = False
+        # spawn, not fork: forking a process that already imported torch is unsafe
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(weights, threads_per_worker, imgsz, backend, export_dir, quantization, max_models),
+        )
+
+    def predict_batch(self, items):
+        """
+        Run one batch on the next free worker and wait for its predictions.
+        Without a warmup, the first batch that succeeds marks the pool ready.
+        """
+        results = self._executor.submit(_predict_batch, items).result()
+        self.ready = True
+        return results
+
+    def warmup(self, params):
+        """
+        Start every worker and run a blank image through its model with params.
+        """
+        blank = (np.zeros((self.imgsz, self.imgsz, 3), dtype=np.uint8), params)
+        # One worker first, so missing weights are downloaded (and exported) only once
+        self.predict_batch([blank])
+        pending = [self._executor.submit(_predict_batch, [blank]) for _ in range(self.workers - 1)]
+        for future in pending:
+            future.result()
+        self.ready = True
+
+    def close(self):
+        self._executor.shutdown(wait=True)
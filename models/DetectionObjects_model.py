@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Index
 from database.connections import Base  # import shared Base
 
 class DetectionObject(Base):
@@ -6,9 +6,30 @@ class DetectionObject(Base):
     Model for detection_objects table
     """
     __tablename__ = 'detection_objects'
+    __table_args__ = (
+        # Fetching/deleting a prediction's objects and every session join
+        Index("ix_detection_objects_prediction_uid", "prediction_uid"),
+        # Label search and label aggregation joined back to the session
+        Index("ix_detection_objects_label_prediction_uid", "label", "prediction_uid"),
+        # Minimum score search
+        Index("ix_detection_objects_score", "score"),
+        # Minimum area and region searches probe each of a user's sessions;
+        # the geometry columns make those probes index-only
+        Index("ix_detection_objects_prediction_uid_geometry", "prediction_uid", "area", "x1", "y1", "x2", "y2"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     prediction_uid = Column(String, ForeignKey("prediction_sessions.uid"))
     label = Column(String)
     score = Column(Float)
+    # Box corners in original image pixels, area = (x2 - x1) * (y2 - y1)
+    x1 = Column(Float)
+    y1 = Column(Float)
+    x2 = Column(Float)
+    y2 = Column(Float)
+    area = Column(Float)
+    # Frame of a /predict/video session the box was found in; NULL for still images
+    frame_index = Column(Integer)
+    # Stringified [x1, y1, x2, y2] list written before the numeric columns
+    # existed; migrations backfill x1..area from it, new rows leave it empty
     box = Column(String)
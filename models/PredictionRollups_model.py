@@ -0,0 +1,34 @@
+from sqlalchemy import Column, String, DateTime, Integer, Float, Index
+from database.connections import Base
+
+class PredictionRollup(Base):
+    """
+    Model for prediction_rollups table
+    Per user and per hour: number of predictions and the sum/count of their
+    detection scores, maintained as predictions are saved and deleted.
+    """
+    __tablename__ = 'prediction_rollups'
+    __table_args__ = (
+        Index("ix_prediction_rollups_bucket", "bucket"),
+    )
+
+    user_id = Column(Integer, primary_key=True)
+    bucket = Column(DateTime, primary_key=True)
+    prediction_count = Column(Integer, nullable=False, default=0)
+    score_sum = Column(Float, nullable=False, default=0.0)
+    score_count = Column(Integer, nullable=False, default=0)
+
+class LabelRollup(Base):
+    """
+    Model for label_rollups table
+    Per user, per hour and per label: number of detections.
+    """
+    __tablename__ = 'label_rollups'
+    __table_args__ = (
+        Index("ix_label_rollups_bucket_label", "bucket", "label"),
+    )
+
+    user_id = Column(Integer, primary_key=True)
+    bucket = Column(DateTime, primary_key=True)
+    label = Column(String, primary_key=True)
+    detection_count = Column(Integer, nullable=False, default=0)
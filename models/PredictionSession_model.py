@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Integer, Float, ForeignKey
+from sqlalchemy import Column, String, DateTime, Integer, Float, ForeignKey, Index
 from datetime import datetime
 from database.connections import Base
 
@@ -7,9 +7,18 @@ class PredictionSession(Base):
     Model for prediction_sessions table
     """
     __tablename__ = 'prediction_sessions'
+    __table_args__ = (
+        # Per-user lookups restricted to a time window (stats, searches)
+        Index("ix_prediction_sessions_user_id_timestamp", "user_id", "timestamp"),
+        # Global "last 7 days" counts and labels
+        Index("ix_prediction_sessions_timestamp", "timestamp"),
+        # Lazy image rendering and shared-original reference counting
+        Index("ix_prediction_sessions_predicted_image", "predicted_image"),
+        Index("ix_prediction_sessions_original_image", "original_image"),
+    )
     
     uid = Column(String, primary_key=True)
     timestamp = Column(DateTime, default=datetime.utcnow)
     original_image = Column(String)
     predicted_image = Column(String)
-    user_id = Column(Integer, ForeignKey("users.id"))
\ No newline at end of file
+    user_id = Column(Integer, ForeignKey("users.id"))
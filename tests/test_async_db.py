@@ -0,0 +1,110 @@
+import os
+import tempfile
+import unittest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from database.connections import Base, create_db_engine, create_async_db_engine, get_async_db
+from database.queries import (
+    query_save_prediction_with_detections,
+    query_get_prediction_with_detections,
+    query_unique_labels_last_7_days,
+    query_prediction_stats,
+)
+from database.async_queries import (
+    query_get_prediction_with_detections_async,
+    query_unique_labels_last_7_days_async,
+    query_prediction_stats_async,
+)
+from dependencies.auth import resolve_user_id_async
+from controller.prediction import get_prediction_by_uid_async, prediction_response_cache
+from controller.labels import get_unique_labels_last_week_async
+from controller.stats import get_prediction_stats_async
+
+
+class AsyncDatabaseTestCase(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        path = os.path.join(self.tmp.name, "test.db")
+        self.engine = create_db_engine(f"sqlite:///{path}")
+        Base.metadata.create_all(bind=self.engine)
+        with sessionmaker(bind=self.engine)() as db:
+            query_save_prediction_with_detections(db, "abc", "o.jpg", "p.jpg", 7, [
+                {"label": "cat", "score": 0.9, "box": [1, 2, 3, 4]},
+                {"label": "dog", "score": 0.5, "box": [5, 6, 7, 8]},
+            ])
+        self.db = sessionmaker(bind=self.engine)()
+        self.async_url = f"sqlite+aiosqlite:///{path}"
+
+    def tearDown(self):
+        self.db.close()
+        self.engine.dispose()
+        self.tmp.cleanup()
+
+
+class TestAsyncQueries(AsyncDatabaseTestCase):
+    async def asyncSetUp(self):
+        self.async_engine = create_async_db_engine(self.async_url)
+        self.async_db = async_sessionmaker(bind=self.async_engine)()
+
+    async def asyncTearDown(self):
+        await self.async_db.close()
+        await self.async_engine.dispose()
+
+    async def test_prediction_matches_sync_query(self):
+        self.assertEqual(
+            await query_get_prediction_with_detections_async(self.async_db, "abc", 7),
+            query_get_prediction_with_detections(self.db, "abc", 7),
+        )
+        self.assertIsNone(await query_get_prediction_with_detections_async(self.async_db, "abc", 8))
+
+    async def test_labels_match_sync_query(self):
+        self.assertEqual(
+            sorted(await query_unique_labels_last_7_days_async(self.async_db)),
+            sorted(query_unique_labels_last_7_days(self.db)),
+        )
+
+    async def test_stats_match_sync_query(self):
+        self.assertEqual(await query_prediction_stats_async(self.async_db, 7), query_prediction_stats(self.db, 7))
+
+
+class TestAsyncEndpoints(AsyncDatabaseTestCase):
+    def setUp(self):
+        super().setUp()
+        prediction_response_cache.clear()
+        # The async handlers are only mounted on the main app with DB_ASYNC set
+        self.app = FastAPI()
+        self.app.add_api_route("/prediction/{uid}", get_prediction_by_uid_async, methods=["GET"])
+        self.app.add_api_route("/labels", get_unique_labels_last_week_async, methods=["GET"])
+        self.app.add_api_route("/stats", get_prediction_stats_async, methods=["GET"])
+
+        async def override_async_db():
+            engine = create_async_db_engine(self.async_url)
+            try:
+                async with async_sessionmaker(bind=engine)() as db:
+                    yield db
+            finally:
+                await engine.dispose()
+
+        self.app.dependency_overrides[get_async_db] = override_async_db
+        self.app.dependency_overrides[resolve_user_id_async] = lambda: 7
+        self.client = TestClient(self.app)
+
+    def test_get_prediction(self):
+        response = self.client.get("/prediction/abc")
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["status"], "done")
+        self.assertEqual([obj["label"] for obj in data["detection_objects"]], ["cat", "dog"])
+
+    def test_missing_prediction(self):
+        self.assertEqual(self.client.get("/prediction/nope").status_code, 404)
+
+    def test_labels_and_stats(self):
+        self.assertEqual(sorted(self.client.get("/labels").json()["labels"]), ["cat", "dog"])
+        stats = self.client.get("/stats").json()
+        self.assertEqual(stats["total_predictions"], 1)
+        self.assertEqual(stats["most_common_labels"], {"cat": 1, "dog": 1})
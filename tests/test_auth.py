@@ -1,4 +1,5 @@
 # tests/test_auth.py
+import asyncio
 import unittest
 from unittest.mock import MagicMock
 from fastapi import HTTPException
@@ -8,6 +9,7 @@ import dependencies.auth as auth
 
 class TestResolveUserId(unittest.TestCase):
     def setUp(self):
+        auth.clear_auth_cache()
         self.mock_db = MagicMock()
         self.mock_request = MagicMock()
 
@@ -68,3 +70,70 @@ class TestResolveUserId(unittest.TestCase):
         creds = HTTPBasicCredentials(username="newuser", password="newpass")
         user_id = auth.resolve_user_id(self.mock_request, credentials=creds, db=self.mock_db)
         self.assertEqual(user_id, 42)
+
+    def test_verified_credentials_are_cached(self):
+        mock_user = MagicMock()
+        mock_user.id = 1
+        mock_user.password = "password123"
+        self.mock_db.query().filter().first.return_value = mock_user
+        creds = HTTPBasicCredentials(username="testuser", password="password123")
+
+        auth.resolve_user_id(self.mock_request, credentials=creds, db=self.mock_db)
+        other_db = MagicMock()
+        user_id = auth.resolve_user_id(self.mock_request, credentials=creds, db=other_db)
+
+        self.assertEqual(user_id, 1)
+        other_db.query.assert_not_called()
+
+    def test_cached_user_with_other_password_is_checked_again(self):
+        mock_user = MagicMock()
+        mock_user.id = 1
+        mock_user.password = "password123"
+        self.mock_db.query().filter().first.return_value = mock_user
+        auth.resolve_user_id(
+            self.mock_request,
+            credentials=HTTPBasicCredentials(username="testuser", password="password123"),
+            db=self.mock_db,
+        )
+
+        with self.assertRaises(HTTPException) as context:
+            auth.resolve_user_id(
+                self.mock_request,
+                credentials=HTTPBasicCredentials(username="testuser", password="wrongpass"),
+                db=self.mock_db,
+            )
+        self.assertEqual(context.exception.status_code, 401)
+
+    def test_invalidate_user_forces_db_check(self):
+        auth.remember_credentials("testuser", "password123", 1)
+        auth.invalidate_user("testuser")
+        # Password was changed in the meantime
+        mock_user = MagicMock()
+        mock_user.id = 1
+        mock_user.password = "newpass"
+        self.mock_db.query().filter().first.return_value = mock_user
+
+        with self.assertRaises(HTTPException):
+            auth.resolve_user_id(
+                self.mock_request,
+                credentials=HTTPBasicCredentials(username="testuser", password="password123"),
+                db=self.mock_db,
+            )
+
+    def test_anonymous_user_id_resolved_once(self):
+        anonymous = MagicMock()
+        anonymous.id = 5
+        self.mock_db.query().filter().first.return_value = anonymous
+
+        self.assertEqual(auth.resolve_user_id(self.mock_request, credentials=None, db=self.mock_db), 5)
+        other_db = MagicMock()
+        self.assertEqual(auth.resolve_user_id(self.mock_request, credentials=None, db=other_db), 5)
+        other_db.query.assert_not_called()
+
+    def test_async_resolve_serves_cached_credentials(self):
+        auth.remember_credentials("testuser", "password123", 1)
+        creds = HTTPBasicCredentials(username="testuser", password="password123")
+
+        user_id = asyncio.run(auth.resolve_user_id_async(self.mock_request, credentials=creds))
+
+        self.assertEqual(user_id, 1)
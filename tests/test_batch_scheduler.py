@@ -0,0 +1,125 @@
+import asyncio
+import unittest
+import threading
+
+from inference.scheduler import BatchScheduler
+
+
+class TestBatchScheduler(unittest.TestCase):
+    def setUp(self):
+        self.batches = []
+        self.release = threading.Event()
+
+    def _doubling_predict(self, items):
+        self.batches.append(list(items))
+        return [item * 2 for item in items]
+
+    def test_results_are_fanned_out_to_each_caller(self):
+        scheduler = BatchScheduler(self._doubling_predict, max_batch_size=4, max_wait_ms=50)
+        futures = [scheduler.submit(i) for i in range(4)]
+
+        self.assertEqual([f.result(timeout=2) for f in futures], [0, 2, 4, 6])
+        scheduler.close()
+
+    def test_concurrent_requests_share_a_batch(self):
+        scheduler = BatchScheduler(self._doubling_predict, max_batch_size=8, max_wait_ms=200)
+        futures = [scheduler.submit(i) for i in range(5)]
+        for f in futures:
+            f.result(timeout=2)
+
+        self.assertEqual(self.batches, [[0, 1, 2, 3, 4]])
+        scheduler.close()
+
+    def test_batches_respect_max_batch_size(self):
+        def slow_predict(items):
+            self.release.wait(timeout=2)
+            return self._doubling_predict(items)
+
+        scheduler = BatchScheduler(slow_predict, max_batch_size=2, max_wait_ms=50)
+        futures = [scheduler.submit(i) for i in range(5)]
+        self.release.set()
+        for f in futures:
+            f.result(timeout=2)
+
+        self.assertTrue(all(len(batch) <= 2 for batch in self.batches))
+        self.assertEqual(sorted(i for batch in self.batches for i in batch), [0, 1, 2, 3, 4])
+        scheduler.close()
+
+    def test_errors_propagate_to_every_caller_in_the_batch(self):
+        def failing_predict(items):
+            raise RuntimeError("model crashed")
+
+        scheduler = BatchScheduler(failing_predict, max_batch_size=4, max_wait_ms=50)
+        futures = [scheduler.submit(i) for i in range(3)]
+
+        for f in futures:
+            with self.assertRaises(RuntimeError):
+                f.result(timeout=2)
+        scheduler.close()
+
+    def test_result_count_mismatch_is_an_error(self):
+        scheduler = BatchScheduler(lambda items: [], max_batch_size=1, max_wait_ms=0)
+
+        with self.assertRaises(RuntimeError):
+            scheduler.predict("image", timeout=2)
+        scheduler.close()
+
+    def test_concurrent_batches_run_in_parallel(self):
+        started = threading.Barrier(2, timeout=2)
+
+        def blocking_predict(items):
+            # Both batches must be in flight at once to pass the barrier
+            started.wait()
+            return self._doubling_predict(items)
+
+        scheduler = BatchScheduler(blocking_predict, max_batch_size=1, max_wait_ms=0, max_concurrent_batches=2)
+        futures = [scheduler.submit(i) for i in range(2)]
+
+        self.assertEqual(sorted(f.result(timeout=2) for f in futures), [0, 2])
+        scheduler.close()
+
+    def test_batches_only_mix_inputs_of_one_group(self):
+        scheduler = BatchScheduler(self._doubling_predict, max_batch_size=8, max_wait_ms=200, group_by=lambda item: item % 2)
+        futures = [scheduler.submit(i) for i in range(6)]
+
+        self.assertEqual([f.result(timeout=2) for f in futures], [0, 2, 4, 6, 8, 10])
+        self.assertEqual(self.batches, [[0, 2, 4], [1, 3, 5]])
+        scheduler.close()
+
+    def test_cancelled_waiters_are_dropped_and_the_rest_still_served(self):
+        scheduler = BatchScheduler(self._doubling_predict, max_batch_size=8, max_wait_ms=200)
+        futures = [scheduler.submit(i) for i in range(3)]
+        self.assertTrue(futures[1].cancel())
+
+        self.assertEqual([futures[0].result(timeout=2), futures[2].result(timeout=2)], [0, 4])
+        self.assertEqual(self.batches, [[0, 2]])
+        self.assertEqual(scheduler.predict(5, timeout=2), 10)
+        scheduler.close()
+
+    def test_waiter_cancelled_while_its_batch_runs(self):
+        started = threading.Event()
+
+        def slow_predict(items):
+            started.set()
+            self.release.wait(timeout=2)
+            return self._doubling_predict(items)
+
+        scheduler = BatchScheduler(slow_predict, max_batch_size=2, max_wait_ms=50)
+
+        async def cancel_one():
+            waiters = [asyncio.wrap_future(scheduler.submit(i)) for i in range(2)]
+            await asyncio.get_running_loop().run_in_executor(None, started.wait, 2)
+            waiters[0].cancel()
+            # Let the cancellation reach the scheduler's future before the batch finishes
+            await asyncio.sleep(0)
+            self.release.set()
+            results = await asyncio.wait_for(asyncio.gather(*waiters, return_exceptions=True), timeout=2)
+            return isinstance(results[0], asyncio.CancelledError), results[1]
+
+        self.assertEqual(asyncio.run(cancel_one()), (True, 2))
+        self.assertEqual(scheduler.predict(3, timeout=2), 6)
+        scheduler.close()
+
+    def test_invalid_batch_size_rejected(self):
+        with self.assertRaises(ValueError):
+            BatchScheduler(self._doubling_predict, max_batch_size=0)
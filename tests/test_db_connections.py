@@ -0,0 +1,36 @@
+import os
+import tempfile
+import unittest
+from sqlalchemy import text
+
+from database.connections import create_db_engine
+
+
+class TestCreateDbEngine(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.engine = create_db_engine(f"sqlite:///{os.path.join(self.tmp.name, 'test.db')}")
+
+    def tearDown(self):
+        self.engine.dispose()
+        self.tmp.cleanup()
+
+    def pragma(self, name):
+        with self.engine.connect() as conn:
+            return conn.execute(text(f"PRAGMA {name}")).scalar()
+
+    def test_sqlite_pragmas_applied_on_connect(self):
+        self.assertEqual(self.pragma("journal_mode"), "wal")
+        self.assertEqual(self.pragma("synchronous"), 1)  # NORMAL
+        self.assertEqual(self.pragma("busy_timeout"), 5000)
+        self.assertGreater(self.pragma("mmap_size"), 0)
+
+    def test_pool_is_sized_from_settings(self):
+        self.assertEqual(self.engine.pool.size(), 10)
+        self.assertEqual(self.engine.pool._max_overflow, 20)
+
+    def test_in_memory_database(self):
+        engine = create_db_engine("sqlite://")
+        with engine.connect() as conn:
+            self.assertEqual(conn.execute(text("SELECT 1")).scalar(), 1)
+        engine.dispose()
@@ -1,10 +1,17 @@
+import asyncio
+import io
+import os
+import tempfile
 import unittest
 from unittest.mock import patch, MagicMock
 from fastapi.testclient import TestClient
 from fastapi import status
+from PIL import Image
 from app import app
 from dependencies.auth import resolve_user_id
 from database.connections import get_db
+from controller.prediction import remove_original, save_prediction, detect_image, prediction_cache
+from inference.params import InferenceParams
 
 class TestDeletePredictionEndpoint(unittest.TestCase):
     def setUp(self):
@@ -20,12 +27,15 @@ class TestDeletePredictionEndpoint(unittest.TestCase):
     def tearDown(self):
         app.dependency_overrides = {}
 
+    @patch("controller.prediction.query_count_predictions_by_original_image")
     @patch("controller.prediction.query_delete_prediction_by_uid")
+    @patch("controller.prediction.os.replace")
     @patch("controller.prediction.os.remove")
     @patch("controller.prediction.os.path.exists")
-    def test_delete_prediction_success(self, mock_exists, mock_remove, mock_query):
-        # Simulate files exist
+    def test_delete_prediction_success(self, mock_exists, mock_remove, mock_replace, mock_query, mock_count):
+        # Simulate files exist and no other prediction uses the original
         mock_exists.return_value = True
+        mock_count.return_value = 0
 
         # Simulate returned file paths
         mock_query.return_value = ("/tmp/fake_original.jpg", "/tmp/fake_predicted.jpg")
@@ -48,3 +58,72 @@ class TestDeletePredictionEndpoint(unittest.TestCase):
 
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
         mock_remove.assert_not_called()
+
+    @patch("controller.prediction.query_count_predictions_by_original_image")
+    @patch("controller.prediction.query_delete_prediction_by_uid")
+    @patch("controller.prediction.os.remove")
+    @patch("controller.prediction.os.path.exists")
+    def test_shared_original_is_kept(self, mock_exists, mock_remove, mock_query, mock_count):
+        # Another prediction of the same image still references the original
+        mock_exists.return_value = True
+        mock_count.return_value = 1
+        mock_query.return_value = ("/tmp/shared_original.jpg", "/tmp/fake_predicted.jpg")
+
+        response = self.client.delete(f"/prediction/{self.fake_uid}")
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        mock_remove.assert_called_once_with("/tmp/fake_predicted.jpg")
+
+
+class TestSharedOriginalRace(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "digest.jpg")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    @patch("controller.prediction.query_count_predictions_by_original_image")
+    def test_original_is_restored_when_a_prediction_commits_during_delete(self, mock_count):
+        with open(self.path, "wb") as f:
+            f.write(b"image")
+        # Unreferenced when first counted, referenced by the time it is moved aside
+        mock_count.side_effect = [0, 1]
+
+        remove_original(MagicMock(), self.path)
+
+        self.assertEqual(os.listdir(self.tmp.name), ["digest.jpg"])
+
+    @patch("controller.prediction.query_count_predictions_by_original_image", return_value=0)
+    def test_unreferenced_original_is_removed(self, mock_count):
+        with open(self.path, "wb") as f:
+            f.write(b"image")
+
+        remove_original(MagicMock(), self.path)
+
+        self.assertEqual(os.listdir(self.tmp.name), [])
+
+    @patch("controller.prediction.query_save_prediction_with_detections")
+    def test_original_deleted_while_the_model_ran_is_recreated_on_save(self, mock_save):
+        # /predict reused the existing original, then a DELETE of another prediction removed it
+        save_prediction(MagicMock(), "uid", self.path, b"image", "p.jpg", 1, [])
+
+        mock_save.assert_called_once()
+        with open(self.path, "rb") as f:
+            self.assertEqual(f.read(), b"image")
+
+    @patch("controller.prediction.query_count_predictions_by_original_image", return_value=1)
+    @patch("controller.prediction.scheduler")
+    def test_failed_upload_keeps_an_original_another_prediction_committed(self, mock_scheduler, mock_count):
+        prediction_cache.clear()
+        buffer = io.BytesIO()
+        Image.new("RGB", (64, 48), color="white").save(buffer, format="PNG")
+        # The model fails for this upload after an upload of the same bytes reused its original and committed
+        mock_scheduler.submit.side_effect = RuntimeError("model crashed")
+
+        with patch("controller.prediction.UPLOAD_DIR", self.tmp.name):
+            with self.assertRaises(RuntimeError):
+                asyncio.run(detect_image(buffer.getvalue(), InferenceParams("yolov8n.pt")))
+
+        self.assertEqual(len(os.listdir(self.tmp.name)), 1)
+        mock_count.assert_called()
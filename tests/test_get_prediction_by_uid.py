@@ -1,12 +1,18 @@
 import unittest
 from unittest.mock import patch, MagicMock
 from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 from app import app
 from dependencies.auth import resolve_user_id
-from database.connections import get_db
+from database.connections import Base, get_db
+from database.queries import query_save_prediction_with_detections, query_get_prediction_with_detections
+from controller.prediction import prediction_response_cache
 
 class TestGetPredictionByUID(unittest.TestCase):
     def setUp(self):
+        prediction_response_cache.clear()
         self.client = TestClient(app)
         self.fake_user_id = 42
         self.mock_db = MagicMock()
@@ -17,37 +23,158 @@ class TestGetPredictionByUID(unittest.TestCase):
     def tearDown(self):
         app.dependency_overrides = {}
 
-    @patch("controller.prediction.query_get_prediction_by_uid")
-    @patch("controller.prediction.query_get_detection_objects_by_prediction_uid")
-    def test_get_prediction_success(self, mock_get_objects, mock_get_session):
-        # Mock session
-        mock_session = MagicMock()
-        mock_session.uid = "abc123"
-        mock_session.timestamp = "2024-01-01T12:00:00"
-        mock_session.original_image = "uploads/original/abc123.jpg"
-        mock_session.predicted_image = "uploads/predicted/abc123.jpg"
-        mock_get_session.return_value = mock_session
-
-        # Mock detection objects
-        mock_object = MagicMock()
-        mock_object.id = 1
-        mock_object.label = "cat"
-        mock_object.score = 0.9
-        mock_object.box = [10, 20, 30, 40]
-        mock_get_objects.return_value = [mock_object]
+    def fake_prediction(self):
+        return {
+            "uid": "abc123",
+            "timestamp": "2024-01-01T12:00:00",
+            "original_image": "uploads/original/abc123.jpg",
+            "predicted_image": "uploads/predicted/abc123.jpg",
+            "detection_objects": [
+                {"id": 1, "label": "cat", "score": 0.9, "box": [10.0, 20.0, 30.0, 40.0], "area": 400.0}
+            ]
+        }
+
+    @patch("controller.prediction.query_get_prediction_with_detections")
+    def test_get_prediction_success(self, mock_get_prediction):
+        mock_get_prediction.return_value = self.fake_prediction()
 
         response = self.client.get("/prediction/abc123")
         self.assertEqual(response.status_code, 200)
         data = response.json()
         self.assertEqual(data["uid"], "abc123")
+        self.assertEqual(data["status"], "done")
         self.assertEqual(data["original_image"], "uploads/original/abc123.jpg")
         self.assertEqual(len(data["detection_objects"]), 1)
         self.assertEqual(data["detection_objects"][0]["label"], "cat")
 
-    @patch("controller.prediction.query_get_prediction_by_uid")
-    def test_get_prediction_not_found(self, mock_get_session):
-        mock_get_session.return_value = None  # Simulate missing session
+    @patch("controller.prediction.query_get_prediction_with_detections")
+    def test_get_prediction_not_found(self, mock_get_prediction):
+        mock_get_prediction.return_value = None  # Simulate missing session
 
         response = self.client.get("/prediction/does_not_exist")
         self.assertEqual(response.status_code, 404)
         self.assertEqual(response.json()["detail"], "Prediction not found")
+
+    @patch("controller.prediction.query_get_prediction_with_detections")
+    def test_repeated_get_is_served_from_cache(self, mock_get_prediction):
+        mock_get_prediction.return_value = self.fake_prediction()
+
+        first = self.client.get("/prediction/abc123")
+        second = self.client.get("/prediction/abc123")
+
+        self.assertEqual(first.json(), second.json())
+        mock_get_prediction.assert_called_once()
+
+    @patch("controller.prediction.query_count_predictions_by_original_image", return_value=1)
+    @patch("controller.prediction.query_delete_prediction_by_uid")
+    @patch("controller.prediction.query_get_prediction_with_detections")
+    def test_delete_invalidates_cached_response(self, mock_get_prediction, mock_delete, _mock_count):
+        mock_get_prediction.return_value = self.fake_prediction()
+        mock_delete.return_value = ("uploads/original/abc123.jpg", "uploads/predicted/missing.jpg")
+        self.client.get("/prediction/abc123")
+
+        self.client.delete("/prediction/abc123")
+        mock_get_prediction.return_value = None
+        response = self.client.get("/prediction/abc123")
+
+        self.assertEqual(response.status_code, 404)
+
+
+class TestGetPredictionPages(unittest.TestCase):
+    def setUp(self):
+        prediction_response_cache.clear()
+        self.engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(bind=self.engine)
+        self.db = sessionmaker(bind=self.engine, autoflush=False, autocommit=False)()
+        app.dependency_overrides[resolve_user_id] = lambda: 7
+        app.dependency_overrides[get_db] = lambda: self.db
+        self.client = TestClient(app)
+
+    def tearDown(self):
+        app.dependency_overrides = {}
+        self.db.close()
+        self.engine.dispose()
+
+    def save(self, uid, count):
+        detections = [{"label": "cat", "score": 0.5, "box": [i, 0, i + 1, 1]} for i in range(count)]
+        query_save_prediction_with_detections(self.db, uid, "o.jpg", "p.jpg", 7, detections)
+
+    def test_large_prediction_is_paged_and_not_cached(self):
+        self.save("video", 5)
+
+        first = self.client.get("/prediction/video?limit=2")
+        second = self.client.get(f"/prediction/video?limit=2&cursor={first.headers['x-next-cursor']}")
+        last = self.client.get(f"/prediction/video?limit=2&cursor={second.headers['x-next-cursor']}")
+
+        pages = [first, second, last]
+        self.assertEqual([len(page.json()["detection_objects"]) for page in pages], [2, 2, 1])
+        self.assertNotIn("x-next-cursor", last.headers)
+        self.assertEqual([obj["box"][0] for page in pages for obj in page.json()["detection_objects"]], [0, 1, 2, 3, 4])
+        self.assertEqual(len(prediction_response_cache), 0)
+
+    @patch("controller.prediction.PREDICTION_RESPONSE_CACHE_MAX_DETECTIONS", 3)
+    def test_only_small_complete_bodies_are_cached(self):
+        self.save("small", 3)
+        self.save("big", 4)
+
+        self.client.get("/prediction/small")
+        self.client.get("/prediction/big")
+
+        self.assertEqual(len(prediction_response_cache), 1)
+        # A cached body bigger than the requested page isn't served for it
+        self.assertEqual(len(self.client.get("/prediction/small?limit=2").json()["detection_objects"]), 2)
+
+
+class TestGetPredictionWithDetectionsQuery(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine(
+            "sqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        Base.metadata.create_all(bind=self.engine)
+        self.db = sessionmaker(bind=self.engine, autoflush=False, autocommit=False)()
+
+    def tearDown(self):
+        self.db.close()
+        self.engine.dispose()
+
+    def test_session_and_detections_in_one_result(self):
+        detections = [
+            {"label": "cat", "score": 0.9, "box": [1.0, 2.0, 3.0, 4.0]},
+            {"label": "dog", "score": 0.8, "box": [5.0, 6.0, 7.0, 8.0]},
+        ]
+        query_save_prediction_with_detections(self.db, "abc", "o.jpg", "p.jpg", 7, detections)
+
+        prediction = query_get_prediction_with_detections(self.db, "abc", 7)
+
+        self.assertEqual(prediction["original_image"], "o.jpg")
+        self.assertEqual(
+            [(obj["label"], obj["score"], obj["box"], obj["area"]) for obj in prediction["detection_objects"]],
+            [("cat", 0.9, [1.0, 2.0, 3.0, 4.0], 4.0), ("dog", 0.8, [5.0, 6.0, 7.0, 8.0], 4.0)],
+        )
+
+    def test_prediction_without_detections(self):
+        query_save_prediction_with_detections(self.db, "empty", "o.jpg", "p.jpg", 7, [])
+
+        prediction = query_get_prediction_with_detections(self.db, "empty", 7)
+
+        self.assertEqual(prediction["uid"], "empty")
+        self.assertEqual(prediction["detection_objects"], [])
+
+    def test_detections_are_paged_by_id(self):
+        detections = [{"label": f"l{i}", "score": 0.5, "box": [0, 0, 1, 1]} for i in range(5)]
+        query_save_prediction_with_detections(self.db, "abc", "o.jpg", "p.jpg", 7, detections)
+
+        first = query_get_prediction_with_detections(self.db, "abc", 7, limit=2)
+        second = query_get_prediction_with_detections(self.db, "abc", 7, limit=2, after=first["detection_objects"][-1]["id"])
+        past_end = query_get_prediction_with_detections(self.db, "abc", 7, limit=2, after=10 ** 6)
+
+        self.assertEqual([obj["label"] for obj in first["detection_objects"]], ["l0", "l1"])
+        self.assertEqual([obj["label"] for obj in second["detection_objects"]], ["l2", "l3"])
+        self.assertEqual((past_end["uid"], past_end["detection_objects"]), ("abc", []))
+
+    def test_other_users_prediction_is_not_found(self):
+        query_save_prediction_with_detections(self.db, "abc", "o.jpg", "p.jpg", 7, [])
+
+        self.assertIsNone(query_get_prediction_with_detections(self.db, "abc", 8))
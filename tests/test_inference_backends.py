@@ -0,0 +1,42 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from inference.backends import check_backend, exported_path, export_weights, load_model
+from inference.model import ModelHandle
+
+
+class TestInferenceBackends(unittest.TestCase):
+    def test_unknown_backend_is_rejected(self):
+        self.assertEqual(check_backend("onnxruntime"), "onnxruntime")
+        with self.assertRaises(ValueError):
+            check_backend("tensorrt")
+        with self.assertRaises(ValueError):
+            ModelHandle("yolov8n.pt", backend="tensorrt")
+
+    def test_export_path_depends_on_backend_and_input_size(self):
+        self.assertEqual(exported_path("yolov8n.pt", "onnxruntime", 640, "weights"), os.path.join("weights", "yolov8n-640.onnx"))
+        self.assertEqual(exported_path("yolov8n.pt", "openvino", 320, "w"), os.path.join("w", "yolov8n-320_openvino_model"))
+
+    @patch("ultralytics.YOLO")
+    def test_cached_export_is_reused(self, mock_yolo):
+        with tempfile.TemporaryDirectory() as export_dir:
+            target = exported_path("yolov8n.pt", "onnxruntime", 640, export_dir)
+            open(target, "wb").close()
+
+            self.assertEqual(export_weights("yolov8n.pt", "onnxruntime", 640, export_dir), target)
+            mock_yolo.assert_not_called()
+
+    @patch("ultralytics.YOLO")
+    @patch("inference.backends.export_weights", return_value="weights/yolov8n-640.onnx")
+    def test_onnx_backend_loads_the_export(self, mock_export, mock_yolo):
+        model = load_model("yolov8n.pt", "onnxruntime", 640, "weights")
+
+        mock_export.assert_called_once_with("yolov8n.pt", "onnxruntime", 640, "weights")
+        mock_yolo.assert_called_once_with("weights/yolov8n-640.onnx", task="detect")
+        self.assertIs(model, mock_yolo.return_value)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+import io
+import unittest
+from unittest.mock import patch, MagicMock
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from app import app
+from dependencies.auth import resolve_user_id
+from database.connections import get_db
+from controller.prediction import prediction_cache, default_params
+from inference.model import ModelHandle
+from inference.params import InferenceParams, class_ids
+from inference.registry import ModelRegistry
+
+
+def image_bytes(size=(1280, 960)):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, color="white").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class TestInferenceParams(unittest.TestCase):
+    def test_labels_map_to_model_class_ids(self):
+        names = {0: "person", 1: "bicycle", 2: "car"}
+
+        self.assertIsNone(class_ids(names, None))
+        self.assertEqual(class_ids(names, ("car", "person")), [0, 2])
+        self.assertEqual(class_ids(names, ("unicorn",)), [])
+
+    def test_params_are_hashable_cache_keys(self):
+        self.assertEqual(hash(InferenceParams("yolov8n.pt")), hash(InferenceParams("yolov8n.pt")))
+        self.assertNotEqual(InferenceParams("yolov8n.pt"), InferenceParams("yolov8n.pt", imgsz=320))
+
+
+class TestModelRegistry(unittest.TestCase):
+    def test_least_recently_used_variant_is_dropped(self):
+        registry = ModelRegistry(max_models=2)
+        small = registry.get("yolov8n.pt")
+        registry.get("yolov8s.pt")
+
+        self.assertIs(registry.get("yolov8n.pt"), small)
+        registry.get("yolov8m.pt")
+
+        self.assertIs(registry.get("yolov8n.pt"), small)
+        self.assertEqual(registry.stats()["evictions"], 1)
+        self.assertIsInstance(small, ModelHandle)
+        self.assertFalse(small.ready)
+
+
+class TestPredictParams(unittest.TestCase):
+    def setUp(self):
+        self.client = TestClient(app)
+        prediction_cache.clear()
+        app.dependency_overrides[resolve_user_id] = lambda: 1
+        app.dependency_overrides[get_db] = lambda: MagicMock()
+
+    def tearDown(self):
+        app.dependency_overrides = {}
+
+    def post(self, query=""):
+        return self.client.post(f"/predict{query}", files={"file": ("a.png", image_bytes(), "image/png")})
+
+    @patch("controller.prediction.write_file")
+    @patch("controller.prediction.query_save_prediction_with_detections")
+    @patch("controller.prediction.model")
+    def test_request_overrides_defaults(self, mock_model, mock_save, mock_write):
+        mock_model.return_value = [MagicMock(boxes=[])]
+        mock_model.names = {0: "person", 1: "bicycle", 2: "car"}
+
+        response = self.post("?imgsz=320&conf=0.5&iou=0.6&max_det=10&classes=car,person")
+
+        self.assertEqual(response.status_code, 200)
+        images = mock_model.call_args[0][0]
+        self.assertEqual(images[0].shape, (240, 320, 3))
+        kwargs = mock_model.call_args[1]
+        self.assertEqual(
+            (kwargs["imgsz"], kwargs["conf"], kwargs["iou"], kwargs["max_det"], kwargs["classes"]),
+            (320, 0.5, 0.6, 10, [0, 2]),
+        )
+
+    @patch("controller.prediction.write_file")
+    @patch("controller.prediction.query_save_prediction_with_detections")
+    @patch("controller.prediction.model")
+    def test_server_defaults_apply_without_parameters(self, mock_model, mock_save, mock_write):
+        mock_model.return_value = [MagicMock(boxes=[])]
+
+        self.assertEqual(self.post().status_code, 200)
+
+        kwargs = mock_model.call_args[1]
+        self.assertEqual((kwargs["imgsz"], kwargs["conf"], kwargs["classes"]), (default_params.imgsz, default_params.conf, None))
+
+    @patch("controller.prediction.write_file")
+    @patch("controller.prediction.query_save_prediction_with_detections")
+    @patch("controller.prediction.model")
+    def test_cached_detections_are_per_parameter_set(self, mock_model, mock_save, mock_write):
+        mock_model.return_value = [MagicMock(boxes=[])]
+
+        self.post("?conf=0.5")
+        self.post("?conf=0.5")
+        self.post("?conf=0.6")
+
+        self.assertEqual(mock_model.call_count, 2)
+
+    @patch("controller.prediction.write_file")
+    @patch("controller.prediction.query_save_prediction_with_detections")
+    @patch("controller.prediction.model_registry")
+    @patch("controller.prediction.model")
+    def test_other_variant_comes_from_the_registry(self, mock_model, mock_registry, mock_save, mock_write):
+        variant = mock_registry.get.return_value
+        variant.return_value = [MagicMock(boxes=[])]
+
+        self.assertEqual(self.post("?model=yolov8s.pt").status_code, 200)
+
+        mock_registry.get.assert_called_once_with("yolov8s.pt")
+        mock_model.assert_not_called()
+
+    @patch("controller.prediction.model")
+    def test_invalid_parameters_are_rejected(self, mock_model):
+        self.assertEqual(self.post("?model=../../secret.pt").status_code, 400)
+        self.assertEqual(self.post("?imgsz=333").status_code, 400)
+        self.assertEqual(self.post("?imgsz=4096").status_code, 400)
+        self.assertEqual(self.post("?classes=,").status_code, 400)
+        self.assertEqual(self.post("?conf=1.5").status_code, 422)
+        mock_model.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
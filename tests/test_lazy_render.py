@@ -0,0 +1,106 @@
+import unittest
+import os
+import tempfile
+from unittest.mock import patch, MagicMock
+from fastapi.testclient import TestClient
+from fastapi import status
+from PIL import Image
+
+from app import app
+from dependencies.auth import resolve_user_id
+from database.connections import get_db
+from inference.annotate import render_annotated_image
+
+
+class TestRenderAnnotatedImage(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.original_path = os.path.join(self.tmp.name, "original.jpg")
+        Image.new("RGB", (64, 48), color="white").save(self.original_path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_draws_boxes_from_stored_detections(self):
+        output_path = os.path.join(self.tmp.name, "predicted.png")
+        detections = [
+            ("cat", 0.9, "[1.0, 2.0, 30.0, 40.0]"),
+            ("dog", 0.5, [10.0, 10.0, 60.0, 45.0]),
+        ]
+
+        render_annotated_image(self.original_path, detections, output_path)
+
+        with Image.open(output_path) as rendered:
+            self.assertEqual(rendered.size, (64, 48))
+            self.assertEqual(rendered.format, "PNG")
+            # Box outline is no longer the white background
+            self.assertNotEqual(rendered.convert("RGB").getpixel((1, 20)), (255, 255, 255))
+        self.assertEqual(sorted(os.listdir(self.tmp.name)), ["original.jpg", "predicted.png"])
+
+    def test_rotated_original_is_drawn_upright(self):
+        image = Image.new("RGB", (64, 48), color="white")
+        exif = image.getexif()
+        exif[0x0112] = 6
+        image.save(self.original_path, exif=exif.tobytes())
+        output_path = os.path.join(self.tmp.name, "predicted.png")
+
+        render_annotated_image(self.original_path, [("cat", 0.9, [1.0, 50.0, 40.0, 60.0])], output_path)
+
+        with Image.open(output_path) as rendered:
+            # Same orientation the model saw, so the box below y=48 is on the image
+            self.assertEqual(rendered.size, (48, 64))
+            self.assertNotEqual(rendered.convert("RGB").getpixel((20, 60)), (255, 255, 255))
+
+
+class TestLazyPredictedImage(unittest.TestCase):
+    def setUp(self):
+        self.client = TestClient(app)
+        self.mock_db = MagicMock()
+        app.dependency_overrides[resolve_user_id] = lambda: 1
+        app.dependency_overrides[get_db] = lambda: self.mock_db
+
+        self.predicted_path = "uploads/predicted/abc.jpg"
+        self.original_path = "uploads/original/abc.jpg"
+        self.detections = [("cat", 0.9, "[1.0, 2.0, 3.0, 4.0]")]
+
+    def tearDown(self):
+        app.dependency_overrides = {}
+
+    @patch("controller.image.render_annotated_image")
+    @patch("controller.image.query_render_data_by_predicted_image")
+    @patch("controller.image.os.path.exists")
+    @patch("controller.image.FileResponse")
+    def test_missing_image_is_rendered_on_first_request(self, mock_file_response, mock_exists, mock_render_data, mock_render):
+        mock_exists.side_effect = lambda path: path == self.original_path
+        mock_render_data.return_value = (self.original_path, self.detections)
+
+        response = self.client.get("/image/predicted/abc.jpg")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        mock_render_data.assert_called_once_with(self.mock_db, self.predicted_path)
+        mock_render.assert_called_once_with(self.original_path, self.detections, self.predicted_path)
+        mock_file_response.assert_called_once_with(self.predicted_path)
+
+    @patch("controller.image.render_annotated_image")
+    @patch("controller.image.query_render_data_by_predicted_image")
+    @patch("controller.image.os.path.exists")
+    @patch("controller.image.FileResponse")
+    def test_cached_image_is_not_rendered_again(self, mock_file_response, mock_exists, mock_render_data, mock_render):
+        mock_exists.return_value = True
+
+        response = self.client.get("/image/predicted/abc.jpg")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        mock_render_data.assert_not_called()
+        mock_render.assert_not_called()
+
+    @patch("controller.image.query_render_data_by_predicted_image")
+    @patch("controller.image.os.path.exists")
+    def test_unknown_prediction_is_404(self, mock_exists, mock_render_data):
+        mock_exists.return_value = False
+        mock_render_data.return_value = None
+
+        response = self.client.get("/image/predicted/abc.jpg")
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response.json()["detail"], "Image not found")
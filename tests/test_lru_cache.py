@@ -0,0 +1,68 @@
+import unittest
+from unittest.mock import patch
+
+from utils.cache import LRUCache
+
+
+class TestLRUCache(unittest.TestCase):
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = LRUCache(maxsize=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), 3)
+        self.assertEqual(cache.evictions, 1)
+
+    def test_stats_report_hit_rate(self):
+        cache = LRUCache(maxsize=4)
+        cache.put("a", 1)
+        cache.get("a")
+        cache.get("missing")
+
+        stats = cache.stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["hit_rate"], 0.5)
+        self.assertEqual(stats["size"], 1)
+
+    def test_zero_size_disables_cache(self):
+        cache = LRUCache(maxsize=0)
+        cache.put("a", 1)
+
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(len(cache), 0)
+
+    @patch("utils.cache.time.monotonic")
+    def test_entries_expire_after_ttl(self, mock_monotonic):
+        mock_monotonic.return_value = 100.0
+        cache = LRUCache(maxsize=4, ttl=10)
+        cache.put("a", 1)
+
+        mock_monotonic.return_value = 109.0
+        self.assertEqual(cache.get("a"), 1)
+
+        mock_monotonic.return_value = 111.0
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(len(cache), 0)
+
+    def test_pop_returns_value(self):
+        cache = LRUCache(maxsize=4)
+        cache.put("a", 1)
+
+        self.assertEqual(cache.pop("a"), 1)
+        self.assertIsNone(cache.pop("a"))
+
+    def test_clear_resets_entries_and_counters(self):
+        cache = LRUCache(maxsize=4)
+        cache.put("a", 1)
+        cache.get("a")
+        cache.get("b")
+
+        cache.clear()
+
+        self.assertEqual(len(cache), 0)
+        self.assertEqual((cache.hits, cache.misses), (0, 0))
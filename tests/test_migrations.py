@@ -0,0 +1,99 @@
+import unittest
+import os
+import tempfile
+from datetime import datetime
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import Session
+
+from database.connections import Base
+from database.migrations import apply_migrations
+from models.PredictionSession_model import PredictionSession
+from models.DetectionObjects_model import DetectionObject
+from models.PredictionRollups_model import PredictionRollup, LabelRollup
+
+
+class TestApplyMigrations(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.engine = create_engine(f"sqlite:///{os.path.join(self.tmp.name, 'old.db')}")
+
+        # Simulate a database created before the indexes were declared
+        Base.metadata.create_all(bind=self.engine)
+        for table in (PredictionSession.__table__, DetectionObject.__table__):
+            for index in table.indexes:
+                index.drop(bind=self.engine)
+
+    def tearDown(self):
+        self.engine.dispose()
+        self.tmp.cleanup()
+
+    def test_missing_indexes_are_created(self):
+        applied = apply_migrations(self.engine)
+
+        self.assertIn("ix_prediction_sessions_user_id_timestamp", applied)
+        self.assertIn("ix_detection_objects_label_prediction_uid", applied)
+        names = {index["name"] for index in inspect(self.engine).get_indexes("detection_objects")}
+        self.assertIn("ix_detection_objects_prediction_uid", names)
+        self.assertIn("ix_detection_objects_score", names)
+
+    def test_migrations_are_idempotent(self):
+        apply_migrations(self.engine)
+        self.assertEqual(apply_migrations(self.engine), [])
+
+    def test_missing_tables_are_skipped(self):
+        empty = create_engine("sqlite://")
+        self.assertEqual(apply_migrations(empty), [])
+
+    def test_rollups_are_created_and_backfilled(self):
+        PredictionRollup.__table__.drop(bind=self.engine)
+        LabelRollup.__table__.drop(bind=self.engine)
+        with Session(bind=self.engine) as db:
+            db.add(PredictionSession(uid="a", user_id=3, timestamp=datetime.utcnow()))
+            db.add(DetectionObject(prediction_uid="a", label="cat", score=0.5, box="[0, 0, 1, 1]"))
+            db.commit()
+
+        applied = apply_migrations(self.engine)
+
+        self.assertIn("prediction_rollups", applied)
+        self.assertIn("rollup backfill", applied)
+        with Session(bind=self.engine) as db:
+            rollup = db.query(PredictionRollup).one()
+            self.assertEqual((rollup.user_id, rollup.prediction_count, rollup.score_count), (3, 1, 1))
+            self.assertEqual(db.query(LabelRollup.label, LabelRollup.detection_count).all(), [("cat", 1)])
+
+    def test_box_columns_are_added_and_backfilled(self):
+        DetectionObject.__table__.drop(bind=self.engine)
+        with self.engine.begin() as conn:
+            conn.execute(text(
+                "CREATE TABLE detection_objects (id INTEGER PRIMARY KEY, prediction_uid VARCHAR, "
+                "label VARCHAR, score FLOAT, box VARCHAR)"
+            ))
+            conn.execute(text(
+                "INSERT INTO detection_objects (prediction_uid, label, score, box) VALUES "
+                "('a', 'cat', 0.5, '[1.0, 2.0, 11.0, 22.0]'), ('a', 'dog', 0.5, 'garbage')"
+            ))
+
+        applied = apply_migrations(self.engine)
+
+        self.assertIn("detection_objects.area", applied)
+        self.assertIn("box backfill (1 rows)", applied)
+        self.assertIn("ix_detection_objects_prediction_uid_geometry", applied)
+        with Session(bind=self.engine) as db:
+            cat = db.query(DetectionObject).filter_by(label="cat").one()
+            self.assertEqual((cat.x1, cat.y1, cat.x2, cat.y2, cat.area), (1.0, 2.0, 11.0, 22.0, 200.0))
+            self.assertIsNone(db.query(DetectionObject).filter_by(label="dog").one().x1)
+
+    def test_frame_index_column_is_added(self):
+        DetectionObject.__table__.drop(bind=self.engine)
+        with self.engine.begin() as conn:
+            conn.execute(text(
+                "CREATE TABLE detection_objects (id INTEGER PRIMARY KEY, prediction_uid VARCHAR, "
+                "label VARCHAR, score FLOAT, box VARCHAR, x1 FLOAT, y1 FLOAT, x2 FLOAT, y2 FLOAT, area FLOAT)"
+            ))
+
+        applied = apply_migrations(self.engine)
+
+        self.assertIn("detection_objects.frame_index", applied)
+        self.assertNotIn("detection_objects.area", applied)
+        columns = {column["name"] for column in inspect(self.engine).get_columns("detection_objects")}
+        self.assertIn("frame_index", columns)
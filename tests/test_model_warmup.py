@@ -0,0 +1,123 @@
+import io
+import threading
+import time
+import unittest
+from unittest.mock import patch, MagicMock
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from app import app
+from controller.prediction import inference_ready, warmup_inference, prediction_cache
+from inference.model import ModelHandle
+from inference.workers import ProcessPoolBackend
+
+
+class TestModelHandle(unittest.TestCase):
+    @patch.object(ModelHandle, "_load")
+    def test_model_is_not_loaded_until_used(self, mock_load):
+        handle = ModelHandle("weights.pt")
+
+        self.assertFalse(mock_load.called)
+        handle("image", device="cpu")
+
+        mock_load.assert_called_once()
+        mock_load.return_value.assert_called_once_with("image", device="cpu")
+
+    @patch.object(ModelHandle, "_load")
+    def test_concurrent_first_calls_load_once(self, mock_load):
+        def slow_load():
+            time.sleep(0.05)
+            return MagicMock()
+        mock_load.side_effect = slow_load
+        handle = ModelHandle("weights.pt")
+
+        threads = [threading.Thread(target=handle.load) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        mock_load.assert_called_once()
+
+    @patch.object(ModelHandle, "_load")
+    def test_warmup_runs_a_blank_image_and_marks_ready(self, mock_load):
+        handle = ModelHandle("weights.pt", imgsz=320)
+        self.assertFalse(handle.ready)
+
+        handle.warmup()
+
+        image = mock_load.return_value.call_args[0][0]
+        self.assertEqual(image.shape, (320, 320, 3))
+        self.assertTrue(handle.ready)
+        self.assertIsNotNone(handle.load_seconds)
+
+    @patch.object(ModelHandle, "_load")
+    def test_first_successful_call_marks_ready_without_warmup(self, mock_load):
+        handle = ModelHandle("weights.pt")
+        mock_load.return_value.side_effect = [RuntimeError("bad input"), ["result"]]
+
+        with self.assertRaises(RuntimeError):
+            handle("image")
+        self.assertFalse(handle.ready)
+        handle("image")
+        self.assertTrue(handle.ready)
+
+    def test_worker_pool_is_ready_after_its_first_batch(self):
+        backend = ProcessPoolBackend("weights.pt", workers=1, threads_per_worker=1)
+        backend._executor = MagicMock()
+        backend._executor.submit.return_value.result.return_value = [[]]
+
+        self.assertFalse(backend.ready)
+        backend.predict_batch([("image", None)])
+        self.assertTrue(backend.ready)
+
+    def test_failed_warmup_is_logged(self):
+        with patch("controller.prediction.INFERENCE_WORKERS", 0), \
+                patch("controller.prediction.model") as mock_model, \
+                self.assertLogs("controller.prediction", level="ERROR") as logs:
+            mock_model.warmup.side_effect = RuntimeError("weights missing")
+            warmup_inference()
+
+        self.assertIn("weights missing", "\n".join(logs.output))
+
+
+class TestReadyEndpoint(unittest.TestCase):
+    def setUp(self):
+        self.client = TestClient(app)
+
+    @patch("controller.health.inference_ready", return_value=False)
+    def test_not_ready_while_model_loads(self, _):
+        response = self.client.get("/ready")
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json(), {"status": "loading"})
+        self.assertEqual(self.client.get("/health").status_code, 200)
+
+    @patch("controller.health.inference_ready", return_value=True)
+    def test_ready_once_warm(self, _):
+        response = self.client.get("/ready")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"status": "ready"})
+
+    @patch("controller.prediction.INFERENCE_WORKERS", 0)
+    @patch("controller.prediction.write_file")
+    @patch("controller.prediction.query_save_prediction_with_detections")
+    @patch.object(ModelHandle, "_load")
+    def test_ready_after_first_prediction_when_warmup_is_disabled(self, mock_load, mock_save, mock_write):
+        prediction_cache.clear()
+        buffer = io.BytesIO()
+        Image.new("RGB", (64, 48), color="white").save(buffer, format="PNG")
+        mock_load.return_value.side_effect = lambda images, **kwargs: [MagicMock(boxes=[]) for _ in images]
+        handle = ModelHandle("yolov8n.pt")
+
+        with patch("app.MODEL_WARMUP", False), patch("controller.prediction.model", handle), TestClient(app) as client:
+            self.assertEqual(client.get("/ready").status_code, 503)
+            response = client.post("/predict", files={"file": ("a.png", buffer.getvalue(), "image/png")})
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(inference_ready())
+            self.assertEqual(client.get("/ready").status_code, 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
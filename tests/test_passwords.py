@@ -0,0 +1,87 @@
+import unittest
+from unittest.mock import patch
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from fastapi.security import HTTPBasicCredentials
+
+import dependencies.auth as auth
+from database.connections import Base
+from models.Users_model import Users
+from utils.passwords import hash_password, verify_password, needs_rehash, is_hashed
+
+
+@patch("utils.passwords.PASSWORD_HASH_ITERATIONS", 1000)
+class TestPasswordHashing(unittest.TestCase):
+    def test_hash_roundtrip(self):
+        stored = hash_password("secret")
+
+        self.assertTrue(is_hashed(stored))
+        self.assertNotIn("secret", stored)
+        self.assertTrue(verify_password("secret", stored))
+        self.assertFalse(verify_password("Secret", stored))
+
+    def test_hashes_are_salted(self):
+        self.assertNotEqual(hash_password("secret"), hash_password("secret"))
+
+    def test_plain_text_is_verified_and_flagged_for_rehash(self):
+        self.assertTrue(verify_password("secret", "secret"))
+        self.assertFalse(verify_password("other", "secret"))
+        self.assertTrue(needs_rehash("secret"))
+
+    def test_weaker_hash_needs_rehash(self):
+        self.assertTrue(needs_rehash(hash_password("secret", iterations=500)))
+        self.assertFalse(needs_rehash(hash_password("secret")))
+
+    def test_malformed_hash_is_rejected(self):
+        self.assertFalse(verify_password("secret", "pbkdf2_sha256$x$zz$00"))
+
+
+@patch("utils.passwords.PASSWORD_HASH_ITERATIONS", 1000)
+class TestPasswordStorage(unittest.TestCase):
+    def setUp(self):
+        auth.clear_auth_cache()
+        self.engine = create_engine(
+            "sqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        Base.metadata.create_all(bind=self.engine)
+        self.db = sessionmaker(bind=self.engine, autoflush=False, autocommit=False)()
+
+    def tearDown(self):
+        self.db.close()
+        self.engine.dispose()
+
+    def login(self, username, password):
+        creds = HTTPBasicCredentials(username=username, password=password)
+        return auth.resolve_user_id(None, credentials=creds, db=self.db)
+
+    def test_new_users_are_stored_hashed(self):
+        user_id = self.login("alice", "pw1")
+
+        stored = self.db.query(Users.password).filter(Users.id == user_id).scalar()
+        self.assertTrue(is_hashed(stored))
+        auth.clear_auth_cache()
+        self.assertEqual(self.login("alice", "pw1"), user_id)
+
+    def test_plain_text_password_upgraded_on_login(self):
+        self.db.add(Users(username="bob", password="legacy"))
+        self.db.commit()
+
+        user_id = self.login("bob", "legacy")
+
+        stored = self.db.query(Users.password).filter(Users.id == user_id).scalar()
+        self.assertTrue(is_hashed(stored))
+        self.assertTrue(verify_password("legacy", stored))
+
+    @patch("dependencies.auth.verify_password")
+    def test_cached_login_skips_hashing(self, mock_verify):
+        mock_verify.return_value = True
+        self.login("carol", "pw")
+        auth.clear_auth_cache()
+
+        self.login("carol", "pw")
+        self.login("carol", "pw")
+
+        mock_verify.assert_called_once()
@@ -0,0 +1,122 @@
+import unittest
+import threading
+import io
+from unittest.mock import patch, MagicMock
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from app import app
+from dependencies.auth import resolve_user_id
+from database.connections import get_db
+from inference.jobs import JobQueue
+
+
+class TestJobQueue(unittest.TestCase):
+    def test_job_status_transitions_to_done(self):
+        jobs = JobQueue(workers=1, max_queued=4)
+        finished = threading.Event()
+
+        self.assertTrue(jobs.submit("a", finished.set, owner=1))
+        finished.wait(timeout=2)
+        jobs._queue.join()
+
+        self.assertEqual(jobs.status("a")["status"], "done")
+        self.assertEqual(jobs.status("a")["owner"], 1)
+
+    def test_failed_job_records_error(self):
+        def boom():
+            raise ValueError("bad image")
+
+        jobs = JobQueue(workers=1, max_queued=4)
+        jobs.submit("b", boom)
+        jobs._queue.join()
+
+        self.assertEqual(jobs.status("b")["status"], "failed")
+        self.assertEqual(jobs.status("b")["error"], "bad image")
+
+    def test_full_queue_rejects_submission(self):
+        release = threading.Event()
+        jobs = JobQueue(workers=1, max_queued=1)
+
+        # First job occupies the worker, second fills the queue
+        jobs.submit("running", release.wait, 2)
+        while jobs.status("running")["status"] != "running":
+            pass
+        self.assertTrue(jobs.submit("queued", lambda: None))
+        self.assertFalse(jobs.submit("rejected", lambda: None))
+        self.assertIsNone(jobs.status("rejected"))
+        release.set()
+
+    def test_unknown_job_has_no_status(self):
+        self.assertIsNone(JobQueue().status("missing"))
+
+
+class TestPredictAsyncEndpoint(unittest.TestCase):
+    def setUp(self):
+        self.client = TestClient(app)
+        self.fake_user_id = 5
+        self.mock_db = MagicMock()
+
+        image = Image.new("RGB", (32, 32), color="blue")
+        self.image_bytes = io.BytesIO()
+        image.save(self.image_bytes, format="JPEG")
+        self.image_bytes.seek(0)
+
+        app.dependency_overrides[resolve_user_id] = lambda: self.fake_user_id
+        app.dependency_overrides[get_db] = lambda: self.mock_db
+
+    def tearDown(self):
+        app.dependency_overrides = {}
+
+    @patch("controller.prediction.jobs")
+    def test_submit_returns_uid_and_queued_status(self, mock_jobs):
+        mock_jobs.submit.return_value = True
+
+        response = self.client.post(
+            "/predict/async",
+            files={"file": ("test.jpg", self.image_bytes, "image/jpeg")},
+        )
+
+        self.assertEqual(response.status_code, 202)
+        data = response.json()
+        self.assertEqual(data["status"], "queued")
+        self.assertEqual(mock_jobs.submit.call_args[0][0], data["prediction_uid"])
+        self.assertEqual(mock_jobs.submit.call_args[1]["owner"], self.fake_user_id)
+
+    @patch("controller.prediction.jobs")
+    def test_full_queue_returns_429(self, mock_jobs):
+        mock_jobs.submit.return_value = False
+
+        response = self.client.post(
+            "/predict/async",
+            files={"file": ("test.jpg", self.image_bytes, "image/jpeg")},
+        )
+
+        self.assertEqual(response.status_code, 429)
+
+    @patch("controller.prediction.jobs")
+    def test_status_of_unfinished_job(self, mock_jobs):
+        mock_jobs.status.return_value = {"status": "running", "owner": self.fake_user_id, "error": None}
+
+        response = self.client.get("/prediction/job123")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"uid": "job123", "status": "running"})
+
+    @patch("controller.prediction.jobs")
+    def test_status_of_failed_job_includes_error(self, mock_jobs):
+        mock_jobs.status.return_value = {"status": "failed", "owner": self.fake_user_id, "error": "boom"}
+
+        response = self.client.get("/prediction/job123")
+
+        self.assertEqual(response.json(), {"uid": "job123", "status": "failed", "error": "boom"})
+
+    @patch("controller.prediction.query_get_prediction_with_detections")
+    @patch("controller.prediction.jobs")
+    def test_other_users_job_is_not_visible(self, mock_jobs, mock_get_session):
+        mock_jobs.status.return_value = {"status": "queued", "owner": 999, "error": None}
+        mock_get_session.return_value = None
+
+        response = self.client.get("/prediction/job123")
+
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,302 @@
+import asyncio
+import io
+import json
+import os
+import tarfile
+import tempfile
+import threading
+import time
+import unittest
+import zipfile
+from unittest.mock import patch, MagicMock
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from app import app
+from dependencies.auth import resolve_user_id
+from database.connections import get_db
+from controller.prediction import prediction_cache, batch_item, stream_batch
+from inference.params import InferenceParams
+from inference.scheduler import BatchScheduler
+from utils.uploads import expand_archive
+
+
+def image_bytes(color="white", size=(64, 48), image_format="PNG"):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, color=color).save(buffer, format=image_format)
+    return buffer.getvalue()
+
+
+def zip_bytes(members: dict):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+    return buffer.getvalue()
+
+
+def tar_bytes(members: dict, mode="w:gz"):
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode=mode) as archive:
+        for name, data in members.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+    return buffer.getvalue()
+
+
+def wait_until_empty(directory, timeout=2):
+    # Unsaved originals of a streamed batch are removed in the background
+    deadline = time.monotonic() + timeout
+    while os.listdir(directory) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return os.listdir(directory)
+
+
+def fake_result(label_index=0):
+    box = MagicMock()
+    box.cls = [MagicMock(item=lambda: label_index)]
+    box.conf = [0.9]
+    box.xyxy = [MagicMock(tolist=lambda: [1, 2, 3, 4])]
+    return MagicMock(boxes=[box])
+
+
+class TestExpandArchive(unittest.TestCase):
+    def test_non_archive_is_none(self):
+        self.assertIsNone(expand_archive(image_bytes()))
+
+    def test_zip_and_tar_members_are_unpacked(self):
+        members = {"a.png": image_bytes("red"), "dir/b.png": image_bytes("blue")}
+
+        for data in (zip_bytes({**members, "__MACOSX/._a.png": b"x", ".DS_Store": b"x"}), tar_bytes(members)):
+            self.assertEqual(expand_archive(data), list(members.items()))
+
+    def test_dot_prefixed_tar_members_are_kept(self):
+        # tar czf images.tgz -C dir .
+        data = tar_bytes({"./a.png": image_bytes("red"), "./sub/b.png": image_bytes("blue"), "./._a.png": b"x"})
+
+        self.assertEqual([name for name, _ in expand_archive(data)], ["a.png", "sub/b.png"])
+
+    def test_corrupt_archives_are_rejected(self):
+        corrupt_zip = zip_bytes({"a.png": b"A" * 1000}).replace(b"A" * 10, b"B" * 10, 1)
+        members = {"a.png": image_bytes("red"), "b.png": image_bytes("blue")}
+        truncated_tgz = tar_bytes(members)[:-60]
+
+        for data in (corrupt_zip, truncated_tgz):
+            with self.assertRaises(Exception) as context:
+                expand_archive(data)
+            self.assertEqual(context.exception.status_code, 400)
+
+    def test_limits_are_checked_before_unpacking(self):
+        data = zip_bytes({"a.png": image_bytes(), "b.png": image_bytes()})
+
+        with self.assertRaises(Exception) as context:
+            expand_archive(data, max_images=1)
+        self.assertEqual(context.exception.status_code, 413)
+        with self.assertRaises(Exception) as context:
+            expand_archive(data, max_bytes=10)
+        self.assertEqual(context.exception.status_code, 413)
+
+
+class TestPredictBatch(unittest.TestCase):
+    def setUp(self):
+        self.client = TestClient(app)
+        prediction_cache.clear()
+        app.dependency_overrides[resolve_user_id] = lambda: 5
+        self.mock_db = MagicMock()
+        app.dependency_overrides[get_db] = lambda: self.mock_db
+
+    def tearDown(self):
+        app.dependency_overrides = {}
+
+    def post(self, files, query=""):
+        return self.client.post(f"/predict/batch{query}", files=[("files", file) for file in files])
+
+    @patch("controller.prediction.write_file")
+    @patch("controller.prediction.query_save_predictions_with_detections")
+    @patch("controller.prediction.model")
+    def test_files_run_as_one_batch_and_are_saved_together(self, mock_model, mock_save, mock_write):
+        mock_model.side_effect = lambda images, **kwargs: [fake_result() for _ in images]
+        mock_model.names = {0: "cat"}
+        mock_save.side_effect = lambda db, user_id, rows: len(rows)
+
+        response = self.post([
+            ("a.png", image_bytes("red"), "image/png"),
+            ("b.png", image_bytes("green"), "image/png"),
+            ("c.png", image_bytes("blue"), "image/png"),
+        ])
+
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual((body["count"], body["saved"], body["failed"]), (3, 3, 0))
+        self.assertEqual([r["filename"] for r in body["results"]], ["a.png", "b.png", "c.png"])
+        self.assertEqual(body["results"][0]["labels"], ["cat"])
+        self.assertEqual(mock_model.call_count, 1)
+        self.assertEqual(len(mock_model.call_args[0][0]), 3)
+
+        mock_save.assert_called_once()
+        db, user_id, rows = mock_save.call_args[0]
+        self.assertEqual(user_id, 5)
+        self.assertEqual([row[0] for row in rows], [r["prediction_uid"] for r in body["results"]])
+        self.assertEqual(rows[0][3][0]["box"], [1, 2, 3, 4])
+
+    @patch("controller.prediction.write_file")
+    @patch("controller.prediction.query_save_predictions_with_detections")
+    @patch("controller.prediction.model")
+    def test_archive_members_and_bad_images_are_reported_per_image(self, mock_model, mock_save, mock_write):
+        mock_model.side_effect = lambda images, **kwargs: [MagicMock(boxes=[]) for _ in images]
+        mock_save.side_effect = lambda db, user_id, rows: len(rows)
+        archive = zip_bytes({"one.jpg": image_bytes(image_format="JPEG"), "notes.txt": b"not an image"})
+
+        response = self.post([("images.zip", archive, "application/zip"), ("c.png", image_bytes(), "image/png")])
+
+        body = response.json()
+        self.assertEqual((body["count"], body["saved"], body["failed"]), (3, 2, 1))
+        failed = body["results"][1]
+        self.assertEqual((failed["filename"], failed["status_code"]), ("notes.txt", 415))
+        self.assertEqual(len(mock_save.call_args[0][2]), 2)
+
+    @patch("controller.prediction.SessionLocal")
+    @patch("controller.prediction.query_count_predictions_by_original_image", return_value=0)
+    @patch("controller.prediction.query_save_predictions_with_detections")
+    @patch("controller.prediction.model")
+    def test_model_failures_are_reported_per_image_and_leave_no_originals(self, mock_model, mock_save, mock_count, mock_session):
+        mock_model.side_effect = RuntimeError("CUDA out of memory")
+        mock_save.side_effect = lambda db, user_id, rows: len(rows)
+
+        with tempfile.TemporaryDirectory() as upload_dir, patch("controller.prediction.UPLOAD_DIR", upload_dir):
+            response = self.post([("a.png", image_bytes("red"), "image/png"), ("notes.txt", b"not an image", "text/plain")])
+            self.assertEqual(os.listdir(upload_dir), [])
+
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual((body["count"], body["saved"], body["failed"]), (2, 0, 2))
+        self.assertEqual([r["status_code"] for r in body["results"]], [500, 415])
+        self.assertEqual(body["results"][0]["error"], "CUDA out of memory")
+
+    @patch("controller.prediction.SessionLocal")
+    @patch("controller.prediction.write_file")
+    @patch("controller.prediction.query_save_predictions_with_detections")
+    @patch("controller.prediction.model")
+    def test_results_stream_as_ndjson_with_a_summary(self, mock_model, mock_save, mock_write, mock_session):
+        mock_model.side_effect = lambda images, **kwargs: [MagicMock(boxes=[]) for _ in images]
+        mock_save.side_effect = lambda db, user_id, rows: len(rows)
+
+        response = self.post([("a.png", image_bytes("red"), "image/png"), ("b.png", image_bytes("blue"), "image/png")], "?stream=true")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["content-type"], "application/x-ndjson")
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        self.assertEqual(sorted(line["filename"] for line in lines[:2]), ["a.png", "b.png"])
+        self.assertEqual(lines[2]["summary"]["saved"], 2)
+        mock_session.return_value.close.assert_called_once()
+
+    @patch("controller.prediction.model")
+    def test_corrupt_archive_is_a_bad_request(self, mock_model):
+        corrupt_zip = zip_bytes({"a.png": b"A" * 1000}).replace(b"A" * 10, b"B" * 10, 1)
+
+        response = self.post([("images.zip", corrupt_zip, "application/zip")])
+
+        self.assertEqual(response.status_code, 400)
+        mock_model.assert_not_called()
+
+    @patch("controller.prediction.SessionLocal")
+    @patch("controller.prediction.query_count_predictions_by_original_image", return_value=0)
+    @patch("controller.prediction.query_save_predictions_with_detections")
+    @patch("controller.prediction.model")
+    def test_failed_save_leaves_no_originals(self, mock_model, mock_save, mock_count, mock_session):
+        mock_model.side_effect = lambda images, **kwargs: [MagicMock(boxes=[]) for _ in images]
+        mock_save.side_effect = RuntimeError("disk full")
+        files = [("a.png", image_bytes("red"), "image/png"), ("b.png", image_bytes("blue"), "image/png")]
+
+        with tempfile.TemporaryDirectory() as upload_dir, patch("controller.prediction.UPLOAD_DIR", upload_dir):
+            response = self.post(files, "?stream=true")
+            self.assertEqual(json.loads(response.text.splitlines()[-1])["summary"]["saved"], 0)
+            self.assertEqual(wait_until_empty(upload_dir), [])
+
+            with self.assertRaises(RuntimeError):
+                self.post(files)
+            self.assertEqual(os.listdir(upload_dir), [])
+
+    @patch("controller.prediction.MAX_BATCH_IMAGES", 2)
+    @patch("controller.prediction.model")
+    def test_too_many_images_are_rejected(self, mock_model):
+        response = self.post([(f"{i}.png", image_bytes(), "image/png") for i in range(3)])
+
+        self.assertEqual(response.status_code, 413)
+        mock_model.assert_not_called()
+
+
+class TestStreamBatchDisconnect(unittest.TestCase):
+    def setUp(self):
+        prediction_cache.clear()
+
+    @patch("controller.prediction.write_file")
+    def test_disconnect_mid_stream_leaves_the_scheduler_serving(self, mock_write):
+        gate = threading.Event()
+
+        def blocking_predict(items):
+            gate.wait(timeout=5)
+            return [[] for _ in items]
+
+        # One image per batch: the first holds the model, the second waits in the queue
+        scheduler = BatchScheduler(blocking_predict, max_batch_size=1, max_wait_ms=0)
+        params = InferenceParams("yolov8n.pt")
+
+        async def disconnect():
+            slots = asyncio.Semaphore(2)
+            tasks = [
+                asyncio.ensure_future(batch_item(i, f"{i}.png", image_bytes(color), params, slots))
+                for i, color in enumerate(["red", "blue"])
+            ]
+            consumer = asyncio.ensure_future(stream_batch(tasks, [], 5, time.time()).__anext__())
+            while scheduler._queue.qsize() < 1:
+                await asyncio.sleep(0.01)
+            # Starlette cancels the response when the client goes away
+            consumer.cancel()
+            await asyncio.gather(consumer, *tasks, return_exceptions=True)
+            gate.set()
+            return [task.cancelled() for task in tasks]
+
+        with patch("controller.prediction.scheduler", scheduler):
+            self.assertEqual(asyncio.run(disconnect()), [True, True])
+            self.assertEqual(scheduler.predict(("image", params), timeout=2), [])
+        scheduler.close()
+
+    @patch("controller.prediction.SessionLocal")
+    @patch("controller.prediction.query_count_predictions_by_original_image", return_value=0)
+    def test_disconnect_after_some_images_finished_leaves_no_originals(self, mock_count, mock_session):
+        gate = threading.Event()
+        calls = []
+
+        def second_batch_blocks(items):
+            calls.append(len(items))
+            if len(calls) > 1:
+                gate.wait(timeout=5)
+            return [[] for _ in items]
+
+        scheduler = BatchScheduler(second_batch_blocks, max_batch_size=1, max_wait_ms=0)
+        params = InferenceParams("yolov8n.pt")
+        images = [("0.png", image_bytes("red")), ("1.png", image_bytes("blue"))]
+
+        async def disconnect_after_first_result():
+            slots = asyncio.Semaphore(1)
+            tasks = [asyncio.ensure_future(batch_item(i, name, data, params, slots)) for i, (name, data) in enumerate(images)]
+            stream = stream_batch(tasks, images, 5, time.time())
+            first = json.loads(await stream.__anext__())
+            await stream.aclose()
+            gate.set()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            return first
+
+        with tempfile.TemporaryDirectory() as upload_dir, patch("controller.prediction.UPLOAD_DIR", upload_dir), \
+                patch("controller.prediction.scheduler", scheduler):
+            first = asyncio.run(disconnect_after_first_result())
+
+            self.assertIn("prediction_uid", first)
+            self.assertEqual(wait_until_empty(upload_dir), [])
+        scheduler.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,17 +3,21 @@ from fastapi.testclient import TestClient
 from unittest.mock import patch, MagicMock
 from PIL import Image
 import io
+import hashlib
 import numpy as np
 import time
 
 from app import app
 from dependencies.auth import resolve_user_id
 from database.connections import get_db
+from controller.prediction import prediction_cache
 
 
 class TestPredictDetection(unittest.TestCase):
     def setUp(self):
         self.client = TestClient(app)
+        # Every test uploads the same bytes; start each one with a cold cache
+        prediction_cache.clear()
 
         # Prepare a simple in-memory image
         test_image = Image.new("RGB", (100, 100), color="white")
@@ -31,12 +35,10 @@ class TestPredictDetection(unittest.TestCase):
         app.dependency_overrides = {}
 
     @patch("controller.prediction.model")
-    @patch("controller.prediction.query_save_prediction_session")
-    @patch("controller.prediction.query_save_detection_object")
+    @patch("controller.prediction.query_save_prediction_with_detections")
     def test_detection_box_data_is_processed(
         self,
-        mock_save_detection,
-        mock_save_session,
+        mock_save_prediction,
         mock_model,
     ):
         # Create a fake detection box
@@ -62,8 +64,8 @@ class TestPredictDetection(unittest.TestCase):
         mock_model.side_effect = delayed_model_call
         mock_model.names = {0: "cat"}
 
-        # Mock prediction session save
-        mock_save_session.return_value = MagicMock()
+        # Mock prediction save
+        mock_save_prediction.return_value = MagicMock()
 
         response = self.client.post(
             "/predict",
@@ -79,4 +81,77 @@ class TestPredictDetection(unittest.TestCase):
         self.assertEqual(data["detection_count"], 1)
         self.assertGreater(data["time_took"], 0)
 
-        mock_save_detection.assert_called_once()
+        # Session and detections are persisted together in one call
+        mock_save_prediction.assert_called_once()
+        detections = mock_save_prediction.call_args[0][5]
+        self.assertEqual(detections, [{"label": "cat", "score": 0.95, "box": [10, 20, 30, 40]}])
+
+    @patch("controller.prediction.model")
+    @patch("controller.prediction.query_save_prediction_with_detections")
+    @patch("controller.prediction.write_file")
+    def test_original_written_and_annotated_image_deferred(
+        self,
+        mock_write_file,
+        mock_save_prediction,
+        mock_model,
+    ):
+        fake_result = MagicMock()
+        fake_result.boxes = []
+        mock_model.return_value = [fake_result]
+        mock_model.names = {}
+
+        response = self.client.post(
+            "/predict",
+            files={"file": ("test.jpg", self.image_bytes, "image/jpeg")},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        uid = response.json()["prediction_uid"]
+
+        # Original is written from the uploaded bytes, named by their hash
+        original_path, data = mock_write_file.call_args[0]
+        digest = hashlib.sha256(self.image_bytes.getvalue()).hexdigest()
+        self.assertTrue(original_path.endswith(digest + ".jpg"))
+        self.assertEqual(data, self.image_bytes.getvalue())
+
+        # The annotated image is not drawn on the hot path
+        fake_result.plot.assert_not_called()
+        predicted_path = mock_save_prediction.call_args[0][3]
+        self.assertTrue(predicted_path.endswith(uid + ".jpg"))
+
+    @patch("controller.prediction.model")
+    @patch("controller.prediction.query_save_prediction_with_detections")
+    @patch("controller.prediction.write_file")
+    def test_repeated_upload_reuses_cached_detections(
+        self,
+        mock_write_file,
+        mock_save_prediction,
+        mock_model,
+    ):
+        fake_box = MagicMock()
+        fake_box.cls = [MagicMock(item=lambda: 0)]
+        fake_box.conf = [0.8]
+        fake_box.xyxy = [np.array([1.0, 2.0, 3.0, 4.0])]
+        fake_result = MagicMock()
+        fake_result.boxes = [fake_box]
+        mock_model.return_value = [fake_result]
+        mock_model.names = {0: "dog"}
+
+        uids = []
+        for _ in range(2):
+            self.image_bytes.seek(0)
+            response = self.client.post(
+                "/predict",
+                files={"file": ("test.jpg", self.image_bytes, "image/jpeg")},
+            )
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()["labels"], ["dog"])
+            uids.append(response.json()["prediction_uid"])
+
+        # One model call, two sessions sharing the same original file
+        self.assertEqual(mock_model.call_count, 1)
+        self.assertNotEqual(uids[0], uids[1])
+        first, second = mock_save_prediction.call_args_list
+        self.assertEqual(first[0][2], second[0][2])
+        self.assertEqual(first[0][5], second[0][5])
+        self.assertEqual(prediction_cache.stats()["hits"], 1)
@@ -0,0 +1,249 @@
+import os
+import tempfile
+import unittest
+from concurrent.futures import Future
+from unittest.mock import patch, MagicMock
+import cv2
+import numpy as np
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import app
+from controller.prediction import save_video_prediction
+from dependencies.auth import resolve_user_id
+from database.connections import Base, get_db
+from database.queries import (
+    query_save_prediction_with_detections,
+    query_delete_prediction_by_uid,
+    query_save_prediction_with_frame_detections,
+    query_get_prediction_with_detections,
+    query_prediction_stats,
+)
+from inference.params import InferenceParams
+from inference.video import probe_video, sample_frames, detect_frames
+
+
+def write_video(path, frames=12, fps=12.0, size=(64, 48)):
+    """
+    MJPG .avi whose frame i is filled with gray level 10 * i, so frames can be told apart.
+    """
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), fps, size)
+    for i in range(frames):
+        writer.write(np.full((size[1], size[0], 3), 10 * i, dtype=np.uint8))
+    writer.release()
+
+
+def resolved(value):
+    future = Future()
+    future.set_result(value)
+    return future
+
+
+class TestVideoSampling(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "clip.avi")
+        write_video(self.path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_probe_reports_video_properties(self):
+        video = probe_video(self.path)
+
+        self.assertEqual((video["width"], video["height"], video["frame_count"]), (64, 48, 12))
+        self.assertAlmostEqual(video["fps"], 12.0)
+
+    def test_not_a_video_is_rejected(self):
+        path = os.path.join(self.tmp.name, "fake.mp4")
+        with open(path, "wb") as f:
+            f.write(b"not a video")
+
+        with self.assertRaises(Exception) as context:
+            probe_video(path)
+        self.assertEqual(context.exception.status_code, 415)
+
+    def test_stride_max_fps_and_max_frames(self):
+        self.assertEqual([i for i, _ in sample_frames(self.path)], list(range(12)))
+        self.assertEqual([i for i, _ in sample_frames(self.path, stride=5)], [0, 5, 10])
+        self.assertEqual([i for i, _ in sample_frames(self.path, max_fps=4)], [0, 3, 6, 9])
+        self.assertEqual([i for i, _ in sample_frames(self.path, stride=2, max_frames=2)], [0, 2])
+
+        index, frame = list(sample_frames(self.path, stride=5))[1]
+        self.assertEqual(frame.shape, (48, 64, 3))
+        self.assertAlmostEqual(float(frame.mean()), 50, delta=3)
+
+    def test_frames_are_resized_and_in_flight_frames_are_bounded(self):
+        submitted, pending_at_yield = [], []
+
+        def submit(item):
+            submitted.append(item)
+            return resolved([{"label": "cat", "score": 0.9, "box": [1, 2, 3, 4]}])
+
+        frames = ((i, np.zeros((480, 640, 3), dtype=np.uint8)) for i in range(10))
+        results = []
+        for index, detections in detect_frames(frames, InferenceParams("yolov8n.pt", imgsz=320), submit, in_flight=3):
+            pending_at_yield.append(len(submitted) - len(results))
+            results.append((index, detections))
+
+        self.assertEqual([index for index, _ in results], list(range(10)))
+        self.assertLessEqual(max(pending_at_yield), 3)
+        self.assertEqual(submitted[0][0].shape, (240, 320, 3))
+        # Boxes come back in original frame pixels
+        self.assertEqual(results[0][1][0]["box"], [2.0, 4.0, 6.0, 8.0])
+
+
+class TestSaveVideoPrediction(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(bind=self.engine)
+        self.db = sessionmaker(bind=self.engine, autoflush=False, autocommit=False)()
+
+    def tearDown(self):
+        self.db.close()
+        self.engine.dispose()
+
+    def test_one_session_with_frame_indexed_detections(self):
+        cat = {"label": "cat", "score": 0.8, "box": [0, 0, 2, 2]}
+        dog = {"label": "dog", "score": 0.4, "box": [1, 1, 2, 2]}
+        frames = iter([(0, [cat]), (5, []), (10, [cat, dog])])
+
+        result = query_save_prediction_with_frame_detections(self.db, "v1", "uploads/original/v.mp4", 7, frames, chunk_size=2)
+
+        self.assertEqual(result[:2], (3, 3))
+        self.assertEqual(dict(result[2]), {"cat": 2, "dog": 1})
+        body = query_get_prediction_with_detections(self.db, "v1", 7)
+        self.assertIsNone(body["predicted_image"])
+        self.assertEqual([(d["frame_index"], d["label"]) for d in body["detection_objects"]], [(0, "cat"), (10, "cat"), (10, "dog")])
+        self.assertEqual(query_prediction_stats(self.db, 7), (1, round(2.0 / 3, 3), [("cat", 2), ("dog", 1)]))
+
+    def test_delete_takes_a_video_back_out_of_the_rollups(self):
+        cat = {"label": "cat", "score": 0.5, "box": [0, 0, 2, 2]}
+        query_save_prediction_with_detections(self.db, "img", "o.jpg", "p.jpg", 7, [cat])
+        query_save_prediction_with_frame_detections(self.db, "v1", "v.mp4", 7, ((i, [cat, cat]) for i in range(50)))
+
+        query_delete_prediction_by_uid(self.db, "v1", 7)
+
+        self.assertEqual(query_prediction_stats(self.db, 7), (1, 0.5, [("cat", 1)]))
+
+    def test_failure_midway_saves_nothing(self):
+        def frames():
+            yield 0, [{"label": "cat", "score": 0.8, "box": [0, 0, 2, 2]}]
+            raise RuntimeError("decoder died")
+
+        with self.assertRaises(RuntimeError):
+            query_save_prediction_with_frame_detections(self.db, "v2", "v.mp4", 7, frames(), chunk_size=1)
+
+        self.assertIsNone(query_get_prediction_with_detections(self.db, "v2", 7))
+        self.assertEqual(query_prediction_stats(self.db, 7), (0, 0.0, []))
+
+
+class TestSaveVideoPredictionLocking(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        # A file database: SQLite has one writer, and waits at most 0.2s for it here
+        self.engine = create_engine(f"sqlite:///{os.path.join(self.tmp.name, 'test.db')}", connect_args={"timeout": 0.2})
+        Base.metadata.create_all(bind=self.engine)
+        self.SessionLocal = sessionmaker(bind=self.engine, autoflush=False, autocommit=False)
+
+    def tearDown(self):
+        self.engine.dispose()
+        self.tmp.cleanup()
+
+    def test_other_writes_go_through_while_the_model_runs(self):
+        video_path = os.path.join(self.tmp.name, "upload.mp4.tmp")
+        original_path = os.path.join(self.tmp.name, "digest.mp4")
+        with open(video_path, "wb") as f:
+            f.write(b"video")
+
+        def frames():
+            yield 0, [{"label": "cat", "score": 0.8, "box": [0, 0, 2, 2]}]
+            # A /predict of another user saving while the video is still running
+            other = self.SessionLocal()
+            try:
+                query_save_prediction_with_detections(other, "img", "o.jpg", "p.jpg", 8, [])
+            finally:
+                other.close()
+            yield 1, [{"label": "dog", "score": 0.4, "box": [1, 1, 2, 2]}]
+
+        db = self.SessionLocal()
+        try:
+            result = save_video_prediction(db, "vid", video_path, original_path, 7, frames())
+        finally:
+            db.close()
+
+        self.assertEqual(result[:2], (2, 2))
+        self.assertFalse(os.path.exists(video_path))
+        self.assertTrue(os.path.exists(original_path))
+        db = self.SessionLocal()
+        try:
+            self.assertEqual(query_prediction_stats(db, 8)[0], 1)
+            body = query_get_prediction_with_detections(db, "vid", 7)
+            self.assertEqual([(d["frame_index"], d["label"]) for d in body["detection_objects"]], [(0, "cat"), (1, "dog")])
+        finally:
+            db.close()
+
+
+class TestPredictVideoEndpoint(unittest.TestCase):
+    def setUp(self):
+        self.client = TestClient(app)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "clip.avi")
+        write_video(self.path)
+        app.dependency_overrides[resolve_user_id] = lambda: 3
+        self.mock_db = MagicMock()
+        app.dependency_overrides[get_db] = lambda: self.mock_db
+
+    def tearDown(self):
+        app.dependency_overrides = {}
+        self.tmp.cleanup()
+
+    def post(self, name="clip.avi", query=""):
+        with open(self.path, "rb") as f:
+            return self.client.post(f"/predict/video{query}", files={"file": (name, f, "video/x-msvideo")})
+
+    @patch("controller.prediction.model")
+    def test_sampled_frames_are_batched_and_saved_as_one_session(self, mock_model):
+        box = MagicMock()
+        box.cls = [MagicMock(item=lambda: 0)]
+        box.conf = [0.9]
+        box.xyxy = [MagicMock(tolist=lambda: [1, 2, 3, 4])]
+        mock_model.side_effect = lambda images, **kwargs: [MagicMock(boxes=[box]) for _ in images]
+        mock_model.names = {0: "person"}
+
+        with patch("controller.prediction.UPLOAD_DIR", self.tmp.name), \
+                patch("controller.prediction.query_save_prediction_with_frame_detections") as mock_save:
+            def save(db, uid, original, user_id, frames):
+                saved = list(frames)
+                return len(saved), sum(len(d) for _, d in saved), {"person": len(saved)}
+            mock_save.side_effect = save
+            response = self.post(query="?frame_stride=4")
+
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual((body["frame_count"], body["detection_count"], body["labels"]), (3, 3, {"person": 3}))
+        self.assertEqual(body["video"]["frame_count"], 12)
+        uid, original = mock_save.call_args[0][1:3]
+        self.assertEqual(uid, body["prediction_uid"])
+        self.assertTrue(original.endswith(".avi") and os.path.exists(original))
+        # Only the video itself is kept, sampled frames never touch the disk
+        self.assertEqual(sorted(os.listdir(self.tmp.name)), sorted(["clip.avi", os.path.basename(original)]))
+
+    def test_unsupported_container_is_rejected(self):
+        self.assertEqual(self.post(name="clip.gif").status_code, 415)
+
+    def test_undecodable_video_is_rejected_and_removed(self):
+        garbage = os.path.join(self.tmp.name, "garbage.mp4")
+        with open(garbage, "wb") as f:
+            f.write(b"\x00" * 1000)
+        with patch("controller.prediction.UPLOAD_DIR", self.tmp.name), open(garbage, "rb") as f:
+            response = self.client.post("/predict/video", files={"file": ("garbage.mp4", f, "video/mp4")})
+
+        self.assertEqual(response.status_code, 415)
+        self.assertEqual(sorted(os.listdir(self.tmp.name)), ["clip.avi", "garbage.mp4"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -24,15 +24,14 @@ class TestPredictionCount(unittest.TestCase):
 
     def _setup_mock_query(self, timestamps):
         """
-        Simulate db.query(...).filter(...).count() based on timestamps.
+        Simulate db.query(...).filter(...).scalar() based on timestamps.
         Only those within the last 7 days (inclusive) will be counted.
         """
         recent_cutoff = self.now - timedelta(days=7)
         count = sum(1 for ts in timestamps if ts >= recent_cutoff)
 
-        # Setup the chained query: db.query(...).filter(...).count()
-        query_mock = MagicMock()
-        self.mock_db.query.return_value.filter.return_value.count.return_value = count
+        # Setup the chained rollup query: db.query(...).filter(...).scalar()
+        self.mock_db.query.return_value.filter.return_value.scalar.return_value = count
 
     def test_prediction_count_format(self):
         """Check response format and status with empty DB"""
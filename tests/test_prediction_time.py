@@ -9,10 +9,13 @@ import time
 from app import app
 from dependencies.auth import resolve_user_id
 from database.connections import get_db
+from controller.prediction import prediction_cache
 
 class TestProcessingTime(unittest.TestCase):
     def setUp(self):
         self.client = TestClient(app)
+        # Every test uploads the same bytes; start each one with a cold cache
+        prediction_cache.clear()
 
         # Create in-memory test image
         self.test_image = Image.new("RGB", (100, 100), color="red")
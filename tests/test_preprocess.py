@@ -0,0 +1,116 @@
+import io
+import unittest
+from unittest.mock import patch, MagicMock
+import cv2
+import numpy as np
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from app import app
+from dependencies.auth import resolve_user_id
+from database.connections import get_db
+from controller.prediction import prediction_cache
+from inference.preprocess import prepare_image, scale_detections, jpeg_reduction
+
+
+def image_bytes(image_format="JPEG", size=(40, 30), color=(0, 0, 255), orientation=None):
+    buffer = io.BytesIO()
+    image = Image.new("RGB", size, color=color)
+    exif = image.getexif()
+    if orientation:
+        exif[0x0112] = orientation
+    image.save(buffer, format=image_format, exif=exif.tobytes())
+    return buffer.getvalue()
+
+
+class TestPrepareImage(unittest.TestCase):
+    def test_small_image_is_left_at_full_size(self):
+        prepared = prepare_image(image_bytes(size=(100, 80)), imgsz=640)
+
+        self.assertEqual(prepared.image.shape, (80, 100, 3))
+        self.assertEqual((prepared.scale_x, prepared.scale_y), (1.0, 1.0))
+
+    def test_large_image_long_side_matches_imgsz(self):
+        prepared = prepare_image(image_bytes("PNG", size=(1280, 960)), imgsz=640)
+
+        self.assertEqual(prepared.image.shape, (480, 640, 3))
+        self.assertEqual((prepared.scale_x, prepared.scale_y), (2.0, 2.0))
+
+    def test_large_jpeg_uses_reduced_decoding(self):
+        self.assertEqual(jpeg_reduction(4000, 3000, 640), cv2.IMREAD_REDUCED_COLOR_4)
+        self.assertEqual(jpeg_reduction(1280, 960, 640), cv2.IMREAD_REDUCED_COLOR_2)
+        self.assertEqual(jpeg_reduction(1000, 800, 640), cv2.IMREAD_COLOR)
+
+        prepared = prepare_image(image_bytes(size=(4000, 3000), color=(255, 0, 0)), imgsz=640)
+
+        self.assertEqual(prepared.image.shape, (480, 640, 3))
+        self.assertEqual((prepared.scale_x, prepared.scale_y), (6.25, 6.25))
+        # Still BGR, like a full decode
+        self.assertTrue(np.allclose(prepared.image[240, 320], [0, 0, 255], atol=2))
+
+    def test_exif_orientation_is_applied(self):
+        # A portrait phone photo: stored landscape, Orientation=6 (rotate 90 degrees)
+        prepared = prepare_image(image_bytes(size=(400, 200), orientation=6), imgsz=640)
+
+        self.assertEqual(prepared.image.shape, (400, 200, 3))
+        self.assertEqual((prepared.scale_x, prepared.scale_y), (1.0, 1.0))
+
+    def test_rotated_jpeg_is_scaled_in_upright_coordinates(self):
+        prepared = prepare_image(image_bytes(size=(4000, 3000), orientation=6), imgsz=640)
+
+        self.assertEqual(prepared.image.shape, (640, 480, 3))
+        self.assertAlmostEqual(prepared.scale_x, 3000 / 480)
+        self.assertAlmostEqual(prepared.scale_y, 4000 / 640)
+
+    def test_undecodable_image_is_rejected(self):
+        with self.assertRaises(Exception) as context:
+            prepare_image(image_bytes("PNG")[:40])
+        self.assertEqual(context.exception.status_code, 400)
+
+    def test_boxes_are_scaled_back(self):
+        detections = [{"label": "cat", "score": 0.9, "box": [10, 20, 30, 40]}]
+
+        scaled = scale_detections(detections, 2.0, 3.0)
+
+        self.assertEqual(scaled, [{"label": "cat", "score": 0.9, "box": [20.0, 60.0, 60.0, 120.0]}])
+        self.assertIs(scale_detections(detections, 1.0, 1.0), detections)
+
+
+class TestPredictResizesInput(unittest.TestCase):
+    def setUp(self):
+        self.client = TestClient(app)
+        prediction_cache.clear()
+        self.mock_db = MagicMock()
+        app.dependency_overrides[resolve_user_id] = lambda: 1
+        app.dependency_overrides[get_db] = lambda: self.mock_db
+
+    def tearDown(self):
+        app.dependency_overrides = {}
+
+    @patch("controller.prediction.write_file")
+    @patch("controller.prediction.query_save_prediction_with_detections")
+    @patch("controller.prediction.model")
+    def test_model_sees_resized_image_and_boxes_are_in_original_pixels(self, mock_model, mock_save, mock_write):
+        box = MagicMock()
+        box.cls = [MagicMock(item=lambda: 0)]
+        box.conf = [0.9]
+        box.xyxy = [MagicMock(tolist=lambda: [10, 20, 30, 40])]
+        result = MagicMock(boxes=[box])
+        mock_model.return_value = [result]
+        mock_model.names = {0: "cat"}
+
+        response = self.client.post(
+            "/predict",
+            files={"file": ("big.png", image_bytes("PNG", size=(1280, 960)), "image/png")},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        images = mock_model.call_args[0][0]
+        self.assertEqual(images[0].shape, (480, 640, 3))
+        self.assertEqual(mock_model.call_args[1]["imgsz"], 640)
+        detections = mock_save.call_args[0][5]
+        self.assertEqual(detections[0]["box"], [20.0, 40.0, 60.0, 80.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
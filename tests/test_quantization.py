@@ -0,0 +1,124 @@
+import importlib.util
+import io
+import os
+import tempfile
+import unittest
+
+import numpy as np
+from PIL import Image
+
+from inference.model import ModelHandle
+from inference.quantization import check_quantization, model_input, quantize_model, calibration_images, head_nodes
+
+HAS_ONNXRUNTIME = importlib.util.find_spec("onnxruntime") is not None and importlib.util.find_spec("onnx") is not None
+
+
+def image_bytes(size=(64, 32)):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, color=(255, 0, 0)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def tiny_conv_model(path: str):
+    """
+    A one-conv ONNX model with a dynamic batch axis and export-style metadata.
+    """
+    import onnx
+    from onnx import TensorProto, helper, numpy_helper
+
+    rng = np.random.default_rng(0)
+    weight = numpy_helper.from_array(rng.normal(size=(4, 3, 3, 3)).astype(np.float32), "weight")
+    graph = helper.make_graph(
+        [
+            helper.make_node("Conv", ["images", "weight"], ["conv"], name="/model.0/conv/Conv", pads=[1, 1, 1, 1]),
+            helper.make_node("Relu", ["conv"], ["output0"], name="/model.1/act/Relu"),
+        ],
+        "tiny",
+        [helper.make_tensor_value_info("images", TensorProto.FLOAT, ["batch", 3, 64, 64])],
+        [helper.make_tensor_value_info("output0", TensorProto.FLOAT, ["batch", 4, 64, 64])],
+        [weight],
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 13)], ir_version=8)
+    helper.set_model_props(model, {"names": "{0: 'cat'}", "imgsz": "[64, 64]"})
+    onnx.save(model, path)
+
+
+class TestQuantizationConfig(unittest.TestCase):
+    def test_quantization_needs_onnxruntime_backend(self):
+        self.assertIsNone(check_quantization(None, "torch"))
+        self.assertEqual(check_quantization("static", "onnxruntime"), "static")
+        with self.assertRaises(ValueError):
+            check_quantization("dynamic", "torch")
+        with self.assertRaises(ValueError):
+            ModelHandle("yolov8n.pt", backend="onnxruntime", quantization="int4")
+
+    def test_model_input_is_letterboxed_rgb_chw(self):
+        tensor = model_input(image_bytes(), 64)
+
+        self.assertEqual(tensor.shape, (1, 3, 64, 64))
+        self.assertEqual(tensor.dtype, np.float32)
+        # Image rows in the middle, gray padding above
+        self.assertAlmostEqual(float(tensor[0, 0, 32, 32]), 1.0)
+        self.assertAlmostEqual(float(tensor[0, 2, 32, 32]), 0.0)
+        self.assertAlmostEqual(float(tensor[0, 0, 0, 0]), 114 / 255, places=5)
+
+    def test_calibration_images_are_capped(self):
+        with tempfile.TemporaryDirectory() as directory:
+            for name in ("c.png", "a.png", "b.png", "d.png.123.tmp"):
+                open(os.path.join(directory, name), "wb").close()
+
+            self.assertEqual([os.path.basename(p) for p in calibration_images(directory, 2)], ["a.png", "b.png"])
+        self.assertEqual(calibration_images("no/such/dir"), [])
+
+
+@unittest.skipUnless(HAS_ONNXRUNTIME, "onnx and onnxruntime are optional")
+class TestQuantizeModel(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.fp32 = os.path.join(self.tmp.name, "tiny-64.onnx")
+        tiny_conv_model(self.fp32)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_model(self, path, tensor):
+        import onnxruntime
+        session = onnxruntime.InferenceSession(path, providers=["CPUExecutionProvider"])
+        return session.run(None, {"images": tensor})[0], session.get_modelmeta().custom_metadata_map
+
+    def assert_close_to_fp32(self, quantized):
+        tensor = model_input(image_bytes(), 64)
+        expected, _ = self.run_model(self.fp32, tensor)
+        output, metadata = self.run_model(quantized, tensor)
+
+        self.assertEqual(metadata["names"], "{0: 'cat'}")
+        self.assertLess(np.abs(output - expected).max(), 0.1 * np.abs(expected).max())
+
+    def test_static_quantization_is_calibrated_on_uploads(self):
+        calibration = os.path.join(self.tmp.name, "calibration.png")
+        with open(calibration, "wb") as f:
+            f.write(image_bytes())
+
+        quantized = quantize_model(self.fp32, "static", 64, calibration_paths=[calibration])
+
+        self.assertEqual(quantized, os.path.join(self.tmp.name, "tiny-64-int8-static.onnx"))
+        self.assert_close_to_fp32(quantized)
+
+    def test_dynamic_quantization_is_cached(self):
+        quantized = quantize_model(self.fp32, "dynamic", 64)
+        modified = os.path.getmtime(quantized)
+
+        self.assertEqual(quantize_model(self.fp32, "dynamic", 64), quantized)
+        self.assertEqual(os.path.getmtime(quantized), modified)
+        self.assert_close_to_fp32(quantized)
+
+    def test_detection_head_is_found(self):
+        self.assertEqual(head_nodes(self.fp32), ["/model.1/act/Relu"])
+
+    def test_static_quantization_without_images_fails(self):
+        with self.assertRaises(RuntimeError):
+            quantize_model(self.fp32, "static", 64, calibration_paths=[])
+
+
+if __name__ == "__main__":
+    unittest.main()
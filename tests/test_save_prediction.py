@@ -0,0 +1,89 @@
+import unittest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from database.connections import Base
+from database.queries import (
+    query_save_prediction_with_detections,
+    query_save_predictions_with_detections,
+    query_delete_prediction_by_uid,
+    query_prediction_stats,
+    query_total_predictions_last_week,
+    query_unique_labels_last_7_days,
+)
+from models.PredictionSession_model import PredictionSession
+from models.DetectionObjects_model import DetectionObject
+
+
+class TestSavePredictionWithDetections(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine(
+            "sqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        Base.metadata.create_all(bind=self.engine)
+        self.db = sessionmaker(bind=self.engine, autoflush=False, autocommit=False)()
+
+    def tearDown(self):
+        self.db.close()
+        self.engine.dispose()
+
+    def test_session_and_detections_are_saved_together(self):
+        detections = [
+            {"label": "cat", "score": 0.9, "box": [1.0, 2.0, 3.0, 4.0]},
+            {"label": "dog", "score": 0.8, "box": [5.0, 6.0, 7.0, 8.0]},
+        ]
+
+        query_save_prediction_with_detections(self.db, "abc", "o.jpg", "p.jpg", 7, detections)
+
+        session = self.db.query(PredictionSession).filter_by(uid="abc").one()
+        self.assertEqual(session.user_id, 7)
+        rows = self.db.query(DetectionObject).filter_by(prediction_uid="abc").order_by(DetectionObject.id).all()
+        self.assertEqual([(r.label, r.score) for r in rows], [("cat", 0.9), ("dog", 0.8)])
+        self.assertEqual((rows[0].x1, rows[0].y1, rows[0].x2, rows[0].y2), (1.0, 2.0, 3.0, 4.0))
+        self.assertEqual(rows[1].area, 4.0)
+
+    def test_prediction_without_detections(self):
+        query_save_prediction_with_detections(self.db, "empty", "o.jpg", "p.jpg", 7, [])
+
+        self.assertEqual(self.db.query(PredictionSession).count(), 1)
+        self.assertEqual(self.db.query(DetectionObject).count(), 0)
+
+    def test_rollups_follow_saves_and_deletes(self):
+        cat = {"label": "cat", "score": 0.8, "box": [0, 0, 1, 1]}
+        dog = {"label": "dog", "score": 0.4, "box": [0, 0, 1, 1]}
+        query_save_prediction_with_detections(self.db, "p1", "o.jpg", "p1.jpg", 7, [cat, dog])
+        query_save_prediction_with_detections(self.db, "p2", "o.jpg", "p2.jpg", 7, [cat])
+
+        self.assertEqual(query_prediction_stats(self.db, 7), (2, round(2.0 / 3, 3), [("cat", 2), ("dog", 1)]))
+        self.assertEqual(query_total_predictions_last_week(self.db), {"count": 2})
+        self.assertEqual(sorted(query_unique_labels_last_7_days(self.db)), ["cat", "dog"])
+
+        query_delete_prediction_by_uid(self.db, "p1", 7)
+
+        self.assertEqual(query_prediction_stats(self.db, 7), (1, 0.8, [("cat", 1)]))
+        self.assertEqual(query_unique_labels_last_7_days(self.db), ["cat"])
+
+        query_delete_prediction_by_uid(self.db, "p2", 7)
+
+        self.assertEqual(query_prediction_stats(self.db, 7), (0, 0.0, []))
+        self.assertEqual(query_total_predictions_last_week(self.db), {"count": 0})
+
+    def test_many_predictions_are_saved_in_one_call(self):
+        cat = {"label": "cat", "score": 0.8, "box": [0, 0, 2, 2]}
+        dog = {"label": "dog", "score": 0.4, "box": [0, 0, 1, 1]}
+
+        saved = query_save_predictions_with_detections(self.db, 7, [
+            ("p1", "o1.jpg", "p1.jpg", [cat, dog]),
+            ("p2", "o2.jpg", "p2.jpg", []),
+            ("p3", "o3.jpg", "p3.jpg", [cat]),
+        ])
+
+        self.assertEqual(saved, 3)
+        self.assertEqual(self.db.query(PredictionSession).filter_by(user_id=7).count(), 3)
+        self.assertEqual(self.db.query(DetectionObject).filter_by(prediction_uid="p1").count(), 2)
+        self.assertEqual(self.db.query(DetectionObject).filter_by(prediction_uid="p3").one().area, 4.0)
+        self.assertEqual(query_prediction_stats(self.db, 7), (3, round(2.0 / 3, 3), [("cat", 2), ("dog", 1)]))
+        self.assertEqual(query_save_predictions_with_detections(self.db, 7, []), 0)
@@ -0,0 +1,164 @@
+import json
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import app
+from dependencies.auth import resolve_user_id
+from database.connections import Base, get_db
+from database.queries import (
+    query_prediction_uids_by_label_and_user,
+    query_prediction_sessions_by_min_score,
+    iter_prediction_sessions_by_min_score,
+    query_save_prediction_with_detections,
+)
+from models.PredictionSession_model import PredictionSession
+from models.DetectionObjects_model import DetectionObject
+
+
+class TestSearchPagination(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine(
+            "sqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        Base.metadata.create_all(bind=self.engine)
+        self.SessionLocal = sessionmaker(bind=self.engine, autoflush=False, autocommit=False)
+        self.db = self.SessionLocal()
+
+        # 25 sessions for user 1, several sharing a timestamp, each with two
+        # matching detections (must not produce duplicate rows)
+        base = datetime(2025, 1, 1)
+        for i in range(25):
+            uid = f"u{i:02d}"
+            self.db.add(PredictionSession(
+                uid=uid, timestamp=base + timedelta(minutes=i // 3),
+                original_image="o.jpg", predicted_image=f"{uid}.jpg", user_id=1,
+            ))
+            for score in (0.9, 0.95):
+                self.db.add(DetectionObject(prediction_uid=uid, label="cat", score=score, box="[0, 0, 1, 1]"))
+        self.db.add(PredictionSession(uid="other", timestamp=base, original_image="o.jpg", predicted_image="x.jpg", user_id=2))
+        self.db.add(DetectionObject(prediction_uid="other", label="cat", score=0.9, box="[0, 0, 1, 1]"))
+        self.db.commit()
+
+        self.expected = [
+            row.uid for row in sorted(
+                self.db.query(PredictionSession).filter_by(user_id=1),
+                key=lambda row: (row.timestamp, row.uid), reverse=True,
+            )
+        ]
+
+        self.client = TestClient(app)
+        app.dependency_overrides[get_db] = lambda: self.db
+        app.dependency_overrides[resolve_user_id] = lambda: 1
+
+    def tearDown(self):
+        app.dependency_overrides = {}
+        self.db.close()
+        self.engine.dispose()
+
+    def test_pages_cover_all_rows_in_order_without_duplicates(self):
+        seen, after = [], None
+        while True:
+            page = query_prediction_uids_by_label_and_user(self.db, "cat", 1, limit=7, after=after)
+            seen += [row["uid"] for row in page]
+            if len(page) < 7:
+                break
+            after = (page[-1]["timestamp"], page[-1]["uid"])
+
+        self.assertEqual(seen, self.expected)
+
+    def test_unpaginated_query_returns_everything(self):
+        rows = query_prediction_sessions_by_min_score(self.db, 0.5, 1)
+        self.assertEqual([row["uid"] for row in rows], self.expected)
+
+    def test_iterator_matches_query(self):
+        rows = list(iter_prediction_sessions_by_min_score(self.db, 0.5, 1, batch_size=4))
+        self.assertEqual([row["uid"] for row in rows], self.expected)
+
+    def test_endpoint_follows_next_cursor_header(self):
+        seen, params = [], {"limit": 10}
+        while True:
+            response = self.client.get("/predictions/score/0.5", params=params)
+            self.assertEqual(response.status_code, 200)
+            seen += [row["uid"] for row in response.json()]
+            cursor = response.headers.get("x-next-cursor")
+            if not cursor:
+                break
+            params = {"limit": 10, "cursor": cursor}
+
+        self.assertEqual(seen, self.expected)
+
+    def test_invalid_cursor_returns_400(self):
+        response = self.client.get("/predictions/label/cat", params={"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_limit_is_bounded(self):
+        response = self.client.get("/predictions/label/cat", params={"limit": 0})
+        self.assertEqual(response.status_code, 422)
+
+    def test_stream_returns_ndjson(self):
+        with patch("controller.prediction.SessionLocal", self.SessionLocal):
+            response = self.client.get("/predictions/label/cat", params={"stream": "true"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("application/x-ndjson"))
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        self.assertEqual([row["uid"] for row in rows], self.expected)
+        self.assertIn("timestamp", rows[0])
+
+
+class TestGeometrySearch(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine(
+            "sqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        Base.metadata.create_all(bind=self.engine)
+        self.db = sessionmaker(bind=self.engine, autoflush=False, autocommit=False)()
+
+        query_save_prediction_with_detections(self.db, "small", "o.jpg", "s.jpg", 1, [
+            {"label": "cat", "score": 0.9, "box": [10, 10, 20, 20]},
+        ])
+        query_save_prediction_with_detections(self.db, "large", "o.jpg", "l.jpg", 1, [
+            {"label": "dog", "score": 0.9, "box": [100, 100, 300, 300]},
+            {"label": "cat", "score": 0.9, "box": [0, 0, 5, 5]},
+        ])
+
+        self.client = TestClient(app)
+        app.dependency_overrides[get_db] = lambda: self.db
+        app.dependency_overrides[resolve_user_id] = lambda: 1
+
+    def tearDown(self):
+        app.dependency_overrides = {}
+        self.db.close()
+        self.engine.dispose()
+
+    def uids(self, response):
+        self.assertEqual(response.status_code, 200)
+        return sorted(row["uid"] for row in response.json())
+
+    def test_min_area(self):
+        self.assertEqual(self.uids(self.client.get("/predictions/area/1000")), ["large"])
+        self.assertEqual(self.uids(self.client.get("/predictions/area/25")), ["large", "small"])
+
+    def test_region_contains_whole_box(self):
+        region = {"x1": 0, "y1": 0, "x2": 50, "y2": 50}
+        self.assertEqual(self.uids(self.client.get("/predictions/region", params=region)), ["large", "small"])
+
+        region = {"x1": 8, "y1": 8, "x2": 250, "y2": 250}
+        self.assertEqual(self.uids(self.client.get("/predictions/region", params=region)), ["small"])
+
+    def test_region_with_label(self):
+        region = {"x1": 0, "y1": 0, "x2": 400, "y2": 400, "label": "dog"}
+        self.assertEqual(self.uids(self.client.get("/predictions/region", params=region)), ["large"])
+
+    def test_empty_region_is_rejected(self):
+        response = self.client.get("/predictions/region", params={"x1": 10, "y1": 0, "x2": 10, "y2": 5})
+        self.assertEqual(response.status_code, 400)
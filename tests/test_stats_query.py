@@ -0,0 +1,59 @@
+import unittest
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from database.connections import Base
+from database.queries import query_prediction_stats, query_rebuild_rollups
+from models.PredictionSession_model import PredictionSession
+from models.DetectionObjects_model import DetectionObject
+
+
+class TestPredictionStatsQuery(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine(
+            "sqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        Base.metadata.create_all(bind=self.engine)
+        self.db = sessionmaker(bind=self.engine, autoflush=False, autocommit=False)()
+        self.now = datetime.utcnow()
+
+    def tearDown(self):
+        self.db.close()
+        self.engine.dispose()
+
+    def _add_session(self, uid, user_id, age_days, detections):
+        self.db.add(PredictionSession(uid=uid, user_id=user_id, timestamp=self.now - timedelta(days=age_days)))
+        for label, score in detections:
+            self.db.add(DetectionObject(prediction_uid=uid, label=label, score=score, box="[0, 0, 1, 1]"))
+        self.db.commit()
+        # Rows were added directly, so bring the rollups up to date
+        query_rebuild_rollups(self.db)
+
+    def test_stats_are_aggregated_for_recent_user_predictions(self):
+        self._add_session("a", 1, 1, [("cat", 0.9), ("dog", 0.6), ("cat", 0.3)])
+        self._add_session("b", 1, 3, [("car", 0.5)])
+        self._add_session("c", 1, 2, [])
+        # Too old, and another user's prediction: both ignored
+        self._add_session("old", 1, 10, [("bird", 1.0)])
+        self._add_session("other", 2, 1, [("bird", 1.0)])
+
+        total, avg_score, label_counts = query_prediction_stats(self.db, 1)
+
+        self.assertEqual(total, 3)
+        self.assertEqual(avg_score, round((0.9 + 0.6 + 0.3 + 0.5) / 4, 3))
+        self.assertEqual(label_counts, [("cat", 2), ("car", 1), ("dog", 1)])
+
+    def test_top_labels_are_limited_to_five(self):
+        labels = [(f"label_{i}", 0.5) for i in range(7) for _ in range(i + 1)]
+        self._add_session("a", 1, 1, labels)
+
+        _, _, label_counts = query_prediction_stats(self.db, 1)
+
+        self.assertEqual([label for label, _ in label_counts], ["label_6", "label_5", "label_4", "label_3", "label_2"])
+
+    def test_no_predictions(self):
+        self.assertEqual(query_prediction_stats(self.db, 1), (0, 0.0, []))
@@ -0,0 +1,126 @@
+import io
+import unittest
+from unittest.mock import patch, MagicMock
+from fastapi import FastAPI, UploadFile, File
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from app import app
+from dependencies.auth import resolve_user_id
+from database.connections import get_db
+from controller.prediction import prediction_cache
+from utils.uploads import UploadLimitMiddleware, read_upload, image_extension
+
+
+def image_bytes(image_format="JPEG", size=(40, 30), color=(0, 0, 255)):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, color=color).save(buffer, format=image_format)
+    return buffer.getvalue()
+
+
+class TestImageValidation(unittest.TestCase):
+    def test_supported_formats_get_canonical_extension(self):
+        self.assertEqual(image_extension(image_bytes("JPEG")), ".jpg")
+        self.assertEqual(image_extension(image_bytes("PNG")), ".png")
+
+    def test_non_image_is_rejected(self):
+        with self.assertRaises(Exception) as context:
+            image_extension(b"#!/bin/sh\necho hi\n")
+        self.assertEqual(context.exception.status_code, 415)
+
+    def test_unsupported_format_is_rejected(self):
+        with self.assertRaises(Exception) as context:
+            image_extension(image_bytes("GIF"))
+        self.assertEqual(context.exception.status_code, 415)
+
+    @patch("utils.uploads.MAX_IMAGE_PIXELS", 100)
+    def test_oversized_dimensions_are_rejected(self):
+        with self.assertRaises(Exception) as context:
+            image_extension(image_bytes(size=(20, 20)))
+        self.assertEqual(context.exception.status_code, 413)
+
+
+class TestPredictUploadLimits(unittest.TestCase):
+    def setUp(self):
+        prediction_cache.clear()
+        self.client = TestClient(app)
+        app.dependency_overrides[resolve_user_id] = lambda: 1
+        app.dependency_overrides[get_db] = lambda: MagicMock()
+
+    def tearDown(self):
+        app.dependency_overrides = {}
+
+    @patch("controller.prediction.write_file")
+    @patch("controller.prediction.model")
+    def test_non_image_upload_writes_nothing(self, mock_model, mock_write):
+        response = self.client.post("/predict", files={"file": ("evil.jpg", b"not an image", "image/jpeg")})
+
+        self.assertEqual(response.status_code, 415)
+        mock_write.assert_not_called()
+        mock_model.assert_not_called()
+
+    @patch("controller.prediction.MAX_UPLOAD_BYTES", 100)
+    @patch("controller.prediction.write_file")
+    def test_oversized_upload_is_rejected(self, mock_write):
+        response = self.client.post("/predict", files={"file": ("big.jpg", image_bytes(size=(200, 200)), "image/jpeg")})
+
+        self.assertEqual(response.status_code, 413)
+        mock_write.assert_not_called()
+
+    @patch("controller.prediction.write_file")
+    def test_async_upload_is_validated_before_queueing(self, mock_write):
+        with patch("controller.prediction.jobs") as mock_jobs:
+            response = self.client.post("/predict/async", files={"file": ("a.jpg", b"nope", "image/jpeg")})
+
+        self.assertEqual(response.status_code, 415)
+        mock_jobs.submit.assert_not_called()
+
+
+class TestUploadLimitMiddleware(unittest.TestCase):
+    def setUp(self):
+        self.received = []
+        limited = FastAPI()
+
+        @limited.post("/predict")
+        async def upload(file: UploadFile = File(...)):
+            data = await read_upload(file)
+            self.received.append(len(data))
+            return {"size": len(data)}
+
+        @limited.post("/other")
+        async def other(file: UploadFile = File(...)):
+            return {"size": len(await file.read())}
+
+        @limited.post("/prediction/{uid}")
+        async def prediction(uid: str, file: UploadFile = File(...)):
+            return {"size": len(await file.read())}
+
+        limited.add_middleware(UploadLimitMiddleware, max_bytes=1024, paths=("/predict",))
+        self.client = TestClient(limited)
+
+    def test_large_content_length_is_refused_before_parsing(self):
+        response = self.client.post("/predict", files={"file": ("a.bin", b"x" * 4096)})
+
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(self.received, [])
+
+    def test_streamed_body_is_cut_off(self):
+        # Chunked multipart body, so there's no Content-Length to check upfront
+        def body():
+            yield b'--b\r\nContent-Disposition: form-data; name="file"; filename="a.bin"\r\n\r\n'
+            yield b"x" * 800
+            yield b"x" * 800
+            yield b"\r\n--b--\r\n"
+
+        response = self.client.post("/predict", content=body(), headers={"content-type": "multipart/form-data; boundary=b"})
+
+        self.assertEqual(response.status_code, 413)
+
+    def test_small_uploads_and_other_paths_pass(self):
+        self.assertEqual(self.client.post("/predict", files={"file": ("a.bin", b"x" * 100)}).json(), {"size": 100})
+        self.assertEqual(self.client.post("/other", files={"file": ("a.bin", b"x" * 4096)}).json(), {"size": 4096})
+
+    def test_paths_sharing_the_prefix_are_not_limited(self):
+        response = self.client.post("/prediction/abc", files={"file": ("a.bin", b"x" * 4096)})
+
+        self.assertEqual(response.json(), {"size": 4096})
@@ -0,0 +1,29 @@
+"""
+Opaque keyset cursors for paginated listings.
+
+A cursor encodes the (timestamp, uid) of the last row of a page; the next
+page starts strictly after it in (timestamp desc, uid desc) order.
+"""
+import base64
+import json
+from datetime import datetime
+
+from fastapi import HTTPException
+
+
+def encode_cursor(timestamp, uid: str) -> str:
+    if isinstance(timestamp, datetime):
+        timestamp = timestamp.isoformat()
+    raw = json.dumps([str(timestamp), uid]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: str):
+    """
+    Returns (timestamp, uid). Raises a 400 for cursors this API didn't issue.
+    """
+    try:
+        timestamp, uid = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.fromisoformat(timestamp), str(uid)
+    except (ValueError, TypeError, UnicodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
@@ -0,0 +1,52 @@
+"""
+Salted password hashing with PBKDF2-HMAC-SHA256 (stdlib only).
+
+Hashes are stored as "pbkdf2_sha256$<iterations>$<salt hex>$<hash hex>".
+Anything else in the password column is a legacy plain-text password,
+which verify_password still accepts so it can be upgraded on next login.
+"""
+import hashlib
+import hmac
+import os
+
+ALGORITHM = "pbkdf2_sha256"
+PASSWORD_HASH_ITERATIONS = int(os.getenv("PASSWORD_HASH_ITERATIONS", "600000"))
+SALT_BYTES = 16
+
+
+def hash_password(password: str, iterations: int = None) -> str:
+    iterations = iterations or PASSWORD_HASH_ITERATIONS
+    salt = os.urandom(SALT_BYTES)
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations)
+    return f"{ALGORITHM}${iterations}${salt.hex()}${digest.hex()}"
+
+
+def is_hashed(stored: str) -> bool:
+    return stored.startswith(ALGORITHM + "$")
+
+
+def verify_password(password: str, stored: str) -> bool:
+    """
+    Check a password against a stored hash (or legacy plain-text value)
+    in constant time.
+    """
+    if not is_hashed(stored):
+        return hmac.compare_digest(password.encode("utf-8"), stored.encode("utf-8"))
+    try:
+        _, iterations, salt, expected = stored.split("$")
+        digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), bytes.fromhex(salt), int(iterations))
+    except ValueError:
+        return False
+    return hmac.compare_digest(digest.hex(), expected)
+
+
+def needs_rehash(stored: str) -> bool:
+    """
+    True for plain-text passwords and hashes weaker than the current setting.
+    """
+    if not is_hashed(stored):
+        return True
+    try:
+        return int(stored.split("$")[1]) < PASSWORD_HASH_ITERATIONS
+    except (IndexError, ValueError):
+        return True
@@ -0,0 +1,214 @@
+"""
+Upload handling for the /predict endpoints: size limits, image type
+validation, expanding the zip/tar archives accepted by /predict/batch and
+spooling /predict/video uploads to disk.
+"""
+import hashlib
+import io
+import os
+import posixpath
+import tarfile
+import uuid
+import zipfile
+import zlib
+
+from fastapi import HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from PIL import Image, UnidentifiedImageError
+
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(20 * 1024 * 1024)))
+MAX_IMAGE_PIXELS = int(os.getenv("MAX_IMAGE_PIXELS", "50000000"))
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+# /predict/batch: whole request body (and total unpacked archive size), and images per request
+MAX_BATCH_UPLOAD_BYTES = int(os.getenv("MAX_BATCH_UPLOAD_BYTES", str(200 * 1024 * 1024)))
+MAX_BATCH_IMAGES = int(os.getenv("MAX_BATCH_IMAGES", "256"))
+
+# /predict/video: largest video file, and accepted containers (by file name)
+MAX_VIDEO_UPLOAD_BYTES = int(os.getenv("MAX_VIDEO_UPLOAD_BYTES", str(512 * 1024 * 1024)))
+VIDEO_EXTENSIONS = {".mp4", ".m4v", ".mov", ".avi", ".mkv", ".webm"}
+
+# Accepted formats and the extension their originals are stored under
+IMAGE_EXTENSIONS = {"JPEG": ".jpg", "PNG": ".png", "BMP": ".bmp", "WEBP": ".webp", "TIFF": ".tif"}
+
+
+def too_large(max_bytes: int) -> HTTPException:
+    return HTTPException(status_code=413, detail=f"Upload exceeds {max_bytes} bytes")
+
+
+async def read_upload(file: UploadFile, max_bytes: int = MAX_UPLOAD_BYTES) -> bytes:
+    """
+    Read an upload in chunks, failing with 413 as soon as it passes max_bytes.
+    """
+    if file.size is not None and file.size > max_bytes:
+        raise too_large(max_bytes)
+
+    chunks, total = [], 0
+    while chunk := await file.read(UPLOAD_CHUNK_BYTES):
+        total += len(chunk)
+        if total > max_bytes:
+            raise too_large(max_bytes)
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+async def save_upload(file: UploadFile, directory: str, suffix: str, max_bytes: int):
+    """
+    Stream an upload into a temporary file in directory without holding it
+    in memory, failing with 413 as soon as it passes max_bytes.
+    Returns (temporary path, sha256 hex digest); the caller moves or removes the file.
+    """
+    if file.size is not None and file.size > max_bytes:
+        raise too_large(max_bytes)
+
+    path = os.path.join(directory, f"{uuid.uuid4().hex}{suffix}.tmp")
+    digest, total = hashlib.sha256(), 0
+    try:
+        with open(path, "wb") as f:
+            while chunk := await file.read(UPLOAD_CHUNK_BYTES):
+                total += len(chunk)
+                if total > max_bytes:
+                    raise too_large(max_bytes)
+                digest.update(chunk)
+                await run_in_threadpool(f.write, chunk)
+    except BaseException:
+        os.remove(path)
+        raise
+    return path, digest.hexdigest()
+
+
+def video_extension(filename: str) -> str:
+    """
+    Lower-case extension of a video upload's file name; 415 if it isn't a supported container.
+    """
+    ext = os.path.splitext(filename or "")[1].lower()
+    if ext not in VIDEO_EXTENSIONS:
+        raise HTTPException(status_code=415, detail=f"Unsupported video type, expected one of {', '.join(sorted(VIDEO_EXTENSIONS))}")
+    return ext
+
+
+def image_extension(data: bytes) -> str:
+    """
+    Check that data is a supported image from its header alone (nothing is
+    decoded) and return the extension to store it under.
+    Raises 415 for anything else and 413 for oversized dimensions.
+    """
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            image_format, (width, height) = image.format, image.size
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError):
+        raise HTTPException(status_code=415, detail="Unsupported image type")
+
+    if image_format not in IMAGE_EXTENSIONS:
+        raise HTTPException(status_code=415, detail="Unsupported image type")
+    if width * height > MAX_IMAGE_PIXELS:
+        raise HTTPException(status_code=413, detail=f"Image exceeds {MAX_IMAGE_PIXELS} pixels")
+    return IMAGE_EXTENSIONS[image_format]
+
+
+# Raised by zipfile / tarfile and their decompressors for corrupt, truncated,
+# encrypted or unsupported archives
+ARCHIVE_ERRORS = (zipfile.BadZipFile, tarfile.TarError, EOFError, zlib.error, OSError, RuntimeError, NotImplementedError)
+
+
+def _archive_members(data: bytes):
+    """
+    (name, size, read) for each regular file of a zip or tar archive, or None
+    if data is neither. Nothing is decompressed until read() is called.
+    """
+    if zipfile.is_zipfile(io.BytesIO(data)):
+        archive = zipfile.ZipFile(io.BytesIO(data))
+        return [
+            (info.filename, info.file_size, lambda info=info: archive.read(info))
+            for info in archive.infolist() if not info.is_dir()
+        ]
+    try:
+        archive = tarfile.open(fileobj=io.BytesIO(data), mode="r:*")
+    except tarfile.TarError:
+        return None
+    return [
+        (member.name, member.size, lambda member=member: archive.extractfile(member).read())
+        for member in archive.getmembers() if member.isfile()
+    ]
+
+
+def _hidden(part: str) -> bool:
+    return part == "__MACOSX" or (part.startswith(".") and part not in (".", ".."))
+
+
+def expand_archive(data: bytes, max_images: int = MAX_BATCH_IMAGES, max_bytes: int = MAX_BATCH_UPLOAD_BYTES):
+    """
+    The files inside a zip or tar (optionally compressed) archive as
+    (name, bytes) pairs, or None if data is not an archive. Names are
+    normalized (tar -C dir . stores ./a.jpg); hidden files and macOS resource
+    forks are skipped; more than max_images files or more than max_bytes
+    unpacked are refused with 413 before anything is unpacked. Corrupt,
+    truncated or encrypted archives are refused with 400.
+    """
+    try:
+        members = _archive_members(data)
+    except ARCHIVE_ERRORS:
+        raise HTTPException(status_code=400, detail="Corrupt or unreadable archive")
+    if members is None:
+        return None
+
+    members = [(posixpath.normpath(name), size, read) for name, size, read in members]
+    members = [
+        (name, size, read) for name, size, read in members
+        if not any(_hidden(part) for part in name.split("/"))
+    ]
+    if len(members) > max_images:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds {max_images} images")
+    if sum(size for _, size, _ in members) > max_bytes:
+        raise HTTPException(status_code=413, detail=f"Archive unpacks to more than {max_bytes} bytes")
+    try:
+        return [(name, read()) for name, _, read in members]
+    except ARCHIVE_ERRORS:
+        raise HTTPException(status_code=400, detail="Corrupt or unreadable archive")
+
+
+class UploadLimitMiddleware:
+    """
+    Reject request bodies over max_bytes on the given paths (matched
+    exactly, so /predict doesn't cover /prediction/{uid}) before they are
+    parsed or spooled: a too large Content-Length is refused upfront,
+    bodies without one are counted as they stream in.
+    """
+
+    def __init__(self, app, max_bytes: int, paths=("/predict",)):
+        self.app = app
+        self.max_bytes = max_bytes
+        self.paths = frozenset(paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope.get("path", "").rstrip("/") not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length and content_length.isdigit() and int(content_length) > self.max_bytes:
+            await self.reject(send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    # Raised while the form is parsed; FastAPI passes it on as a 413
+                    raise too_large(self.max_bytes)
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+    async def reject(self, send):
+        body = b'{"detail":"Upload exceeds %d bytes"}' % self.max_bytes
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})